@@ -0,0 +1,48 @@
+"""
+HTTP 條件式請求
+以資料的版本號產生 ETag, 用戶端帶 If-None-Match 且版本未改變時直接回應 304,
+不讀取資料也不傳送本文; 配合 Cache-Control: no-cache, 瀏覽器每次都會向伺服器確認
+"""
+
+import uuid
+from collections.abc import Callable
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# 每次啟動不同: 版本號從 1 重新計算, 重新啟動前快取的 ETag 不會誤判為相同
+_INSTANCE = uuid.uuid4().hex[:12]
+
+
+def make_etag(tag: str) -> str:
+    """
+    弱 ETag: 同一版本的內容可能以原始或 gzip 壓縮的本文送出 (依 Accept-Encoding),
+    兩者位元組不同, 只能標示為語意相同
+    """
+    return f'W/"{_INSTANCE}-{tag}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # GET 使用弱比較: 忽略 W/ 前綴
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def conditional_json(request: Request, tag: str, body: Callable[[], bytes]) -> Response:
+    """
+    JSON 條件式回應
+
+    Args:
+        tag: 代表目前內容的版本標記
+        body: 產生回應本文的函數 (版本未改變時不呼叫)
+    """
+    etag = make_etag(tag)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body(), media_type="application/json", headers=headers)
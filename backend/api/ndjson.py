@@ -0,0 +1,116 @@
+"""
+NDJSON (每行一個 JSON 物件) 串流
+匯出時逐批產生回應本文, 匯入時逐行解析請求本文, 都不需要把整份資料組成一個字串;
+匯入的記錄也逐批交給 (在工作執行緒執行的) 匯入函數, 不需保留所有解析結果
+"""
+
+import json
+import zlib
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import TypeVar
+
+from anyio import from_thread
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from config.settings import API_NDJSON_CHUNK_SIZE, API_NDJSON_IMPORT_BATCH
+
+MEDIA_TYPE = "application/x-ndjson"
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _encode(records: Iterable[dict], chunk_size: int) -> Iterator[bytes]:
+    buffer: list[str] = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def ndjson_response(records: Iterable[dict], filename: str) -> StreamingResponse:
+    """
+    以 NDJSON 串流回應記錄 (累積一定資料量才送出, 減少小封包)
+
+    Args:
+        records: 要匯出的記錄 (在回應送出的過程中逐筆讀取)
+        filename: 下載時的檔案名稱
+    """
+    return StreamingResponse(
+        _encode(records, API_NDJSON_CHUNK_SIZE),
+        media_type=MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _body_chunks(request: Request) -> AsyncIterator[bytes]:
+    """請求本文 (Content-Encoding: gzip 時逐段解壓縮)"""
+    if request.headers.get("content-encoding", "").lower() != "gzip":
+        async for chunk in request.stream():
+            yield chunk
+        return
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    try:
+        async for chunk in request.stream():
+            yield decompressor.decompress(chunk)
+        yield decompressor.flush()
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"gzip 解壓縮失敗: {e}") from e
+
+
+def _parse_line(line: bytes, line_no: int, model: type[ModelT]) -> ModelT:
+    try:
+        return model.model_validate_json(line)
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        message = f"{location}: {error['msg']}" if location else error["msg"]
+        raise HTTPException(status_code=422, detail=f"第 {line_no} 行: {message}") from e
+
+
+async def parse_ndjson(request: Request, model: type[ModelT]) -> AsyncIterator[list[ModelT]]:
+    """
+    逐行解析並驗證 NDJSON 請求本文 (空白行略過), 每累積 API_NDJSON_IMPORT_BATCH 筆產生一批,
+    不保留原始本文與已產生的批次
+
+    Raises:
+        HTTPException: 任一行格式錯誤時 (422, 訊息包含行號)
+    """
+    batch: list[ModelT] = []
+    pending = b""
+    line_no = 0
+    async for chunk in _body_chunks(request):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                batch.append(_parse_line(line, line_no, model))
+                if len(batch) >= API_NDJSON_IMPORT_BATCH:
+                    yield batch
+                    batch = []
+    if pending.strip():
+        batch.append(_parse_line(pending, line_no + 1, model))
+    if batch:
+        yield batch
+
+
+def iterate_in_thread(batches: AsyncIterator[list[ModelT]]) -> Iterator[ModelT]:
+    """
+    在工作執行緒 (run_in_threadpool) 中逐筆取得 parse_ndjson 的結果,
+    每一批由事件迴圈解析; 格式錯誤的 HTTPException 由迭代處拋出,
+    匯入函數全部處理完才寫入時, 錯誤的請求不會寫入任何資料
+    """
+
+    async def next_batch() -> list[ModelT] | None:
+        return await anext(batches, None)
+
+    while (batch := from_thread.run(next_batch)) is not None:
+        yield from batch
@@ -2,31 +2,39 @@
 腳本相關 API 路由
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 
-# 引用刷新監聽器的函數 (延遲引用或直接引用，這裡直接引用，因為 system.py 不依賴 scripts.py)
-from api.system import refresh_listener_hotkeys
+# 服務實例由 system.py 建立並共用 (system.py 不依賴 scripts.py), 腳本變更才能通知到引擎的函式庫快取
+from api.http_cache import conditional_json
+from api.ndjson import iterate_in_thread, ndjson_response, parse_ndjson
+from api.system import refresh_listener_hotkeys, script_service, search_service
 from models.schemas import (
+    ImportResult,
     Script,
     ScriptCheckRequest,
     ScriptCheckResponse,
     ScriptCreate,
+    ScriptImport,
+    ScriptSearchResult,
     ScriptUpdate,
+    ScriptVersion,
+    ScriptVersionContent,
+    ScriptVersionDiff,
 )
-from repositories.script_repository import ScriptRepository
-from services.script_service import ScriptService
 
 router = APIRouter(prefix="/scripts", tags=["scripts"])
 
-# 依賴注入 - 創建服務實例
-script_repository = ScriptRepository()
-script_service = ScriptService(script_repository)
-
 
 @router.get("", response_model=list[Script])
-def get_scripts():
-    """取得所有腳本"""
-    return script_service.get_all_scripts()
+def get_scripts(request: Request):
+    """
+    取得所有腳本 (直接返回倉庫快取的序列化結果, 不重新驗證與序列化)
+    帶 If-None-Match 且腳本未改變時回應 304
+    """
+    return conditional_json(
+        request, f"scripts-{script_service.get_version()}", script_service.get_all_scripts_json
+    )
 
 
 @router.post("", response_model=Script)
@@ -44,6 +52,35 @@ def check_script(request: ScriptCheckRequest):
     return ScriptCheckResponse(issues=issues)
 
 
+@router.get("/search", response_model=ScriptSearchResult)
+def search_scripts(q: str, limit: int = 50):
+    """
+    搜尋腳本名稱、內容與呼叫的函數 (以空白分隔的條件都必須符合)
+    例如 `click 100`、`"move(100, 200)"`、`name:登入`、`api:type_text`
+    """
+    return search_service.search(q, limit)
+
+
+@router.get("/export")
+def export_scripts():
+    """匯出所有腳本為 NDJSON (每行一個腳本, 串流回應)"""
+    return ndjson_response(script_service.export_scripts(), "scripts.ndjson")
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_scripts(request: Request):
+    """
+    以 NDJSON 批次匯入腳本 (格式同匯出, 可用 Content-Encoding: gzip 上傳)
+    名稱相同的腳本被覆寫, 其餘新增; 任一行錯誤時全部不匯入
+    整批只寫入一次檔案並只重新載入一次熱鍵
+    """
+    items = iterate_in_thread(parse_ndjson(request, ScriptImport))
+    result = await run_in_threadpool(script_service.import_scripts, items)
+    if result.created or result.updated:
+        await run_in_threadpool(refresh_listener_hotkeys)
+    return result
+
+
 @router.get("/{script_id}", response_model=Script)
 def get_script(script_id: str):
     """取得特定腳本"""
@@ -71,3 +108,44 @@ def delete_script(script_id: str):
         raise HTTPException(status_code=404, detail="腳本不存在")
     refresh_listener_hotkeys()
     return {"status": "ok", "message": "腳本已刪除"}
+
+
+@router.get("/{script_id}/versions", response_model=list[ScriptVersion])
+def list_script_versions(script_id: str):
+    """取得腳本的版本歷史 (由舊到新)"""
+    versions = script_service.list_versions(script_id)
+    if versions is None:
+        raise HTTPException(status_code=404, detail="腳本不存在")
+    return versions
+
+
+@router.get("/{script_id}/versions/{version}", response_model=ScriptVersionContent)
+def get_script_version(script_id: str, version: int):
+    """取得特定版本的內容"""
+    entry = script_service.get_version_content(script_id, version)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="版本不存在")
+    return entry
+
+
+@router.get("/{script_id}/versions/{version}/diff", response_model=ScriptVersionDiff)
+def diff_script_version(script_id: str, version: int, against: int | None = None):
+    """
+    比較兩個版本
+    against 未指定時與前一個版本比較
+    """
+    old = against if against is not None else version - 1
+    diff = script_service.diff_versions(script_id, old, version)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="版本不存在")
+    return ScriptVersionDiff(from_version=old, to_version=version, diff=diff)
+
+
+@router.post("/{script_id}/versions/{version}/restore", response_model=Script)
+def restore_script_version(script_id: str, version: int):
+    """將腳本還原為特定版本 (記錄為新版本)"""
+    script = script_service.restore_version(script_id, version)
+    if not script:
+        raise HTTPException(status_code=404, detail="版本不存在")
+    refresh_listener_hotkeys()
+    return script
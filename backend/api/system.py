@@ -4,71 +4,188 @@
 """
 
 import asyncio
-import contextlib
-
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
-
-from core.engine import ScriptEngine
+import json
+import logging
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from api.http_cache import conditional_json
+from api.ndjson import iterate_in_thread, ndjson_response, parse_ndjson
+from config.settings import (
+    COMPILE_CACHE_DIR,
+    ENGINE_COMPILE_CACHE_ENTRIES,
+    ENGINE_COMPILE_CACHE_FILES,
+    RECORDER_STREAM_INTERVAL,
+    SCHEDULER_MAX_SLEEP,
+    SCHEDULER_MIN_INTERVAL,
+    SCHEDULER_MISFIRE_GRACE,
+    SCHEDULER_RETRY_INTERVAL,
+    SCHEDULER_STATE_FILE,
+    VERSION_KEYFRAME_INTERVAL,
+    VERSIONS_DIR,
+)
+from core.compile_cache import CompileCache
+from core.engine import COMPILE_VARIANT, ScriptEngine, compile_script
+from core.event_bus import event_bus
 from core.key_listener import KeyListener
+from core.metrics import registry as metrics_registry
 from core.recorder import ScriptRecorder
+from core.scheduler import Scheduler
+from core.startup import startup
 from models.schemas import (
+    DryRunRequest,
+    DryRunResult,
     EngineCommandResponse,
     EngineStatus,
     ExecutionResult,
+    HistoryImportResult,
+    HistoryRecord,
     MousePosition,
+    ProfileReport,
+    ReadinessStatus,
     RecorderStatus,
+    ScheduledRun,
+    Script,
     StatusResponse,
 )
 from repositories.script_repository import ScriptRepository
+from repositories.version_store import ScriptVersionStore
+from services.connection_manager import ConnectionManager
 from services.history_service import HistoryService
 from services.script_service import ScriptService
+from services.search_service import ScriptSearchService
 
 router = APIRouter(tags=["system"])
+logger = logging.getLogger(__name__)
 
-# 全局實例 (保持向後兼容)
-script_engine = ScriptEngine()
-recorder = ScriptRecorder()
+# 全局實例 (保持向後兼容, api/scripts.py 也使用同一組實例)
 history_service = HistoryService()
-script_repository = ScriptRepository()
+script_repository = ScriptRepository(
+    versions=ScriptVersionStore(VERSIONS_DIR, VERSION_KEYFRAME_INTERVAL)
+)
 script_service = ScriptService(script_repository)
+search_service = ScriptSearchService(script_repository)
+script_repository.add_listener(search_service.refresh)
+
+
+def _library_source(ref: str) -> tuple[str, str] | None:
+    """import_script/call_script 的腳本來源 (以 ID 或名稱查詢)"""
+    script = script_service.resolve_script(ref)
+    return (script.id, script.content) if script else None
+
+
+script_engine = ScriptEngine(
+    history_service,
+    compile_cache=CompileCache(
+        COMPILE_CACHE_DIR,
+        compile_script,
+        COMPILE_VARIANT,
+        ENGINE_COMPILE_CACHE_ENTRIES,
+        ENGINE_COMPILE_CACHE_FILES,
+    ),
+    script_source=_library_source,
+)
+# 腳本新增、修改或刪除時讓已快取的函式庫模組失效
+if script_engine.library is not None:
+    script_repository.add_listener(script_engine.library.invalidate)
+recorder = ScriptRecorder()
+
 
+def _run_scheduled(script_id: str) -> bool:
+    """排程到期時執行腳本, 返回是否已開始執行 (引擎忙碌時為 False)"""
+    script = script_service.get_script(script_id)
+    if script is None or not script.enabled:
+        return True
+    result = script_engine.execute(script.content, script.id, script.name)
+    return bool(result["status"] == "running")
+
+
+scheduler = Scheduler(
+    _run_scheduled,
+    SCHEDULER_MISFIRE_GRACE,
+    SCHEDULER_RETRY_INTERVAL,
+    SCHEDULER_MAX_SLEEP,
+    SCHEDULER_MIN_INTERVAL,
+    SCHEDULER_STATE_FILE,
+)
+
+
+def _schedule_of(script: Script | None) -> dict | None:
+    if script is None or not script.enabled or script.schedule is None:
+        return None
+    return script.schedule.model_dump()
 
-# WebSocket 連線管理
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+def load_schedules() -> int:
+    """載入所有啟用腳本的排程 (啟動時呼叫), 返回已排程的腳本數"""
+    return scheduler.replace_all(
+        (script.id, schedule)
+        for script in script_service.get_all_scripts()
+        if (schedule := _schedule_of(script)) is not None
+    )
+
+
+def _refresh_schedule(script_id: str) -> None:
+    """腳本變更後只重新排程該腳本 (不重建整個堆積)"""
+    try:
+        scheduler.set(script_id, _schedule_of(script_service.get_script(script_id)))
+    except ValueError as e:
+        logger.warning("腳本 %s 的排程設定錯誤: %s", script_id, e)
 
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            with contextlib.suppress(Exception):
-                await connection.send_json(message)
+script_repository.add_listener(_refresh_schedule)
 
 
 manager = ConnectionManager()
 
 
+def on_engine_status_changed(delta: dict):
+    """引擎狀態變更時的回呼 (在腳本或 API 執行緒中), 將增量推送給所有連線"""
+    if manager.connection_count:
+        event_bus.post({"type": "engine_status", "data": delta})
+
+
+script_engine.status_listener = on_engine_status_changed
+
+
 def on_f2_triggered():
     """當 F2 被按下時的回呼"""
     pos = script_engine.get_mouse_position()
-    # 建立事件迴圈來發送非同步廣播 (在 KeyListener 的執行緒中)
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(
-        manager.broadcast({"type": "coordinate", "data": {"x": pos[0], "y": pos[1]}})
-    )
-    loop.close()
+    # 透過事件匯流排投遞到伺服器事件迴圈廣播 (在 KeyListener 的執行緒中)
+    event_bus.post({"type": "coordinate", "data": {"x": pos[0], "y": pos[1]}})
+
+
+def _run_hotkey(script_id: str, content: str, triggered_at: float) -> None:
+    """熱鍵觸發時執行腳本 (以腳本本身的 ID 與名稱記錄歷史與指標)"""
+    script = script_service.get_script(script_id)
+    name = script.name if script is not None else script_id
+    script_engine.execute(content, script_id, name, triggered_at=triggered_at)
 
 
-key_listener = KeyListener(
-    on_trigger=lambda content: script_engine.execute(content, "hotkey"), on_f2=on_f2_triggered
+key_listener = KeyListener(on_trigger=_run_hotkey, on_f2=on_f2_triggered)
+
+
+def _recorder_event_rate() -> float:
+    """錄製中的平均事件速率 (事件/秒)"""
+    status = recorder.get_status()
+    return status["event_count"] / status["duration"] if status["duration"] > 0 else 0.0
+
+
+metrics_registry.gauge(
+    "xxscript_ws_connections", "目前的 WebSocket 連線數", lambda: manager.connection_count
+)
+metrics_registry.gauge(
+    "xxscript_engine_running", "腳本是否正在執行 (含暫停)", lambda: script_engine.status != "IDLE"
+)
+metrics_registry.gauge(
+    "xxscript_recorder_events_per_second", "目前錄製的平均事件速率", _recorder_event_rate
+)
+metrics_registry.gauge(
+    "xxscript_startup_seconds",
+    "從載入主模組到服務就緒的時間",
+    lambda: (startup.startup_ms or 0.0) / 1000,
 )
 
 
@@ -76,6 +193,10 @@ key_listener = KeyListener(
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     try:
+        # 新連線先送出完整狀態, 之後只接收增量
+        manager.send_personal(
+            websocket, {"type": "engine_status", "data": script_engine.get_status()}
+        )
         while True:
             # 保持連線, 接收訊息(如果需要)
             await websocket.receive_text()
@@ -93,17 +214,48 @@ def get_status():
     )
 
 
+@router.get("/ready", response_model=ReadinessStatus, responses={503: {"model": ReadinessStatus}})
+def get_readiness():
+    """就緒檢查: 啟動完成前或關閉中回應 503, 並附上各啟動階段的時間"""
+    report = startup.report()
+    if not report["ready"]:
+        return JSONResponse(report, status_code=503)
+    return report
+
+
 @router.post("/scripts/{script_id}/execute", response_model=ExecutionResult)
-def execute_script(script_id: str):
-    """執行腳本"""
+def execute_script(script_id: str, profile: bool = False):
+    """執行腳本 (profile=true 時記錄每行與各 API 的耗時, 可由 /history/{run_id}/profile 取得)"""
     script = script_service.get_script(script_id)
     if not script:
         raise HTTPException(status_code=404, detail="腳本不存在")
 
-    result = script_engine.execute(script.content, script_id, script.name)
+    result = script_engine.execute(script.content, script_id, script.name, profile=profile)
     return ExecutionResult(**result)
 
 
+def _dry_run(content: str, script_id: str, timeline: bool) -> dict:
+    result = script_engine.dry_run(content, script_id)
+    if not timeline:
+        result["timeline"] = []
+    return result
+
+
+@router.post("/scripts/dry-run", response_model=DryRunResult)
+def dry_run_content(request: DryRunRequest, timeline: bool = True):
+    """模擬執行腳本內容: 不送出輸入, 等待以虛擬時間瞬間完成 (timeline=false 時只返回統計)"""
+    return _dry_run(request.content, "manual", timeline)
+
+
+@router.post("/scripts/{script_id}/dry-run", response_model=DryRunResult)
+def dry_run_script(script_id: str, timeline: bool = True):
+    """模擬執行已儲存的腳本"""
+    script = script_service.get_script(script_id)
+    if not script:
+        raise HTTPException(status_code=404, detail="腳本不存在")
+    return _dry_run(script.content, script_id, timeline)
+
+
 @router.post("/engine/stop", response_model=EngineCommandResponse)
 def stop_execution():
     """停止執行腳本"""
@@ -128,10 +280,47 @@ def get_engine_status():
     return script_engine.get_status()
 
 
+# 錄製事件串流任務 (保留引用以免被垃圾回收)
+_recorder_stream_task: asyncio.Task | None = None
+
+
+async def _push_recorder_updates():
+    """將自上次推送後的錄製事件合併為一批廣播"""
+    offset, events = recorder.drain_updates()
+    # 沒有訂閱者時仍需取出事件以推進游標, 但省略序列化
+    if not manager.connection_count or (not events and recorder.recording):
+        return
+
+    status = recorder.get_status()
+    message = {
+        "type": "recorder_events",
+        "data": {
+            "offset": offset,
+            "events": events,
+            "recording": status["recording"],
+            "event_count": status["event_count"],
+            "duration": status["duration"],
+        },
+    }
+    await manager.broadcast_text(json.dumps(message, ensure_ascii=False))
+
+
+async def _stream_recorder_events():
+    """錄製期間以固定頻率推送事件增量, 停止後送出最後一批"""
+    while recorder.recording:
+        await asyncio.sleep(RECORDER_STREAM_INTERVAL)
+        await _push_recorder_updates()
+    await _push_recorder_updates()
+
+
 @router.post("/recorder/start")
-def start_recording():
+async def start_recording():
     """開始錄製"""
+    global _recorder_stream_task
+
     recorder.start_recording()
+    if _recorder_stream_task is None or _recorder_stream_task.done():
+        _recorder_stream_task = asyncio.create_task(_stream_recorder_events())
     return {"status": "ok", "message": "開始錄製"}
 
 
@@ -149,10 +338,37 @@ def get_recorder_status():
     return RecorderStatus(**status)
 
 
-@router.get("/history")
-def get_history():
-    """取得執行歷史"""
-    return history_service.get_all()
+@router.get("/history", response_model=list[HistoryRecord])
+def get_history(request: Request):
+    """取得執行歷史 (直接返回快取的序列化結果, 不逐筆驗證; 未改變時回應 304)"""
+    return conditional_json(
+        request, f"history-{history_service.version}", history_service.get_all_json
+    )
+
+
+@router.get("/history/export")
+def export_history():
+    """匯出歷史記錄為 NDJSON (不包含效能分析報告)"""
+    return ndjson_response(history_service.get_all(), "history.ndjson")
+
+
+@router.post("/history/import", response_model=HistoryImportResult)
+async def import_history(request: Request):
+    """以 NDJSON 匯入歷史記錄 (與現有記錄依時間合併並略過已存在的記錄, 只保留最近的記錄)"""
+    records = iterate_in_thread(parse_ndjson(request, HistoryRecord))
+    imported, duplicates = await run_in_threadpool(
+        history_service.import_records, (record.model_dump(mode="json") for record in records)
+    )
+    return HistoryImportResult(imported=imported, duplicates=duplicates)
+
+
+@router.get("/history/{run_id}/profile", response_model=ProfileReport)
+def get_run_profile(run_id: str):
+    """取得單次執行的效能分析報告"""
+    report = history_service.get_profile(run_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="分析報告不存在")
+    return report
 
 
 @router.delete("/history")
@@ -162,6 +378,20 @@ def clear_history():
     return {"status": "ok", "message": "歷史記錄已清除"}
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """取得 Prometheus 格式的指標"""
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/scheduler", response_model=list[ScheduledRun])
+def get_scheduled_runs(limit: int = 100):
+    """即將執行的排程 (依時間排序)"""
+    return scheduler.upcoming(limit)
+
+
 @router.get("/mouse/position", response_model=MousePosition)
 def get_mouse_position():
     """取得滑鼠位置"""
@@ -193,10 +423,12 @@ def refresh_listener_hotkeys():
     enabled_scripts = script_service.get_enabled_scripts()
     key_listener.clear_all()
 
-    print(f"正在更新熱鍵設定，共 {len(enabled_scripts)} 個啟用腳本")
+    registered = 0
     for script in enabled_scripts:
         if script.hotkey:
             key_listener.register_hotkey(script.hotkey, script.id, script.content)
+            registered += 1
+    logger.info("已更新熱鍵設定: %d 個啟用腳本, %d 個熱鍵", len(enabled_scripts), registered)
 
     # 確保監聽器處於啟動狀態 (全自動模式)
     if not key_listener.running:
@@ -0,0 +1,261 @@
+"""
+HTTP API 負載基準測試
+以產生的資料集 (預設 10k 腳本、100k 歷史記錄) 在行程內透過 ASGI 直接驅動 FastAPI,
+量測各端點在不同併發數下的 p50/p99 延遲、吞吐量與記憶體用量
+
+用法 (在 backend 目錄下):
+    python -m benchmarks.bench_api --output results/api.json
+    python -m benchmarks.bench_api --scripts 1000 --history 10000 --concurrency 1,8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.fakes import install_fake_pynput
+
+install_fake_pynput()
+
+from benchmarks.common import quiet, summarize, write_results  # noqa: E402
+
+# 一般錄製腳本的內容片段, 用來組出不同大小的腳本
+_SNIPPETS = [
+    "move({x}, {y})",
+    "mouse_down('left')\nsleep(0.05)\nmouse_release('left')",
+    "key_down('{c}')\nsleep(0.08)\nkey_release('{c}')",
+    "scroll(0, -{n})",
+    "type_text('hello {n}')",
+    "sleep(0.{n})",
+]
+
+
+def generate_scripts(count: int, rng: random.Random) -> list[dict]:
+    """產生腳本資料 (內容長度從數行到數千行不等, 模擬錄製腳本)"""
+    scripts = []
+    for i in range(count):
+        # 大多數腳本很短, 少數錄製腳本很長
+        lines = int(rng.paretovariate(1.2) * 5)
+        lines = min(lines, 5_000)
+        content = "\n".join(
+            rng.choice(_SNIPPETS).format(
+                x=rng.randint(0, 3839),
+                y=rng.randint(0, 2159),
+                c=rng.choice("abcdefghijklmnopqrstuvwxyz"),
+                n=rng.randint(1, 9),
+            )
+            for _ in range(lines)
+        )
+        scripts.append(
+            {
+                "id": f"script_{i + 1}",
+                "name": f"腳本 {i + 1}",
+                "content": content,
+                "hotkey": f"ctrl+shift+f{i % 12 + 1}" if i % 50 == 0 else None,
+                "enabled": i % 3 != 0,
+            }
+        )
+    return scripts
+
+
+def generate_history(count: int, script_count: int, rng: random.Random) -> list[dict]:
+    """產生歷史記錄資料"""
+    statuses = ["success"] * 8 + ["error", "stopped"]
+    history = []
+    for _ in range(count):
+        status = rng.choice(statuses)
+        history.append(
+            {
+                "script_id": f"script_{rng.randint(1, max(1, script_count))}",
+                "timestamp": f"2026-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+                "status": status,
+                "duration": round(rng.random() * 30, 3),
+                "error": "NameError: name 'x' is not defined" if status == "error" else None,
+            }
+        )
+    return history
+
+
+def write_dataset(data_dir: Path, scripts: int, history: int, seed: int) -> dict:
+    """寫入資料集並回傳其大小資訊"""
+    rng = random.Random(seed)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    script_data = generate_scripts(scripts, rng)
+    history_data = generate_history(history, scripts, rng)
+
+    scripts_file = data_dir / "scripts.json"
+    history_file = data_dir / "history.json"
+    scripts_file.write_text(json.dumps(script_data, ensure_ascii=False, indent=2), "utf-8")
+    history_file.write_text(json.dumps(history_data, ensure_ascii=False, indent=2), "utf-8")
+    return {
+        "scripts": scripts,
+        "history": history,
+        "seed": seed,
+        "scripts_bytes": scripts_file.stat().st_size,
+        "history_bytes": history_file.stat().st_size,
+    }
+
+
+def peak_rss_mb() -> float | None:
+    """行程的最大常駐記憶體 (MB)"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 單位為 KB, macOS 為 bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil  # type: ignore[import-not-found]
+
+        info = psutil.Process().memory_info()
+        return float(getattr(info, "peak_wset", info.rss)) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+async def run_load(
+    client, request: Callable, total: int, concurrency: int
+) -> tuple[list[float], float, int]:
+    """
+    以固定併發數送出請求
+
+    Returns:
+        (各請求延遲 ms, 總耗時秒, 非 2xx 回應數)
+    """
+    latencies: list[float] = []
+    failures = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal failures
+        for i in counter:
+            start = time.perf_counter()
+            response = await request(client, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, failures
+
+
+def endpoints(script_count: int, rng: random.Random) -> dict[str, tuple[Callable, int]]:
+    """受測端點: 名稱 -> (請求函數, 請求次數權重)"""
+    check_body = {"content": "move(100, 200)\nsleep(0.5)\nclick()\nundefined_name()\n"}
+
+    def random_id() -> str:
+        return f"script_{rng.randint(1, max(1, script_count))}"
+
+    # 前端輪詢: 帶上次回應的 ETag, 資料未改變時得到 304
+    etags: dict[str, str] = {}
+
+    async def revalidate(client, path: str):
+        response = await client.get(path, headers={"If-None-Match": etags.get(path, "")})
+        etags[path] = response.headers.get("etag", "")
+        return response
+
+    # 批次匯入: 第一次新增, 之後名稱相同而覆寫 (內容不變, 不產生新版本)
+    import_body = "".join(
+        json.dumps({"name": f"bench_import_{n}", "content": f"move({n}, {n})\nclick()\n"}) + "\n"
+        for n in range(100)
+    )
+
+    return {
+        "GET /scripts": (lambda c, i: c.get("/scripts"), 1),
+        "GET /scripts/export": (lambda c, i: c.get("/scripts/export"), 1),
+        "POST /scripts/import (100)": (
+            lambda c, i: c.post(
+                "/scripts/import",
+                content=import_body,
+                headers={"Content-Type": "application/x-ndjson"},
+            ),
+            1,
+        ),
+        "GET /scripts (If-None-Match)": (lambda c, i: revalidate(c, "/scripts"), 10),
+        "GET /scripts/{id}": (lambda c, i: c.get(f"/scripts/{random_id()}"), 10),
+        # 第一次查詢建立索引 (暖機), 之後只讀取查詢詞的索引項
+        "GET /scripts/search": (
+            lambda c, i: c.get("/scripts/search", params={"q": f"click {rng.randint(0, 3839)}"}),
+            10,
+        ),
+        # 執行會寫入歷史記錄並截斷到 MAX_HISTORY_RECORDS 筆, 必須排在 GET /history 之後
+        "GET /history": (lambda c, i: c.get("/history"), 1),
+        "GET /history (If-None-Match)": (lambda c, i: revalidate(c, "/history"), 10),
+        "POST /scripts/{id}/execute": (lambda c, i: c.post(f"/scripts/{random_id()}/execute"), 5),
+        "POST /scripts/check": (lambda c, i: c.post("/scripts/check", json=check_body), 1),
+    }
+
+
+async def bench(args: argparse.Namespace) -> dict[str, dict]:
+    """執行 API 負載測試"""
+    import httpx
+
+    from main import app
+
+    rng = random.Random(args.seed)
+    results: dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://bench") as client,
+    ):
+        for name, (request, weight) in endpoints(args.scripts, rng).items():
+            total = max(1, args.requests * weight // 10)
+            for concurrency in args.concurrency:
+                # 暖機, 排除第一次載入的影響
+                await run_load(client, request, min(3, total), 1)
+                rss_before = peak_rss_mb()
+                latencies, elapsed, failures = await run_load(client, request, total, concurrency)
+                result = summarize(latencies, "ms")
+                result["throughput_rps"] = len(latencies) / elapsed if elapsed > 0 else 0.0
+                result["failures"] = failures
+                result["peak_rss_mb"] = peak_rss_mb()
+                result["rss_growth_mb"] = (
+                    result["peak_rss_mb"] - rss_before
+                    if result["peak_rss_mb"] is not None and rss_before is not None
+                    else None
+                )
+                results[f"api.{name}.c{concurrency}"] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API 負載與延遲基準測試")
+    parser.add_argument("--scripts", type=int, default=10_000, help="腳本數量")
+    parser.add_argument("--history", type=int, default=100_000, help="歷史記錄數量")
+    parser.add_argument("--requests", type=int, default=200, help="每個端點的基本請求數")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[1, 8, 32],
+        help="併發客戶端數, 以逗號分隔 (預設 1,8,32)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="資料集亂數種子")
+    parser.add_argument("--output", type=Path, help="結果 JSON 檔案路徑 (預設輸出到 stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        dataset = write_dataset(data_dir, args.scripts, args.history, args.seed)
+        # 必須在匯入 config.settings 之前設定
+        os.environ["XXSCRIPT_DATA_DIR"] = str(data_dir)
+
+        with quiet():
+            results = asyncio.run(bench(args))
+        results["dataset"] = {"unit": "info", **dataset}
+
+    write_results("api", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
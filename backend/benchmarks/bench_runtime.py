@@ -0,0 +1,452 @@
+"""
+執行期基準測試: 腳本引擎、按鍵監聽器、錄製器
+使用假的 pynput 控制器與監聽器, 可在無桌面環境下執行
+
+用法 (在 backend 目錄下):
+    python -m benchmarks.bench_runtime --output results/runtime.json
+    python -m benchmarks.bench_runtime --quick
+"""
+
+import argparse
+import importlib.util
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.fakes import FakeButton, FakeKey, FakeKeyCode, install_fake_pynput
+
+install_fake_pynput()
+
+from benchmarks.common import quiet, rate, summarize, write_results  # noqa: E402
+from core.compile_cache import CompileCache  # noqa: E402
+from core.engine import COMPILE_VARIANT, ScriptEngine, compile_script  # noqa: E402
+from core.key_listener import KeyListener  # noqa: E402
+from core.recorder import ScriptRecorder  # noqa: E402
+from core.scheduler import Scheduler  # noqa: E402
+from services.history_service import HistoryService  # noqa: E402
+
+_NS_PER_US = 1_000
+
+
+def _new_engine(history_dir: Path, execution_mode: str = "thread") -> ScriptEngine:
+    """建立使用假控制器的引擎, 歷史記錄寫到暫存目錄"""
+    return ScriptEngine(
+        HistoryService(history_dir / "history.json", history_dir / "profiles"), execution_mode
+    )
+
+
+def _wait_idle(engine: ScriptEngine) -> None:
+    """等待腳本執行緒結束"""
+    if engine._execution_thread:
+        engine._execution_thread.join()
+
+
+def bench_execute_start_latency(engine: ScriptEngine, runs: int) -> dict:
+    """execute() 呼叫到腳本第一個 API 呼叫送達控制器的延遲"""
+    samples = []
+    for _ in range(runs):
+        start_ns = time.perf_counter_ns()
+        engine.execute("move(1, 1)", "bench")
+        _wait_idle(engine)
+        samples.append((engine.mouse.last_call_ns - start_ns) / _NS_PER_US)
+    return summarize(samples, "us")
+
+
+def bench_api_call_overhead(engine: ScriptEngine, calls: int) -> dict[str, dict]:
+    """各 API 函數的單次呼叫開銷 (包含狀態檢查與行號更新)"""
+    cases = {
+        "move": lambda: engine.move(10, 20),
+        "click": lambda: engine.click("left"),
+        "press": lambda: engine.press("a", 0),
+        "sleep": lambda: engine.sleep(0),
+    }
+    results = {}
+    for name, call in cases.items():
+        samples = []
+        # 以 100 次為一組計時, 降低計時器本身的開銷
+        batch = 100
+        for _ in range(max(1, calls // batch)):
+            start_ns = time.perf_counter_ns()
+            for _ in range(batch):
+                call()
+            samples.append((time.perf_counter_ns() - start_ns) / batch / _NS_PER_US)
+        results[f"engine.api.{name}.overhead"] = summarize(samples, "us")
+    return results
+
+
+def bench_batch_injection(engine: ScriptEngine, events: int) -> dict[str, dict]:
+    """逐次呼叫 move()/press() 與批次 move_path()/key_sequence() 的事件送出速率"""
+    points = [(i % 3840, i % 2160) for i in range(events)]
+    keys = ["a"] * events
+    results = {}
+
+    start = time.perf_counter()
+    for x, y in points:
+        engine.move(x, y)
+    results["engine.inject.move"] = rate(events, time.perf_counter() - start, "events/s")
+
+    start = time.perf_counter()
+    engine.move_path(points)
+    results["engine.inject.move_path"] = rate(events, time.perf_counter() - start, "events/s")
+
+    start = time.perf_counter()
+    for key in keys:
+        engine.press(key, 0)
+    results["engine.inject.press"] = rate(events, time.perf_counter() - start, "events/s")
+
+    start = time.perf_counter()
+    engine.key_sequence(keys)
+    results["engine.inject.key_sequence"] = rate(events, time.perf_counter() - start, "events/s")
+    return results
+
+
+def bench_glide(engine: ScriptEngine, runs: int) -> dict[str, dict]:
+    """glide() 的影格時間誤差與實際頻率 (120 Hz 與 1000 Hz)"""
+    results = {}
+    for hz in (120, 1000):
+        errors, rates = [], []
+        for i in range(runs):
+            engine.mouse.position = (0, 0)
+            report = engine.glide(1920 - i, 1080, 0.1, "bezier", hz)
+            errors.append(report["mean_error_ms"] * 1000)
+            rates.append(report["hz"])
+        results[f"engine.glide.{hz}hz.frame_error"] = summarize(errors, "us")
+        results[f"engine.glide.{hz}hz.rate"] = summarize(rates, "Hz")
+    return results
+
+
+def bench_screen(engine: ScriptEngine, runs: int) -> dict[str, dict]:
+    """合成畫面上的 pixel() 與 find_image() 耗時 (不含實際螢幕擷取成本)"""
+    import numpy as np
+
+    from core.screen import ScreenReader, SyntheticFramebuffer
+
+    framebuffer = SyntheticFramebuffer(1920, 1080, (30, 30, 30))
+    template = np.random.default_rng(0).integers(0, 255, (32, 48, 3), dtype=np.uint8)
+    framebuffer.paste(template, 1200, 700)
+    engine.screen = ScreenReader(framebuffer, 0.01)
+    results = {}
+
+    samples = []
+    for i in range(runs * 100):
+        start_ns = time.perf_counter_ns()
+        engine.pixel(i % 64, i % 64)
+        samples.append((time.perf_counter_ns() - start_ns) / _NS_PER_US)
+    results["engine.screen.pixel"] = summarize(samples, "us")
+
+    for name, region in (("region_400x300", (1000, 500, 400, 300)), ("full_1080p", None)):
+        samples = []
+        for _ in range(runs):
+            start_ns = time.perf_counter_ns()
+            engine.find_image(template, region)
+            samples.append((time.perf_counter_ns() - start_ns) / 1e6)
+        results[f"engine.screen.find_image.{name}"] = summarize(samples, "ms")
+    return results
+
+
+def bench_compile_cache(cache_dir: Path, lines: int, runs: int) -> dict[str, dict]:
+    """大型錄製腳本的編譯時間: 直接編譯、從磁碟快取載入 (重新啟動後)、記憶體快取命中"""
+    snippets = ["move({i}, {i})", "sleep(0.01)", "press('enter')", "mouse_down('left')"]
+    source = "\n".join(snippets[i % len(snippets)].format(i=i) for i in range(lines))
+
+    def new_cache() -> CompileCache:
+        return CompileCache(cache_dir, compile_script, COMPILE_VARIANT, 16, 16)
+
+    cache = new_cache()
+    cache.get(source)
+    cases = {
+        "compile": lambda: compile_script(source),
+        "disk": lambda: new_cache().get(source),  # 新的實例沒有記憶體快取, 模擬重新啟動
+        "memory": lambda: cache.get(source),
+    }
+    results = {}
+    for name, call in cases.items():
+        samples = []
+        for _ in range(runs):
+            start_ns = time.perf_counter_ns()
+            call()
+            samples.append((time.perf_counter_ns() - start_ns) / 1e6)
+        results[f"engine.compile.{name}_{lines}_lines"] = summarize(samples, "ms")
+    return results
+
+
+def bench_library(lines: int, calls: int) -> dict[str, dict]:
+    """import_script(): 第一次匯入 (編譯並執行函式庫) 與之後每次匯入 (快取命中) 的成本"""
+    helpers = "\n".join(f"def helper_{i}(x):\n    return move(x, {i})" for i in range(lines // 2))
+    engine = ScriptEngine(script_source=lambda ref: ("script_1", helpers))
+    library = engine._get_library()
+
+    start = time.perf_counter()
+    engine.import_script("helpers")
+    first = (time.perf_counter() - start) * 1000
+
+    start_ns = time.perf_counter_ns()
+    for _ in range(calls):
+        engine.import_script("helpers")
+    cached = (time.perf_counter_ns() - start_ns) / calls / _NS_PER_US
+    library.invalidate()
+    return {
+        f"engine.library.first_import_{lines}_lines": {"unit": "ms", "n": 1, "value": first},
+        "engine.library.cached_import": {"unit": "us", "n": calls, "value": cached},
+    }
+
+
+def bench_dry_run(engine: ScriptEngine, actions: int, runs: int) -> dict[str, dict]:
+    """模擬執行: 錄製風格的長腳本 (每個動作之間有等待) 實際花費的時間"""
+    lines = []
+    for i in range(actions // 2):
+        lines.append(f"move({i % 1920}, {i % 1080})")
+        lines.append("click()" if i % 2 else "press('a')")
+        lines.append("sleep(0.5)")
+    source = "\n".join(lines)
+    samples = []
+    for _ in range(runs):
+        start_ns = time.perf_counter_ns()
+        result = engine.dry_run(source)
+        samples.append((time.perf_counter_ns() - start_ns) / 1e6)
+    return {
+        f"engine.dry_run.{actions}_actions": summarize(samples, "ms"),
+        f"engine.dry_run.{actions}_actions_simulated": {
+            "unit": "ms",
+            "n": 1,
+            "value": result["duration_ms"],
+        },
+    }
+
+
+def bench_sleep_jitter(engine: ScriptEngine, runs: int, seconds: float) -> dict:
+    """sleep() 實際睡眠時間與要求時間的誤差"""
+    samples = []
+    for _ in range(runs):
+        start_ns = time.perf_counter_ns()
+        engine.sleep(seconds)
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+        samples.append((elapsed - seconds) * 1e6)
+    return summarize(samples, "us")
+
+
+def bench_stop_reaction(engine: ScriptEngine, runs: int) -> dict:
+    """stop() 呼叫到腳本執行緒結束的時間 (腳本正在長時間 sleep)"""
+    samples = []
+    for _ in range(runs):
+        engine.execute("sleep(60)", "bench")
+        time.sleep(0.02)
+        start_ns = time.perf_counter_ns()
+        engine.stop()
+        _wait_idle(engine)
+        samples.append((time.perf_counter_ns() - start_ns) / _NS_PER_US)
+    return summarize(samples, "us")
+
+
+def bench_pause_reaction(engine: ScriptEngine, runs: int) -> dict:
+    """pause() 呼叫到腳本不再送出輸入的時間 (腳本為連續移動迴圈)"""
+    samples = []
+    for _ in range(runs):
+        engine.execute("while True:\n    move(1, 1)\n", "bench")
+        time.sleep(0.01)
+        start_ns = time.perf_counter_ns()
+        engine.pause()
+        # 等待足夠時間確認腳本已阻塞, 再取最後一次輸入的時間
+        time.sleep(0.05)
+        samples.append(max(0, engine.mouse.last_call_ns - start_ns) / _NS_PER_US)
+        engine.resume()
+        engine.stop()
+        _wait_idle(engine)
+    return summarize(samples, "us")
+
+
+def bench_process_mode(history_dir: Path, runs: int, calls: int) -> dict[str, dict]:
+    """行程模式: 待命工作行程的啟動延遲、API 往返開銷, 以及停止 CPU 密集迴圈的時間"""
+    engine = _new_engine(history_dir, "process")
+    engine.start_workers()
+    results = {}
+    try:
+        # 確認工作行程已就緒, 不把 Python 啟動時間算進啟動延遲
+        engine.execute("pass", "bench")
+        _wait_idle(engine)
+        results["engine.process.start_latency"] = bench_execute_start_latency(engine, runs)
+
+        start = time.perf_counter()
+        engine.execute(f"for i in range({calls}):\n    move(i, 1)\n", "bench")
+        _wait_idle(engine)
+        results["engine.process.api_call_overhead"] = {
+            "unit": "us",
+            "n": calls,
+            "value": (time.perf_counter() - start) / calls * 1e6,
+        }
+
+        samples = []
+        for _ in range(runs // 10 or 1):
+            engine.execute("while True:\n    pass\n", "bench")
+            time.sleep(0.05)
+            start_ns = time.perf_counter_ns()
+            engine.stop()
+            _wait_idle(engine)
+            samples.append((time.perf_counter_ns() - start_ns) / _NS_PER_US)
+        results["engine.process.stop_cpu_loop"] = summarize(samples, "us")
+    finally:
+        engine.shutdown()
+    return results
+
+
+def bench_listener_matching(sizes: list[int], presses: int) -> dict[str, dict]:
+    """KeyListener.on_press/on_release 的處理成本與已註冊熱鍵數量的關係"""
+    results = {}
+    triggered = threading.Event()
+
+    for size in sizes:
+        listener = KeyListener(on_trigger=lambda script_id, content, triggered_at: triggered.set())
+        for i in range(size):
+            listener.register_hotkey(f"ctrl+shift+k{i}", f"script_{i}", "")
+        listener.register_hotkey("ctrl+q", "script_match", "")
+
+        ctrl = FakeKey.ctrl_l
+        miss = FakeKeyCode.from_char("z")
+        hit = FakeKeyCode.from_char("q")
+
+        listener.on_press(ctrl)
+        miss_samples = []
+        for _ in range(presses):
+            start_ns = time.perf_counter_ns()
+            listener.on_press(miss)
+            listener.on_release(miss)
+            miss_samples.append((time.perf_counter_ns() - start_ns) / _NS_PER_US)
+
+        # 命中時會建立執行緒觸發腳本, 次數較少
+        hit_samples = []
+        for _ in range(max(1, presses // 10)):
+            start_ns = time.perf_counter_ns()
+            listener.on_press(hit)
+            listener.on_release(hit)
+            hit_samples.append((time.perf_counter_ns() - start_ns) / _NS_PER_US)
+        listener.on_release(ctrl)
+
+        results[f"listener.on_press.miss.{size}"] = summarize(miss_samples, "us")
+        results[f"listener.on_press.hit.{size}"] = summarize(hit_samples, "us")
+    return results
+
+
+def bench_scheduler(jobs: int, fires: int) -> dict[str, dict]:
+    """排程器: 新增/更新排程的速率, 以及大量排程下到期執行的延遲"""
+    fired: dict[str, float] = {}
+    scheduler = Scheduler(lambda script_id: fired.setdefault(script_id, time.time()) > 0, 5, 1, 60)
+    schedules = [
+        {"type": "interval", "every": 60 + i % 3600}
+        if i % 2
+        else {"type": "cron", "cron": f"{i % 60} {i % 24} * * *"}
+        for i in range(jobs)
+    ]
+
+    start = time.perf_counter()
+    for i, schedule in enumerate(schedules):
+        scheduler.set(f"script_{i}", schedule)
+    results = {"scheduler.set": rate(jobs, time.perf_counter() - start, "ops/s")}
+    start = time.perf_counter()
+    for i, schedule in enumerate(schedules):
+        scheduler.set(f"script_{i}", schedule)
+    results["scheduler.update"] = rate(jobs, time.perf_counter() - start, "ops/s")
+
+    # 在已有大量排程時, 加入 0.5 秒內陸續到期的一次性排程
+    now = datetime.now()
+    due = {}
+    for i in range(fires):
+        at = now + timedelta(seconds=0.1 + 0.4 * i / fires)
+        due[f"at_{i}"] = at.timestamp()
+        scheduler.set(f"at_{i}", {"type": "at", "at": at})
+    scheduler.start()
+    deadline = time.time() + 2
+    while len(fired) < fires and time.time() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+    samples = [(fired[key] - due[key]) * 1000 for key in due if key in fired]
+    results[f"scheduler.fire_lateness_{jobs}_jobs"] = summarize(samples, "ms")
+    return results
+
+
+def bench_recorder_ingest(events: int) -> dict[str, dict]:
+    """錄製器回呼的事件處理速率"""
+    recorder = ScriptRecorder()
+    results = {}
+
+    recorder.start_recording()
+    # 大幅移動: 每次都新增事件
+    start = time.perf_counter()
+    for i in range(events):
+        recorder.on_mouse_move((i * 37) % 4000, (i * 53) % 2000)
+    results["recorder.ingest.mouse_move"] = rate(events, time.perf_counter() - start, "events/s")
+
+    # 小幅移動: 與上一個事件合併
+    start = time.perf_counter()
+    for i in range(events):
+        recorder.on_mouse_move(100 + i % 3, 100)
+    results["recorder.ingest.mouse_move_coalesced"] = rate(
+        events, time.perf_counter() - start, "events/s"
+    )
+
+    key = FakeKeyCode.from_char("a")
+    start = time.perf_counter()
+    for _ in range(events // 2):
+        recorder.on_key_press(key)
+        recorder.on_key_release(key)
+    results["recorder.ingest.key"] = rate(events, time.perf_counter() - start, "events/s")
+
+    start = time.perf_counter()
+    for _ in range(events // 2):
+        recorder.on_mouse_click(10, 10, FakeButton.left, True)
+        recorder.on_mouse_click(10, 10, FakeButton.left, False)
+    results["recorder.ingest.click"] = rate(events, time.perf_counter() - start, "events/s")
+
+    start = time.perf_counter()
+    recorder.stop_recording()
+    results["recorder.generate_script"] = {
+        "unit": "ms",
+        "n": len(recorder.events),
+        "value": (time.perf_counter() - start) * 1000,
+    }
+    return results
+
+
+def run(quick: bool = False) -> dict[str, dict]:
+    """執行所有執行期基準測試"""
+    scale = 10 if quick else 1
+    results: dict[str, dict] = {}
+
+    with tempfile.TemporaryDirectory() as tmp, quiet():
+        engine = _new_engine(Path(tmp))
+
+        results["engine.execute.start_latency"] = bench_execute_start_latency(engine, 200 // scale)
+        results.update(bench_api_call_overhead(engine, 20_000 // scale))
+        results.update(bench_batch_injection(engine, 100_000 // scale))
+        # glide() 與螢幕 API 需要 numpy, 未安裝時略過
+        if importlib.util.find_spec("numpy") is not None:
+            results.update(bench_glide(engine, 20 // scale))
+            results.update(bench_screen(engine, 20 // scale))
+        results.update(bench_compile_cache(Path(tmp) / "compiled", 5_000, 20 // scale))
+        results.update(bench_library(2_000, 20_000 // scale))
+        results.update(bench_dry_run(engine, 10_000, 10 // scale))
+        results["engine.sleep.jitter_10ms"] = bench_sleep_jitter(engine, 100 // scale, 0.01)
+        results["engine.stop.reaction"] = bench_stop_reaction(engine, 20 // scale)
+        results["engine.pause.reaction"] = bench_pause_reaction(engine, 20 // scale)
+        results.update(bench_process_mode(Path(tmp), 200 // scale, 20_000 // scale))
+
+        sizes = [10, 100, 1_000] if quick else [10, 100, 1_000, 10_000]
+        results.update(bench_listener_matching(sizes, 2_000 // scale))
+        results.update(bench_recorder_ingest(200_000 // scale))
+        results.update(bench_scheduler(20_000 // scale, 200 // scale))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="引擎、監聽器與錄製器的延遲/吞吐量基準測試")
+    parser.add_argument("--output", type=Path, help="結果 JSON 檔案路徑 (預設輸出到 stdout)")
+    parser.add_argument("--quick", action="store_true", help="減少次數, 快速檢查")
+    args = parser.parse_args()
+
+    write_results("runtime", run(args.quick), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+冷啟動基準測試
+以正式模式 (--prod) 啟動後端行程, 量測從建立行程到 /ready 回應 200 的時間,
+以及服務自行回報的各啟動階段時間 (使用假的 pynput, 資料目錄為暫存目錄)
+
+用法 (在 backend 目錄下):
+    python -m benchmarks.bench_startup --output results/startup.json
+    python -m benchmarks.bench_startup --runs 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from benchmarks.common import summarize, write_results
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 在子行程中安裝假的 pynput 後, 以 __main__ 身分執行 main.py
+_LAUNCHER = """
+import runpy, sys
+from benchmarks.fakes import install_fake_pynput
+install_fake_pynput()
+sys.argv = ["main.py", "--prod", "--port", sys.argv[1]]
+runpy.run_path("main.py", run_name="__main__")
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _wait_ready(port: int, process: subprocess.Popen, timeout: float) -> dict:
+    """輪詢 /ready 直到回應 200, 返回回報內容"""
+    url = f"http://127.0.0.1:{port}/ready"
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"後端行程提前結束, 結束代碼 {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                report: dict = json.load(response)
+                return report
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.005)
+    raise TimeoutError("等待 /ready 逾時")
+
+
+def measure_once(data_dir: Path, timeout: float) -> tuple[float, dict]:
+    """啟動一次後端, 返回 (到就緒的牆鐘時間 毫秒, /ready 回報)"""
+    port = _free_port()
+    env = dict(os.environ, XXSCRIPT_DATA_DIR=str(data_dir), XXSCRIPT_LOG_DIR=str(data_dir))
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _LAUNCHER, str(port)],
+        cwd=_BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        report = _wait_ready(port, process, timeout)
+        return (time.perf_counter() - start) * 1000, report
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run(runs: int, timeout: float) -> dict[str, dict]:
+    wall, reported = [], []
+    phases: dict[str, list[float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(runs):
+            elapsed, report = measure_once(Path(tmp), timeout)
+            wall.append(elapsed)
+            reported.append(report["startup_ms"])
+            for phase, value in report["phases"].items():
+                phases.setdefault(phase, []).append(value)
+
+    results = {
+        "startup.process_to_ready": summarize(wall, "ms"),
+        "startup.reported": summarize(reported, "ms"),
+    }
+    for phase, samples in phases.items():
+        results[f"startup.phase.{phase}"] = summarize(samples, "ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="後端冷啟動時間基準測試")
+    parser.add_argument("--output", type=Path, help="結果 JSON 檔案路徑 (預設輸出到 stdout)")
+    parser.add_argument("--runs", type=int, default=10, help="啟動次數")
+    parser.add_argument("--timeout", type=float, default=30.0, help="單次啟動逾時 (秒)")
+    args = parser.parse_args()
+
+    write_results("startup", run(args.runs, args.timeout), args.output)
+
+
+if __name__ == "__main__":
+    main()
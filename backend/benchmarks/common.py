@@ -0,0 +1,81 @@
+"""
+基準測試共用工具
+統計計算、結果輸出 (JSON) 與執行環境資訊
+"""
+
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+
+def summarize(samples: list[float], unit: str) -> dict:
+    """計算樣本的統計值 (平均、百分位數、極值)"""
+    ordered = sorted(samples)
+    n = len(ordered)
+    if n == 0:
+        return {"unit": unit, "n": 0}
+
+    def percentile(p: float) -> float:
+        index = min(n - 1, max(0, round(p / 100 * (n - 1))))
+        return ordered[index]
+
+    return {
+        "unit": unit,
+        "n": n,
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if n > 1 else 0.0,
+        "min": ordered[0],
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "max": ordered[-1],
+    }
+
+
+def rate(count: int, seconds: float, unit: str) -> dict:
+    """計算吞吐量"""
+    return {"unit": unit, "n": count, "value": count / seconds if seconds > 0 else 0.0}
+
+
+def environment() -> dict:
+    """取得執行環境資訊, 便於比較不同次執行的結果"""
+    commit = None
+    with contextlib.suppress(Exception):
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+    }
+
+
+def write_results(suite: str, results: dict[str, dict], output: Path | None) -> dict:
+    """輸出結果 (未指定檔案時輸出到 stdout)"""
+    report = {"suite": suite, "meta": environment(), "results": results}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(text, encoding="utf-8")
+        print(f"結果已寫入 {output}", file=sys.stderr)
+    else:
+        print(text)
+    return report
+
+
+@contextlib.contextmanager
+def quiet():
+    """隱藏受測程式碼的 print 輸出, 避免干擾計時與結果"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
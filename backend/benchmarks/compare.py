@@ -0,0 +1,90 @@
+"""
+比較兩次基準測試結果
+以 p50 (或吞吐量 value) 計算變化比例, 超過門檻者標示為退步
+
+用法 (在 backend 目錄下):
+    python -m benchmarks.compare results/base.json results/new.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# 數值越大越好的單位 (吞吐量), 其餘單位 (時間) 越小越好
+_HIGHER_IS_BETTER = {"events/s", "req/s", "ops/s", "Hz"}
+
+
+def _metric(result: dict) -> float | None:
+    """取得用於比較的代表值"""
+    if "p50" in result:
+        return float(result["p50"])
+    if "value" in result:
+        return float(result["value"])
+    return None
+
+
+def compare(base: dict, new: dict, threshold: float) -> tuple[list[dict], bool]:
+    """
+    比較兩份結果
+
+    Returns:
+        (各指標的比較列表, 是否有退步)
+    """
+    rows = []
+    regressed = False
+    for name, new_result in sorted(new["results"].items()):
+        base_result = base["results"].get(name)
+        if base_result is None:
+            continue
+        before, after = _metric(base_result), _metric(new_result)
+        if before is None or after is None or before == 0:
+            continue
+
+        change = (after - before) / before
+        if new_result.get("unit") in _HIGHER_IS_BETTER:
+            change = -change
+        is_regression = change > threshold
+        regressed = regressed or is_regression
+        rows.append(
+            {
+                "name": name,
+                "unit": new_result.get("unit"),
+                "before": before,
+                "after": after,
+                "change": change,
+                "regression": is_regression,
+            }
+        )
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比較兩次基準測試結果")
+    parser.add_argument("base", type=Path, help="基準結果 JSON")
+    parser.add_argument("new", type=Path, help="新結果 JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="視為退步的變化比例 (預設 0.1 = 10%%)"
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出比較結果")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    rows, regressed = compare(base, new, args.threshold)
+
+    if args.json:
+        print(json.dumps({"rows": rows, "regressed": regressed}, ensure_ascii=False, indent=2))
+    else:
+        for row in rows:
+            mark = "退步" if row["regression"] else ""
+            print(
+                f"{row['name']:<48} {row['before']:>14.3f} -> {row['after']:>14.3f} "
+                f"{row['unit']:<9} {row['change']:+8.1%} {mark}"
+            )
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
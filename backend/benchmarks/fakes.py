@@ -0,0 +1,203 @@
+"""
+假的 pynput 模組
+在無桌面環境 (CI、伺服器) 下執行基準測試, 不會真的移動滑鼠或按鍵
+必須在匯入 core 模組之前呼叫 install_fake_pynput()
+"""
+
+import enum
+import sys
+import time
+import types
+
+
+class FakeKey(enum.Enum):
+    """對應 pynput.keyboard.Key 的常用特殊鍵"""
+
+    alt = "alt"
+    alt_l = "alt_l"
+    alt_r = "alt_r"
+    alt_gr = "alt_gr"
+    backspace = "backspace"
+    caps_lock = "caps_lock"
+    cmd = "cmd"
+    cmd_l = "cmd_l"
+    cmd_r = "cmd_r"
+    ctrl = "ctrl"
+    ctrl_l = "ctrl_l"
+    ctrl_r = "ctrl_r"
+    delete = "delete"
+    down = "down"
+    end = "end"
+    enter = "enter"
+    esc = "esc"
+    home = "home"
+    insert = "insert"
+    left = "left"
+    menu = "menu"
+    num_lock = "num_lock"
+    page_down = "page_down"
+    page_up = "page_up"
+    pause = "pause"
+    print_screen = "print_screen"
+    right = "right"
+    scroll_lock = "scroll_lock"
+    shift = "shift"
+    shift_l = "shift_l"
+    shift_r = "shift_r"
+    space = "space"
+    tab = "tab"
+    up = "up"
+    media_play_pause = "media_play_pause"
+    media_volume_mute = "media_volume_mute"
+    media_volume_down = "media_volume_down"
+    media_volume_up = "media_volume_up"
+    media_previous = "media_previous"
+    media_next = "media_next"
+    f1 = "f1"
+    f2 = "f2"
+    f3 = "f3"
+    f4 = "f4"
+    f5 = "f5"
+    f6 = "f6"
+    f7 = "f7"
+    f8 = "f8"
+    f9 = "f9"
+    f10 = "f10"
+    f11 = "f11"
+    f12 = "f12"
+    f13 = "f13"
+    f14 = "f14"
+    f15 = "f15"
+    f16 = "f16"
+    f17 = "f17"
+    f18 = "f18"
+    f19 = "f19"
+    f20 = "f20"
+
+
+class FakeButton(enum.Enum):
+    """對應 pynput.mouse.Button"""
+
+    unknown = 0
+    left = 1
+    middle = 2
+    right = 3
+    x1 = 8
+    x2 = 9
+
+
+class FakeKeyCode:
+    """對應 pynput.keyboard.KeyCode (一般字元鍵)"""
+
+    def __init__(self, char: str | None = None, vk: int | None = None):
+        self.char = char
+        self.vk = vk
+
+    @classmethod
+    def from_char(cls, char: str) -> "FakeKeyCode":
+        return cls(char=char)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeKeyCode) and other.char == self.char
+
+    def __hash__(self):
+        return hash(self.char)
+
+
+class FakeMouseController:
+    """記錄呼叫時間的滑鼠控制器"""
+
+    def __init__(self):
+        self._position = (0, 0)
+        self.calls = 0
+        self.last_call_ns = 0
+
+    def _record(self):
+        self.calls += 1
+        self.last_call_ns = time.perf_counter_ns()
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._record()
+        self._position = (int(value[0]), int(value[1]))
+
+    def move(self, dx, dy):
+        self._record()
+        self._position = (self._position[0] + int(dx), self._position[1] + int(dy))
+
+    def click(self, button, count=1):
+        self._record()
+
+    def press(self, button):
+        self._record()
+
+    def release(self, button):
+        self._record()
+
+    def scroll(self, dx, dy):
+        self._record()
+
+
+class FakeKeyboardController:
+    """記錄呼叫時間的鍵盤控制器"""
+
+    def __init__(self):
+        self.calls = 0
+        self.last_call_ns = 0
+
+    def _record(self):
+        self.calls += 1
+        self.last_call_ns = time.perf_counter_ns()
+
+    def press(self, key):
+        self._record()
+
+    def release(self, key):
+        self._record()
+
+    def type(self, text):
+        for _ in text:
+            self._record()
+
+
+class FakeListener:
+    """不掛載系統掛鉤的監聽器, 事件由基準測試直接呼叫回呼注入"""
+
+    def __init__(self, **callbacks):
+        self.callbacks = callbacks
+        self.running = False
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def join(self, timeout=None):
+        pass
+
+
+def install_fake_pynput() -> None:
+    """以假模組取代 sys.modules 中的 pynput (必須在匯入 core 模組之前呼叫)"""
+    keyboard = types.ModuleType("pynput.keyboard")
+    keyboard.Key = FakeKey  # type: ignore[attr-defined]
+    keyboard.KeyCode = FakeKeyCode  # type: ignore[attr-defined]
+    keyboard.Controller = FakeKeyboardController  # type: ignore[attr-defined]
+    keyboard.Listener = FakeListener  # type: ignore[attr-defined]
+
+    mouse = types.ModuleType("pynput.mouse")
+    mouse.Button = FakeButton  # type: ignore[attr-defined]
+    mouse.Controller = FakeMouseController  # type: ignore[attr-defined]
+    mouse.Listener = FakeListener  # type: ignore[attr-defined]
+
+    pynput = types.ModuleType("pynput")
+    pynput.keyboard = keyboard  # type: ignore[attr-defined]
+    pynput.mouse = mouse  # type: ignore[attr-defined]
+
+    sys.modules["pynput"] = pynput
+    sys.modules["pynput.keyboard"] = keyboard
+    sys.modules["pynput.mouse"] = mouse
@@ -0,0 +1,200 @@
+"""
+日誌配置
+所有日誌先經由 QueueHandler 放入佇列 (呼叫端只做入列, 不做任何 I/O),
+再由背景 QueueListener 執行緒寫到主控台、輪替日誌檔與前端主控台面板
+"""
+
+import json
+import logging
+import queue
+import sys
+import threading
+from collections.abc import Callable
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from config.settings import (
+    LOG_DIR,
+    LOG_FILE_BACKUP_COUNT,
+    LOG_FILE_MAX_BYTES,
+    LOG_LEVEL,
+    LOG_WS_INTERVAL,
+    LOG_WS_LEVEL,
+    LOG_WS_MAX_BATCH,
+)
+
+# 目前的執行 ID (由腳本執行緒設定), 用於串連同一次執行的所有日誌
+run_id_var: ContextVar[str | None] = ContextVar("run_id", default=None)
+
+_TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(name)s] %(run_tag)s%(message)s"
+
+_listener: QueueListener | None = None
+
+
+class _ContextFilter(logging.Filter):
+    """在入列前 (呼叫端執行緒) 附加執行 ID"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        run_id = run_id_var.get()
+        record.run_id = run_id
+        record.run_tag = f"[run={run_id[:8]}] " if run_id else ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每筆記錄輸出為一行 JSON, 方便日誌檔以工具搜尋與解析"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "run_id": getattr(record, "run_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class WebSocketLogHandler(logging.Handler):
+    """
+    將日誌推送到前端主控台
+    在 QueueListener 執行緒中累積記錄, 由單一背景執行緒每個間隔合併為一則訊息投遞,
+    避免腳本大量輸出時逐筆廣播拖垮 WebSocket 連線
+    """
+
+    def __init__(
+        self,
+        post: Callable[[dict], bool],
+        level: int | str = LOG_WS_LEVEL,
+        interval: float = LOG_WS_INTERVAL,
+        max_batch: int = LOG_WS_MAX_BATCH,
+    ):
+        """
+        Args:
+            post: 投遞訊息的函數 (例如 event_bus.post)
+            interval: 合併間隔 (秒)
+            max_batch: 單一間隔內保留的最多筆數
+        """
+        super().__init__(level)
+        self._post = post
+        self._interval = interval
+        self._max_batch = max_batch
+        self._pending: list[dict] = []
+        self._dropped = 0
+        # 有新記錄時喚醒送出執行緒 (第一筆記錄時才啟動, 之後一直存在直到關閉)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        entry = {
+            "time": record.created,
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "run_id": getattr(record, "run_id", None),
+            "message": record.getMessage(),
+        }
+        with self.lock:  # type: ignore[union-attr]
+            was_empty = not self._pending
+            self._pending.append(entry)
+            if len(self._pending) > self._max_batch:
+                del self._pending[0]
+                self._dropped += 1
+            if self._flusher is None and not self._stopping.is_set():
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="log-ws-flush", daemon=True
+                )
+                self._flusher.start()
+        if was_empty:
+            self._wakeup.set()
+
+    def _flush_loop(self) -> None:
+        """等到有記錄後再等待一個間隔, 將期間累積的記錄合併送出"""
+        while not self._stopping.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # 關閉時提前結束等待, 剩餘的記錄由 close() 送出
+            if self._stopping.wait(self._interval):
+                return
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:  # type: ignore[union-attr]
+            records, dropped = self._pending, self._dropped
+            self._pending, self._dropped = [], 0
+        if records:
+            self._post({"type": "log", "data": {"records": records, "dropped": dropped}})
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        with self.lock:  # type: ignore[union-attr]
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join(timeout=1.0)
+        self.flush()
+        super().close()
+
+
+def setup_logging(ws_post: Callable[[dict], bool] | None = None) -> None:
+    """
+    設定根日誌記錄器並啟動背景寫入執行緒 (重複呼叫時不會重複設定)
+
+    Args:
+        ws_post: 推送日誌到前端的函數, 未提供時不推送
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(_TEXT_FORMAT, "%H:%M:%S"))
+    handlers: list[logging.Handler] = [console]
+
+    try:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            LOG_DIR / "xxscript.log",
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    except OSError:
+        # 無法寫入日誌目錄時仍保留主控台輸出
+        pass
+
+    if ws_post is not None:
+        handlers.append(WebSocketLogHandler(ws_post))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """停止背景寫入執行緒, 送出佇列中剩餘的日誌"""
+    global _listener
+    if _listener is None:
+        return
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -3,18 +3,29 @@
 集中管理所有應用配置
 """
 
+import os
 from pathlib import Path
 
 # 基礎路徑
 BASE_DIR = Path(__file__).parent.parent
-SCRIPTS_DIR = BASE_DIR / "scripts"
+# 資料目錄可透過環境變數 XXSCRIPT_DATA_DIR 指定 (例如基準測試使用暫存目錄)
+SCRIPTS_DIR = Path(os.environ.get("XXSCRIPT_DATA_DIR", BASE_DIR / "scripts"))
 HISTORY_FILE = SCRIPTS_DIR / "history.json"
 SCRIPTS_FILE = SCRIPTS_DIR / "scripts.json"
+PROFILES_DIR = SCRIPTS_DIR / "profiles"  # 效能分析報告, 每次執行一個檔案
+COMPILE_CACHE_DIR = SCRIPTS_DIR / "compiled"  # 編譯後的腳本 (marshal), 重新啟動後直接載入
+VERSIONS_DIR = SCRIPTS_DIR / "versions"  # 腳本版本歷史 (內容定址 + 差異壓縮)
+SCHEDULER_STATE_FILE = SCRIPTS_DIR / "scheduler_state.json"  # 各排程最後執行時間 (重新啟動後補執行)
 
 # API 配置
 API_TITLE = "XXScript Backend"
 API_HOST = "127.0.0.1"
-API_PORT = 8000
+API_PORT = int(os.environ.get("XXSCRIPT_PORT", "8000"))
+# 正式模式 (也可用 python main.py --prod 指定): 不啟用自動重新載入與存取日誌
+API_PRODUCTION = os.environ.get("XXSCRIPT_PROD", "").lower() in ("1", "true", "yes")
+API_GZIP_MIN_SIZE = 1024  # 回應本文超過此大小 (位元組) 且用戶端支援時以 gzip 壓縮
+API_NDJSON_CHUNK_SIZE = 64 * 1024  # NDJSON 匯出時每次送出的資料量 (位元組)
+API_NDJSON_IMPORT_BATCH = 500  # NDJSON 匯入時每批交給匯入函數的記錄數
 
 # CORS 配置
 CORS_ORIGINS = ["*"]
@@ -22,12 +33,58 @@ CORS_CREDENTIALS = True
 CORS_METHODS = ["*"]
 CORS_HEADERS = ["*"]
 
+# WebSocket 配置
+WS_SEND_QUEUE_SIZE = 256  # 每個連線的待發送訊息上限, 超過即視為慢速客戶端並中斷
+WS_SEND_TIMEOUT = 2.0  # 單一訊息的發送逾時 (秒)
+
 # 歷史記錄配置
 MAX_HISTORY_RECORDS = 100
 
+# 資料檔配置
+# 查詢版本 (產生 ETag) 時沿用記憶體中的版本, 距上次檢查檔案超過此秒數才重新檢查是否被外部修改
+STORAGE_RECHECK_INTERVAL = 1.0
+
+# 版本歷史配置
+VERSION_KEYFRAME_INTERVAL = 16  # 每隔多少個版本存一份完整內容 (讀取舊版本最多套用的差異數)
+
+# 引擎配置
+ENGINE_COMPILE_CACHE_ENTRIES = 256  # 記憶體中保留的已編譯腳本數
+ENGINE_COMPILE_CACHE_FILES = 5000  # 磁碟上保留的編譯快取檔案數, 超過時刪除最久未使用的
+ENGINE_STATUS_INTERVAL = 0.016  # 行號狀態推送的最小間隔 (秒), 約一個畫面更新週期
+# 腳本執行模式: thread (API 行程內的執行緒) 或 process (待命的工作行程, 停止時強制結束)
+ENGINE_EXECUTION_MODE = os.environ.get("XXSCRIPT_EXECUTION_MODE", "thread")
+ENGINE_WORKER_POOL_SIZE = 1  # 行程模式下保持待命的工作行程數
+ENGINE_WORKER_MAX_RUNS = 100  # 工作行程執行多少次腳本後替換 (避免腳本殘留的模組狀態累積)
+ENGINE_WORKER_START_TIMEOUT = 10.0  # 等待背景啟動中的工作行程就緒的最長時間 (秒)
+ENGINE_BATCH_CHUNK = 64  # 批次 API 每送出多少個事件檢查一次停止/暫停
+ENGINE_BATCH_MAX_LAG = 0.05  # 批次 API 落後排程超過此值 (秒, 例如暫停後) 時重新對齊, 不瞬間補送
+ENGINE_GLIDE_HZ = 120  # glide() 預設影格頻率
+ENGINE_GLIDE_MAX_HZ = 1000  # glide() 影格頻率上限
+# 螢幕擷取後端: mss (實際螢幕) 或 synthetic (合成畫面, 供無桌面環境測試)
+ENGINE_SCREEN_BACKEND = os.environ.get("XXSCRIPT_SCREEN_BACKEND", "mss")
+ENGINE_SCREEN_TICK = 0.01  # 同一時間片 (秒) 內的螢幕讀取共用同一張擷取畫面
+ENGINE_SCREEN_POLL = 0.05  # wait_pixel()/wait_image() 的預設輪詢間隔 (秒)
+ENGINE_MATCH_TOLERANCE = 8.0  # 影像/顏色比對預設可接受的誤差 (0-255)
+ENGINE_DRY_RUN_MAX_ACTIONS = 100_000  # 模擬執行最多記錄的動作數
+ENGINE_DRY_RUN_MAX_SECONDS = 24 * 3600.0  # 模擬執行的虛擬時間上限 (秒)
+ENGINE_DRY_RUN_TIMEOUT = 10.0  # 模擬執行的實際時間上限 (秒)
+
+# 排程配置
+SCHEDULER_MIN_INTERVAL = 1.0  # interval 排程的最小間隔 (秒)
+SCHEDULER_MISFIRE_GRACE = 5.0  # 到期超過此秒數才輪到執行 (例如系統休眠後) 視為錯過
+SCHEDULER_RETRY_INTERVAL = 1.0  # run_once 排程遇到引擎忙碌時的重試間隔 (秒)
+SCHEDULER_MAX_SLEEP = 60.0  # 排程執行緒最長睡眠時間 (秒), 系統時間被調整後最遲在此時間內重新對齊
+
 # 錄製配置
 RECORDER_MIN_DELAY = 0.05  # 最小延遲閾值 (秒)
 RECORDER_MOVE_THRESHOLD = 10  # 滑鼠移動距離閾值 (像素)
+RECORDER_STREAM_INTERVAL = 0.05  # 即時串流推送間隔 (秒), 同一間隔內的事件合併為一批
 
-# 確保目錄存在
-SCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
+# 日誌配置
+LOG_DIR = Path(os.environ.get("XXSCRIPT_LOG_DIR", BASE_DIR / "logs"))
+LOG_LEVEL = os.environ.get("XXSCRIPT_LOG_LEVEL", "INFO").upper()
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024  # 單一日誌檔上限, 超過即輪替
+LOG_FILE_BACKUP_COUNT = 3  # 保留的輪替檔數量
+LOG_WS_LEVEL = "INFO"  # 推送到前端主控台的最低等級
+LOG_WS_INTERVAL = 0.1  # 推送到前端的合併間隔 (秒)
+LOG_WS_MAX_BATCH = 500  # 單一間隔內最多推送的筆數, 超過的舊記錄捨棄並計數
@@ -0,0 +1,171 @@
+"""
+腳本編譯快取
+以 marshal 將編譯後的程式碼物件保存到磁碟, 重新啟動後不需再次解析與編譯
+快取鍵為 (編譯流程版本 + 腳本內容) 的 SHA-256, 檔案依直譯器版本分目錄存放,
+檔頭記錄 bytecode 版本 (importlib MAGIC_NUMBER), 不符或損毀時捨棄並重新編譯
+"""
+
+import contextlib
+import hashlib
+import importlib.util
+import logging
+import marshal
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from types import CodeType
+
+from core.metrics import COMPILE_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = importlib.util.MAGIC_NUMBER
+_SUFFIX = ".bin"
+
+
+class CompileCache:
+    """兩層 (記憶體 LRU + 磁碟) 的編譯結果快取"""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        compile_fn: Callable[[str], CodeType],
+        variant: str,
+        memory_entries: int,
+        max_files: int,
+    ):
+        """
+        Args:
+            cache_dir: 快取根目錄 (實際檔案放在以直譯器標籤命名的子目錄)
+            compile_fn: 編譯函數 (包含編譯前的檢查與轉換), 失敗時拋出例外且不快取
+            variant: 編譯流程版本, 檢查或轉換改變時必須更新, 讓舊的快取失效
+            memory_entries: 記憶體中保留的程式碼物件數
+            max_files: 磁碟上保留的快取檔案數 (超過時刪除最久未使用的)
+        """
+        self.directory = cache_dir / sys.implementation.cache_tag
+        self._compile = compile_fn
+        self._variant = variant.encode()
+        self._memory_entries = memory_entries
+        self._max_files = max_files
+        self._memory: OrderedDict[str, CodeType] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dir_ready = False
+
+    def key(self, source: str) -> str:
+        """快取鍵"""
+        return hashlib.sha256(self._variant + b"\0" + source.encode()).hexdigest()
+
+    def get(self, source: str) -> CodeType:
+        """
+        取得腳本的程式碼物件 (記憶體 -> 磁碟 -> 重新編譯)
+
+        Raises:
+            編譯函數拋出的例外 (語法錯誤、未知的按鍵名稱等)
+        """
+        key = self.key(source)
+        with self._lock:
+            code = self._memory.get(key)
+            if code is not None:
+                self._memory.move_to_end(key)
+        if code is not None:
+            COMPILE_CACHE_LOOKUPS.inc(labels=("memory",))
+            return code
+
+        code = self._load(key)
+        if code is not None:
+            COMPILE_CACHE_LOOKUPS.inc(labels=("disk",))
+        else:
+            COMPILE_CACHE_LOOKUPS.inc(labels=("miss",))
+            code = self._compile(source)
+            self._store(key, code)
+        self._remember(key, code)
+        return code
+
+    def warm(self, sources: Iterable[str]) -> int:
+        """
+        預先載入 (或編譯並寫入) 多個腳本, 並清除超出上限的舊快取檔案
+
+        Returns:
+            成功載入的腳本數 (無法編譯的腳本略過, 執行時才回報錯誤)
+        """
+        loaded = 0
+        for source in sources:
+            try:
+                self.get(source)
+            except Exception:
+                continue
+            loaded += 1
+        self.prune()
+        return loaded
+
+    def prune(self) -> None:
+        """刪除超出上限、最久未使用的快取檔案"""
+        try:
+            files = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(self.directory)]
+        except OSError:
+            return
+        if len(files) <= self._max_files:
+            return
+        files.sort()
+        for _, path in files[: len(files) - self._max_files]:
+            with contextlib.suppress(OSError):
+                Path(path).unlink()
+
+    def clear(self) -> None:
+        """清除記憶體與磁碟上的所有快取"""
+        with self._lock:
+            self._memory.clear()
+        with contextlib.suppress(OSError):
+            for entry in os.scandir(self.directory):
+                with contextlib.suppress(OSError):
+                    Path(entry.path).unlink()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def _remember(self, key: str, code: CodeType) -> None:
+        with self._lock:
+            self._memory[key] = code
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> CodeType | None:
+        """從磁碟載入並驗證, 版本不符或損毀的檔案直接刪除"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        code = None
+        if data[: len(_MAGIC)] == _MAGIC:
+            with contextlib.suppress(Exception):
+                code = marshal.loads(data[len(_MAGIC) :])
+        if not isinstance(code, CodeType):
+            logger.debug("捨棄無效的編譯快取: %s", path.name)
+            with contextlib.suppress(OSError):
+                path.unlink()
+            return None
+        # 更新修改時間, 清除舊檔時視為最近使用
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return code
+
+    def _store(self, key: str, code: CodeType) -> None:
+        """寫入磁碟 (先寫暫存檔再取代, 其他執行緒或行程不會讀到不完整的檔案)"""
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            if not self._dir_ready:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._dir_ready = True
+            tmp.write_bytes(_MAGIC + marshal.dumps(code))
+            tmp.replace(path)
+        except OSError as e:
+            # 無法寫入快取不影響執行
+            logger.debug("無法寫入編譯快取: %s", e)
+            with contextlib.suppress(OSError):
+                tmp.unlink()
@@ -0,0 +1,110 @@
+"""
+Cron 表示式
+標準五欄格式: 分 時 日 月 星期 (星期 0 與 7 皆為星期日)
+每欄支援 *、數字、範圍 a-b、間隔 */n 或 a-b/n, 以及逗號分隔的列表
+"""
+
+from datetime import datetime, timedelta
+
+# (名稱, 最小值, 最大值)
+_FIELDS = (
+    ("分", 0, 59),
+    ("時", 0, 23),
+    ("日", 1, 31),
+    ("月", 1, 12),
+    ("星期", 0, 7),
+)
+
+# 搜尋下一次執行時間的上限 (涵蓋 2/29 這類每四年才出現一次的組合)
+_SEARCH_YEARS = 5
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ValueError(f"cron {name}欄位的間隔錯誤: {text}")
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise ValueError(f"cron {name}欄位格式錯誤: {text}")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = int(part)
+            # 單一數值加上間隔 (例如 5/15) 表示從該值開始到最大值
+            end = high if step > 1 else start
+        else:
+            raise ValueError(f"cron {name}欄位格式錯誤: {text}")
+        if not (low <= start <= end <= high):
+            raise ValueError(f"cron {name}欄位超出範圍 {low}-{high}: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """已解析的 cron 表示式"""
+
+    __slots__ = ("_dom_any", "_dow_any", "days", "hours", "minutes", "months", "text", "weekdays")
+
+    def __init__(self, text: str):
+        """
+        Raises:
+            ValueError: 格式錯誤
+        """
+        fields = text.split()
+        if len(fields) != len(_FIELDS):
+            raise ValueError(f"cron 表示式需要 5 個欄位 (分 時 日 月 星期): {text}")
+        parsed = [
+            _parse_field(field, name, low, high)
+            for field, (name, low, high) in zip(fields, _FIELDS, strict=True)
+        ]
+        self.text = text
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 星期 7 等同 0 (星期日); 轉為 Python 的 weekday (星期一 = 0)
+        self.weekdays = frozenset((day - 1) % 7 for day in weekdays)
+        # 日與星期皆不以 * 開頭時, 符合任一即可; 任一欄以 * 開頭 (例如 */2) 時兩者都需符合
+        # (與標準 cron 相同)
+        self._dom_any = fields[2].startswith("*")
+        self._dow_any = fields[4].startswith("*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        dom = moment.day in self.days
+        dow = moment.weekday() in self.weekdays
+        if self._dom_any or self._dow_any:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        moment 之後 (不含) 的下一個符合時間 (精確到分)
+
+        Raises:
+            ValueError: 沒有符合的時間 (例如 2 月 30 日)
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment.replace(year=moment.year + _SEARCH_YEARS, month=1, day=1)
+        # 逐欄跳過不符合的範圍: 月不符跳到下個月, 日不符跳到隔天, 依此類推
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(
+                    year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"cron 表示式沒有符合的時間: {self.text}")
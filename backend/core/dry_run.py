@@ -0,0 +1,239 @@
+"""
+腳本模擬執行 (dry run)
+以記錄動作的假控制器取代 pynput, 以虛擬時鐘取代 sleep: 等待只推進虛擬時間, 立即返回
+不會真的移動滑鼠或按鍵, 30 分鐘的腳本也能在瞬間完成, 用於檢查腳本與估算執行時間
+"""
+
+import sys
+import threading
+from collections import Counter
+
+from config.settings import ENGINE_SCREEN_TICK
+from core.engine import ScriptEngine, ScriptStoppedError
+from core.library import LIBRARY_FILENAME, ScriptSource
+from core.profiler import SCRIPT_FILENAME, frame_line
+
+# 逾時後逐行檢查停止的 frame (腳本與函式庫的程式碼)
+_TRACED_FILES = (SCRIPT_FILENAME, LIBRARY_FILENAME)
+
+
+class DryRunLimitError(ScriptStoppedError):
+    """模擬超過動作數或虛擬時間上限 (例如無限迴圈)"""
+
+    pass
+
+
+class VirtualClock:
+    """虛擬時鐘 (秒), 只在等待時推進"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        if seconds > 0:
+            self.now += seconds
+
+
+def _key_name(key) -> str:
+    """pynput 按鍵 (Key、KeyCode 或字元) 的名稱"""
+    if isinstance(key, str):
+        return key
+    name = getattr(key, "name", None) or getattr(key, "char", None)
+    return str(name if name is not None else key)
+
+
+class ActionTimeline:
+    """依虛擬時間記錄送出的動作"""
+
+    def __init__(self, engine: "DryRunEngine", max_actions: int):
+        self._engine = engine
+        self._max_actions = max_actions
+        self.actions: list[dict] = []
+        self.counts: Counter[str] = Counter()
+
+    def record(self, action: str, **data) -> None:
+        """
+        Raises:
+            DryRunLimitError: 動作數超過上限
+        """
+        if len(self.actions) >= self._max_actions:
+            raise DryRunLimitError(f"動作數超過上限 {self._max_actions}")
+        self.actions.append(
+            {
+                "time_ms": round(self._engine.clock.now * 1000, 3),
+                "line": self._engine.current_line,
+                "action": action,
+                **data,
+            }
+        )
+        self.counts[action] += 1
+
+
+class RecordingMouse:
+    """記錄動作的滑鼠控制器 (介面同 pynput.mouse.Controller)"""
+
+    def __init__(self, timeline: ActionTimeline):
+        self._timeline = timeline
+        self._position = (0, 0)
+
+    @property
+    def position(self) -> tuple[int, int]:
+        return self._position
+
+    @position.setter
+    def position(self, pos) -> None:
+        x, y = int(pos[0]), int(pos[1])
+        self._position = (x, y)
+        self._timeline.record("move", x=x, y=y)
+
+    def click(self, button, count: int = 1) -> None:
+        self._timeline.record("click", button=button.name, count=count)
+
+    def press(self, button) -> None:
+        self._timeline.record("mouse_down", button=button.name)
+
+    def release(self, button) -> None:
+        self._timeline.record("mouse_release", button=button.name)
+
+    def scroll(self, dx: int, dy: int) -> None:
+        self._timeline.record("scroll", dx=dx, dy=dy)
+
+
+class RecordingKeyboard:
+    """記錄動作的鍵盤控制器 (介面同 pynput.keyboard.Controller)"""
+
+    def __init__(self, timeline: ActionTimeline):
+        self._timeline = timeline
+
+    def press(self, key) -> None:
+        self._timeline.record("key_down", key=_key_name(key))
+
+    def release(self, key) -> None:
+        self._timeline.record("key_release", key=_key_name(key))
+
+    def type(self, text: str) -> None:
+        self._timeline.record("type_text", text=text)
+
+
+class DryRunEngine(ScriptEngine):
+    """
+    模擬執行的引擎: 腳本 API 與一般執行相同, 但輸入只被記錄, 等待只推進虛擬時間
+    螢幕 API 讀取全黑的合成畫面 (無法得知實際畫面),
+    wait_pixel/wait_image 在虛擬時間中等到符合或逾時
+    """
+
+    def __init__(
+        self,
+        max_actions: int,
+        max_seconds: float,
+        compile_cache=None,
+        script_source: ScriptSource | None = None,
+    ):
+        """
+        Args:
+            max_actions: 最多記錄的動作數
+            max_seconds: 虛擬時間上限 (秒)
+            compile_cache: 編譯快取 (與一般執行共用)
+            script_source: import_script/call_script 的腳本來源 (函式庫模組不與一般執行共用)
+        """
+        # 一律在執行緒中執行: 虛擬時鐘與記錄的控制器都在本行程
+        super().__init__(
+            execution_mode="thread", compile_cache=compile_cache, script_source=script_source
+        )
+        self.clock = VirtualClock()
+        self._clock = self.clock
+        self._max_seconds = max_seconds
+        self.timeline = ActionTimeline(self, max_actions)
+        self.mouse = RecordingMouse(self.timeline)
+        self.keyboard = RecordingKeyboard(self.timeline)
+
+    @property
+    def screen(self):
+        if self._screen is None:
+            from core.screen import ScreenReader, SyntheticFramebuffer
+
+            self._screen = ScreenReader(SyntheticFramebuffer(), ENGINE_SCREEN_TICK)
+        return self._screen
+
+    @screen.setter
+    def screen(self, reader) -> None:
+        self._screen = reader
+
+    def _check_state(self):
+        if self._stop_event.is_set():
+            raise ScriptStoppedError()
+        if self.clock.now > self._max_seconds:
+            raise DryRunLimitError(f"模擬時間超過上限 {self._max_seconds:g} 秒")
+
+    def _wait(self, seconds: float):
+        self._check_state()
+        self.clock.advance(seconds)
+
+    def _script_print(self, *args, sep=" ", end="\n", file=None, flush=False):
+        if file is not None:
+            print(*args, sep=sep, end=end, file=file, flush=flush)
+            return
+        # print() 不經過 _update_line, 直接以呼叫端的行號記錄
+        self.current_line = frame_line(sys._getframe(1))
+        self.timeline.record("print", text=sep.join(map(str, args)))
+
+    def simulate(self, script_content: str, script_id: str, timeout: float) -> dict:
+        """
+        模擬執行腳本 (同步, 在獨立的執行緒中執行以便逾時停止)
+
+        Args:
+            timeout: 實際時間上限 (秒), 例如腳本在不呼叫 API 的迴圈中空轉
+
+        Returns:
+            狀態、錯誤訊息、模擬的總時間與各類動作數 (毫秒), 以及依時間排序的動作列表
+        """
+        result = {"status": "success", "error": None}
+        self.total_lines = script_content.count("\n") + 1
+        stop = self._stop_event
+
+        def trace_line(frame, event, arg):
+            # 要求停止後在腳本的下一行停止, 完全不呼叫 API 的迴圈也不會留在背景空轉
+            if stop.is_set():
+                raise ScriptStoppedError()
+            return trace_line
+
+        def trace_call(frame, event, arg):
+            return trace_line if frame.f_code.co_filename in _TRACED_FILES else None
+
+        def run():
+            if self.library is not None:
+                self.library.begin_run(script_id)
+            try:
+                code = self._compile(script_content)
+                sys.settrace(trace_call)
+                exec(code, self._api_functions())
+            except DryRunLimitError as e:
+                result.update(status="truncated", error=str(e))
+            except ScriptStoppedError:
+                result.update(status="timeout", error=f"模擬超過 {timeout:g} 秒未完成")
+            except Exception as e:
+                result.update(status="error", error=str(e))
+            finally:
+                sys.settrace(None)
+
+        thread = threading.Thread(target=run, name="dry-run", daemon=True)
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            # 腳本在下一行或下一次呼叫 API 時停止
+            self._stop_event.set()
+            thread.join(0.1)
+            result.update(status="timeout", error=f"模擬超過 {timeout:g} 秒未完成")
+
+        actions = list(self.timeline.actions)
+        return {
+            **result,
+            "duration_ms": round(self.clock.now * 1000, 3),
+            "action_count": len(actions),
+            "counts": dict(self.timeline.counts),
+            "api_calls": dict(self._api_calls),
+            "timeline": actions,
+        }
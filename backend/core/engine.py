@@ -1,15 +1,79 @@
-import json
+import ast
+import contextlib
+import logging
+import marshal
+import pickle
 import sys
 import threading
 import time
-from datetime import datetime
-from pathlib import Path
+import uuid
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 
 from pynput.keyboard import Controller as KeyboardController
-from pynput.keyboard import Key
 from pynput.mouse import Button
 from pynput.mouse import Controller as MouseController
 
+from config.logging_config import run_id_var
+from config.settings import (
+    ENGINE_BATCH_CHUNK,
+    ENGINE_BATCH_MAX_LAG,
+    ENGINE_DRY_RUN_MAX_ACTIONS,
+    ENGINE_DRY_RUN_MAX_SECONDS,
+    ENGINE_DRY_RUN_TIMEOUT,
+    ENGINE_EXECUTION_MODE,
+    ENGINE_GLIDE_HZ,
+    ENGINE_GLIDE_MAX_HZ,
+    ENGINE_MATCH_TOLERANCE,
+    ENGINE_SCREEN_BACKEND,
+    ENGINE_SCREEN_POLL,
+    ENGINE_SCREEN_TICK,
+    ENGINE_STATUS_INTERVAL,
+    ENGINE_WORKER_MAX_RUNS,
+    ENGINE_WORKER_POOL_SIZE,
+    ENGINE_WORKER_START_TIMEOUT,
+)
+from core.keys import find_unknown_keys, resolve_key
+from core.library import LIBRARY_FILENAME, ScriptLibrary, ScriptSource
+from core.metrics import (
+    ENGINE_API_CALLS,
+    ENGINE_PAUSE_WAIT_SECONDS,
+    HOTKEY_TO_EXEC_SECONDS,
+    SCRIPT_DURATION_SECONDS,
+)
+from core.profiler import SCRIPT_FILENAME, ScriptProfiler, frame_line
+
+if TYPE_CHECKING:
+    from core.compile_cache import CompileCache
+    from core.screen import ScreenReader
+    from core.worker_pool import Worker, WorkerPool
+    from services.history_service import HistoryService
+
+logger = logging.getLogger(__name__)
+# 腳本內 print() 的輸出, 與引擎本身的日誌分開以便過濾
+script_logger = logging.getLogger("script")
+
+# 滑鼠按鈕名稱對照, 側鍵 (x1/x2) 僅在支援的平台上提供
+MOUSE_BUTTONS = {
+    name: getattr(Button, name)
+    for name in ("left", "right", "middle", "x1", "x2")
+    if hasattr(Button, name)
+}
+
+
+# 編譯流程版本: compile_script 的檢查或轉換改變時更新, 讓磁碟上的編譯快取失效
+COMPILE_VARIANT = f"{SCRIPT_FILENAME}:keycheck-1"
+
+
+def compile_script(script_content: str):
+    """編譯腳本, 並在送出任何輸入前檢查以常數指定的按鍵名稱"""
+    tree = ast.parse(script_content, SCRIPT_FILENAME)
+    unknown = find_unknown_keys(tree)
+    if unknown:
+        line, _, name = unknown[0]
+        raise ValueError(f"第 {line} 行: 未知的按鍵名稱 '{name}'")
+    return compile(tree, SCRIPT_FILENAME, "exec")
+
 
 class ScriptStoppedError(Exception):
     """腳本停止例外"""
@@ -17,29 +81,106 @@ class ScriptStoppedError(Exception):
     pass
 
 
+EXECUTION_MODES = ("thread", "process")
+
+
 class ScriptEngine:
-    def __init__(self):
-        self.mouse = MouseController()
-        self.keyboard = KeyboardController()
-        self.history_file = Path(__file__).parent / "scripts" / "history.json"
+    def __init__(
+        self,
+        history_service: "HistoryService | None" = None,
+        execution_mode: str = ENGINE_EXECUTION_MODE,
+        compile_cache: "CompileCache | None" = None,
+        script_source: ScriptSource | None = None,
+    ):
+        """
+        Args:
+            history_service: 執行歷史的記錄服務 (未提供時不記錄歷史)
+            execution_mode: thread (在本行程的執行緒中執行腳本) 或
+                process (在待命的工作行程中執行, 停止時強制結束行程)
+            compile_cache: 編譯快取 (以 compile_script 編譯), 未提供時每次執行都重新編譯
+            script_source: 以 ID 或名稱查詢腳本的函數, 供 import_script/call_script 使用
+                (未提供時無法使用函式庫; 腳本變更時需呼叫 library.invalidate)
+        """
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"不支援的執行模式: {execution_mode}")
+        # 輸入控制器在第一次使用時才建立, 不拖慢服務啟動
+        self._mouse: MouseController | None = None
+        self._keyboard: KeyboardController | None = None
+        self.history_service = history_service
+        self.execution_mode = execution_mode
+        self.compile_cache = compile_cache
+        self._script_source = script_source
+        self.library = ScriptLibrary(script_source, self._compile) if script_source else None
+        # 行程模式的工作行程池 (第一次使用時建立) 與目前執行中的工作行程
+        self._pool: WorkerPool | None = None
+        self._worker: Worker | None = None
+        # 行程模式下由工作行程回報的腳本行號 (取代從呼叫堆疊讀取)
+        self._remote_line: int | None = None
+        # 螢幕讀取器在第一次使用螢幕 API 時才建立 (需要 numpy 與擷取後端)
+        self._screen: ScreenReader | None = None
+        # 腳本 API 計時與等待使用的單調時鐘 (秒), 模擬執行時替換為虛擬時鐘
+        self._clock: Callable[[], float] = time.perf_counter
 
         # 執行狀態控制
         self._stop_event = threading.Event()
         self._pause_event = threading.Event()
         self._pause_event.set()  # 預設為非暫停狀態
-        self._execution_thread = None
+        self._execution_thread: threading.Thread | None = None
 
         # 公開狀態
         self.status = "IDLE"  # IDLE, RUNNING, PAUSED
-        self.current_script_id = None
-        self.current_script_name = None
+        self.current_script_id: str | None = None
+        self.current_script_name: str | None = None
         self.current_line = 0
+        self.total_lines = 0
+        # 本次執行的 API 呼叫次數 (只由腳本執行緒寫入)
+        self._api_calls: dict[str, int] = {}
+        # print(..., end="") 尚未換行的輸出, 等到換行或腳本結束時才寫入日誌
+        self._print_pending = ""
+
+        # 狀態推送: 只送出變更的欄位, 行號更新依 ENGINE_STATUS_INTERVAL 節流合併
+        self.status_listener: Callable[[dict], None] | None = None
+        self._status_lock = threading.Lock()
+        self._published_status: dict = {}
+        self._last_publish = 0.0
+        self._status_dirty = False
+
+    @property
+    def mouse(self) -> MouseController:
+        """滑鼠控制器 (延遲建立, 可替換)"""
+        if self._mouse is None:
+            self._mouse = MouseController()
+        return self._mouse
+
+    @mouse.setter
+    def mouse(self, controller: MouseController) -> None:
+        self._mouse = controller
+
+    @property
+    def keyboard(self) -> KeyboardController:
+        """鍵盤控制器 (延遲建立, 可替換)"""
+        if self._keyboard is None:
+            self._keyboard = KeyboardController()
+        return self._keyboard
+
+    @keyboard.setter
+    def keyboard(self, controller: KeyboardController) -> None:
+        self._keyboard = controller
 
     def execute(
-        self, script_content: str, script_id: str = "manual", script_name: str = "手動執行"
+        self,
+        script_content: str,
+        script_id: str = "manual",
+        script_name: str = "手動執行",
+        triggered_at: float | None = None,
+        profile: bool = False,
     ):
         """
         非同步執行腳本
+
+        Args:
+            triggered_at: 觸發時間 (perf_counter), 用於統計熱鍵到開始執行的延遲
+            profile: 是否啟用效能分析, 報告隨歷史記錄保存 (分析一律在本行程的執行緒中進行)
         """
         if self.status != "IDLE":
             return {"status": "error", "message": "已有腳本正在執行中"}
@@ -48,29 +189,22 @@ class ScriptEngine:
         self.current_script_id = script_id
         self.current_script_name = script_name
         self.current_line = 0  # 重置行號
+        self.total_lines = script_content.count("\n") + 1
         self._stop_event.clear()
         self._pause_event.set()
+        self._publish_status(force=True)
+        run_id = uuid.uuid4().hex
+        logger.info("開始執行腳本: %s (%s), run_id=%s", script_name, script_id, run_id)
 
         def run_script():
-            start_time = time.time()
+            # 此執行緒內的所有日誌都帶有本次執行 ID
+            run_id_var.set(run_id)
+            start_time = time.perf_counter()
             status = "success"
             error_msg = None
 
             # 建立安全的執行環境
-            safe_globals = {
-                "click": self.click,
-                "move": self.move,
-                "press": self.press,
-                "type_text": self.type_text,
-                "scroll": self.scroll,
-                "print": print,
-                "sleep": self.sleep,  # 使用可中斷的 sleep
-                "mouse_position": self.get_mouse_position,
-                "key_down": self.key_down,
-                "key_release": self.key_release,
-                "mouse_down": self.mouse_down,
-                "mouse_release": self.mouse_release,
-            }
+            safe_globals = self._api_functions()
 
             # 移除 settrace 以避免效能問題和潛在的死鎖
             # 依賴 API 函數內的 _check_state 來處理停止和暫停
@@ -80,32 +214,84 @@ class ScriptEngine:
             #     self._pause_event.wait()  # 如果暫停，這裡會阻塞
             #     return trace_func
 
+            if triggered_at is not None:
+                HOTKEY_TO_EXEC_SECONDS.observe(time.perf_counter() - triggered_at)
+
+            # 只在要求分析時才安裝追蹤函數, 一般執行沒有任何額外開銷
+            profiler = ScriptProfiler(safe_globals) if profile else None
+
+            if self.library is not None:
+                self.library.begin_run(script_id)
+
             try:
                 # sys.settrace(trace_func)
-                exec(script_content, safe_globals)
+                code = self._compile(script_content)
+                if profiler is not None:
+                    profiler.start()
+                    exec(code, safe_globals)
+                elif self.execution_mode == "process":
+                    self._run_in_worker(code, safe_globals, script_id)
+                else:
+                    exec(code, safe_globals)
             except ScriptStoppedError:
                 status = "stopped"
-                print("腳本已停止")
+                logger.info("腳本已停止")
             except Exception as e:
                 status = "error"
                 error_msg = str(e)
-                print(f"腳本執行錯誤: {e}")
+                logger.error("腳本執行錯誤: %s", e)
             finally:
                 # sys.settrace(None)
+                if profiler is not None:
+                    profiler.stop()
+                self._remote_line = None
+                self._flush_print()
                 self.status = "IDLE"
                 self.current_script_id = None
                 self.current_line = 0
+                self.total_lines = 0
+                self._publish_status(force=True)
 
                 # 記錄執行歷史
-                duration = time.time() - start_time
-                self._add_history(script_id, status, duration, error_msg)
-                print(f"腳本執行完成執行結束，狀態: {status}，耗時: {duration:.8f} 秒")
+                duration = time.perf_counter() - start_time
+                SCRIPT_DURATION_SECONDS.observe(duration, (status,))
+                for name, count in self._api_calls.items():
+                    ENGINE_API_CALLS.inc(count, (name,))
+                self._api_calls = {}
+                if self.history_service is not None:
+                    self.history_service.add_record(
+                        script_id,
+                        status,
+                        duration,
+                        error_msg,
+                        run_id=run_id,
+                        profile=profiler.report(script_content) if profiler else None,
+                    )
+                logger.info("腳本執行結束, 狀態: %s, 耗時: %.3f 秒", status, duration)
 
         self._execution_thread = threading.Thread(target=run_script)
         self._execution_thread.daemon = True
         self._execution_thread.start()
 
-        return {"status": "running", "message": "腳本開始執行"}
+        return {"status": "running", "message": "腳本開始執行", "run_id": run_id}
+
+    def dry_run(self, script_content: str, script_id: str = "manual") -> dict:
+        """
+        模擬執行腳本: 不送出任何輸入, 等待以虛擬時間瞬間完成, 不影響目前的執行狀態與歷史記錄
+
+        Returns:
+            status (success/error/truncated/timeout)、error、duration_ms (模擬的總時間)、
+            action_count、counts (各類動作數)、api_calls 與 timeline (依時間排序的動作)
+        """
+        from core.dry_run import DryRunEngine
+
+        engine = DryRunEngine(
+            ENGINE_DRY_RUN_MAX_ACTIONS,
+            ENGINE_DRY_RUN_MAX_SECONDS,
+            compile_cache=self.compile_cache,
+            script_source=self._script_source,
+        )
+        return engine.simulate(script_content, script_id, ENGINE_DRY_RUN_TIMEOUT)
 
     def stop(self):
         """停止執行"""
@@ -114,6 +300,10 @@ class ScriptEngine:
 
         self._stop_event.set()
         self._pause_event.set()  # 確保如果暫停中也能繼續並檢測到停止
+        worker = self._worker
+        if worker is not None:
+            # 行程模式: 直接結束工作行程, 不需等腳本呼叫 API
+            worker.kill()
         return {"status": "success", "message": "已發送停止信號"}
 
     def pause(self):
@@ -123,6 +313,7 @@ class ScriptEngine:
 
         self.status = "PAUSED"
         self._pause_event.clear()
+        self._publish_status(force=True)
         return {"status": "success", "message": "腳本已暫停"}
 
     def resume(self):
@@ -132,6 +323,7 @@ class ScriptEngine:
 
         self.status = "RUNNING"
         self._pause_event.set()
+        self._publish_status(force=True)
         return {"status": "success", "message": "腳本已繼續"}
 
     def get_status(self):
@@ -141,47 +333,211 @@ class ScriptEngine:
             "script_id": self.current_script_id,
             "script_name": self.current_script_name,
             "current_line": self.current_line,
+            "total_lines": self.total_lines,
         }
 
-    def _add_history(self, script_id: str, status: str, duration: float, error: str | None = None):
-        """新增執行歷史記錄"""
-        history = self.get_history()
-
-        history.append(
-            {
-                "script_id": script_id,
-                "timestamp": datetime.now().isoformat(),
-                "status": status,
-                "duration": round(duration, 3),
-                "error": error,
-            }
-        )
+    def _publish_status(self, force: bool = False):
+        """
+        推送狀態變更 (僅包含與上次推送不同的欄位)
 
-        # 只保留最近 100 筆記錄
-        if len(history) > 100:
-            history = history[-100:]
+        Args:
+            force: 狀態轉換時立即推送; 否則在節流間隔內合併, 由下一次呼叫補送
+        """
+        if self.status_listener is None:
+            return
+
+        with self._status_lock:
+            now = time.perf_counter()
+            if not force and now - self._last_publish < ENGINE_STATUS_INTERVAL:
+                self._status_dirty = True
+                return
+
+            snapshot = self.get_status()
+            delta = {
+                key: value
+                for key, value in snapshot.items()
+                if key not in self._published_status or self._published_status[key] != value
+            }
+            self._published_status = snapshot
+            self._last_publish = now
+            self._status_dirty = False
+
+        if delta:
+            with contextlib.suppress(Exception):
+                self.status_listener(delta)
+
+    def _compile(self, script_content: str):
+        """編譯腳本 (有編譯快取時優先使用快取)"""
+        if self.compile_cache is not None:
+            return self.compile_cache.get(script_content)
+        return compile_script(script_content)
+
+    def preload(self, sources: list[str]) -> None:
+        """在背景預先載入腳本的編譯結果, 重新啟動後第一次執行也不需解析與編譯"""
+        cache = self.compile_cache
+        if cache is None or not sources:
+            return
+
+        def warm():
+            start = time.perf_counter()
+            loaded = cache.warm(sources)
+            logger.info(
+                "已預先載入 %d/%d 個腳本的編譯結果, 耗時 %.1f ms",
+                loaded,
+                len(sources),
+                (time.perf_counter() - start) * 1000,
+            )
+
+        threading.Thread(target=warm, name="compile-warmup", daemon=True).start()
+
+    def _api_functions(self) -> dict:
+        """腳本可使用的 API 函數 (名稱 -> 函數)"""
+        return {
+            "click": self.click,
+            "move": self.move,
+            "press": self.press,
+            "type_text": self.type_text,
+            "scroll": self.scroll,
+            "print": self._script_print,
+            "sleep": self.sleep,  # 使用可中斷的 sleep
+            "mouse_position": self.get_mouse_position,
+            "key_down": self.key_down,
+            "key_release": self.key_release,
+            "mouse_down": self.mouse_down,
+            "mouse_release": self.mouse_release,
+            "move_path": self.move_path,
+            "click_many": self.click_many,
+            "key_sequence": self.key_sequence,
+            "glide": self.glide,
+            "pixel": self.pixel,
+            "wait_pixel": self.wait_pixel,
+            "find_image": self.find_image,
+            "wait_image": self.wait_image,
+            "import_script": self.import_script,
+            "call_script": self.call_script,
+            "resolve_key": resolve_key,  # 預先解析按鍵, 迴圈中重複使用
+        }
 
-        # 儲存到檔案
-        self.history_file.parent.mkdir(parents=True, exist_ok=True)
-        with self.history_file.open("w", encoding="utf-8") as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+    # 行程模式
+    def start_workers(self) -> None:
+        """行程模式下預先啟動待命的工作行程 (執行緒模式不做任何事)"""
+        if self.execution_mode == "process":
+            self._worker_pool()
+
+    def shutdown(self) -> None:
+        """停止執行中的腳本並結束所有工作行程"""
+        self.stop()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._screen is not None:
+            self._screen.close()
+            self._screen = None
+
+    def _worker_pool(self) -> "WorkerPool":
+        if self._pool is None:
+            from core.worker_pool import WorkerPool
+
+            self._pool = WorkerPool(
+                ENGINE_WORKER_POOL_SIZE, ENGINE_WORKER_MAX_RUNS, ENGINE_WORKER_START_TIMEOUT
+            )
+            self._pool.start()
+        return self._pool
+
+    def _library_code(self, ref: str, known_version: int | None):
+        """
+        工作行程取得函式庫程式碼
 
-    def get_history(self) -> list[dict]:
-        """取得執行歷史"""
-        if not self.history_file.exists():
-            return []
+        Returns:
+            (腳本 ID, 版本, 程式碼 (marshal), 版本與 known_version 相同時為 None)
+        """
+        script_id, entry = self._get_library().entry(ref)
+        code = None if entry.version == known_version else marshal.dumps(entry.code)
+        return script_id, entry.version, code
 
+    def _run_in_worker(self, code, api: dict, script_id: str) -> None:
+        """
+        在工作行程中執行已編譯的腳本
+        本執行緒代為執行腳本呼叫的 API (狀態檢查、行號更新與輸入都在主行程)
+
+        Raises:
+            ScriptStoppedError: 腳本被停止 (工作行程已被強制結束)
+            Exception: 腳本拋出的例外 (內建例外保留原本的類型, 其他以 RuntimeError 表示,
+                訊息包含發生的行號)
+            RuntimeError: 工作行程異常結束
+        """
+        from core.worker_pool import WorkerExitedError, _remote_exception
+
+        def check_key(key):
+            # 工作行程沒有載入 pynput, resolve_key 只做驗證並傳回原名稱
+            resolve_key(key)
+            return key
+
+        # _library_code 只供工作行程內的 import_script/call_script 使用, 不放入腳本命名空間
+        handlers = dict(api, resolve_key=check_key, _library_code=self._library_code)
+        pool = self._worker_pool()
+        worker = self._worker = pool.acquire()
+        error = None
         try:
-            with self.history_file.open(encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        except (json.JSONDecodeError, FileNotFoundError, OSError):
-            return []
-
-    def clear_history(self):
-        """清除執行歷史"""
-        if self.history_file.exists():
-            self.history_file.unlink()
+            # 等待工作行程期間已要求停止
+            self._check_state()
+            worker.send(("run", marshal.dumps(code), list(api), script_id))
+            while True:
+                kind, *payload = worker.receive()
+                if kind == "done":
+                    break
+                if kind == "error":
+                    error = payload
+                    break
+                if kind == "invalid":
+                    worker.send(("reply", False, ("TypeError", payload[0])))
+                    continue
+
+                name, args, kwargs, line = payload
+                self._remote_line = line
+                try:
+                    reply = ("reply", True, handlers[name](*args, **kwargs))
+                except ScriptStoppedError:
+                    raise
+                except Exception as e:
+                    reply = ("reply", False, (type(e).__name__, str(e)))
+                try:
+                    worker.send(reply)
+                except (TypeError, AttributeError, pickle.PicklingError) as e:
+                    worker.send(("reply", False, ("TypeError", f"無法傳回結果: {e}")))
+        except WorkerExitedError:
+            if self._stop_event.is_set():
+                raise ScriptStoppedError() from None
+            raise RuntimeError("工作行程異常結束") from None
+        except BaseException:
+            worker.kill()
+            raise
+        finally:
+            self._worker = None
+            pool.release(worker)
+        if error is not None:
+            name, message, line = error
+            raise _remote_exception(name, f"{message} (第 {line} 行)" if line else message)
+
+    def _script_print(self, *args, sep=" ", end="\n", file=None, flush=False):
+        """腳本的 print(): 寫入日誌佇列 (顯示在前端主控台), 指定 file 時維持原本行為"""
+        if file is not None:
+            print(*args, sep=sep, end=end, file=file, flush=flush)
+            return
+        # 日誌以行為單位: 依 end 累積輸出, 每遇到換行寫入一筆
+        body = (sep if sep is not None else " ").join(map(str, args))
+        text = self._print_pending + body + (end if end is not None else "\n")
+        *lines, self._print_pending = text.split("\n")
+        for line in lines:
+            script_logger.info(line)
+        if flush:
+            self._flush_print()
+
+    def _flush_print(self) -> None:
+        """寫入尚未換行的 print() 輸出"""
+        if self._print_pending:
+            script_logger.info(self._print_pending)
+            self._print_pending = ""
 
     def _update_line(self):
         """更新當前行號"""
@@ -189,35 +545,70 @@ class ScriptEngine:
             # frame 0: _update_line
             # frame 1: API method (e.g. sleep)
             # frame 2: script content
-            frame = sys._getframe(2)
-            self.current_line = frame.f_lineno
+            api_frame = sys._getframe(1)
+            if self._remote_line is not None:
+                # 行程模式: frame 2 是代為呼叫的迴圈, 行號由工作行程回報
+                line = self._remote_line
+            else:
+                # 函式庫內呼叫的 API 以呼叫函式庫的腳本行為準
+                frame = api_frame.f_back
+                while frame is not None and frame.f_code.co_filename == LIBRARY_FILENAME:
+                    frame = frame.f_back
+                line = frame_line(frame)  # type: ignore[arg-type]
             # print(f"執行行號: {self.current_line}")
         except Exception:
-            pass
+            return
+
+        # 每個 API 函數都會呼叫此處, 順便統計呼叫次數 (執行結束時才寫入指標)
+        name = api_frame.f_code.co_name
+        self._api_calls[name] = self._api_calls.get(name, 0) + 1
+
+        if line != self.current_line:
+            self.current_line = line
+            self._publish_status()
 
     def _check_state(self):
         """手動檢查狀態 (用於 API 函數內部)"""
         if self._stop_event.is_set():
             raise ScriptStoppedError()
-        self._pause_event.wait()
+        if not self._pause_event.is_set():
+            # 只在暫停時計時, 一般執行不增加開銷
+            start = time.perf_counter()
+            self._pause_event.wait()
+            ENGINE_PAUSE_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+    def _get_button(self, button: str) -> Button:
+        """取得滑鼠按鈕"""
+        btn = MOUSE_BUTTONS.get(button)
+        if btn is None:
+            raise ValueError(f"不支援的滑鼠按鈕: {button}")
+        return btn
 
     def sleep(self, seconds: float):
-        """可中斷的睡眠"""
+        """可中斷的睡眠 (使用單調時鐘, 不受系統時間調整影響)"""
         self._update_line()
-        start = time.time()
-        while time.time() - start < seconds:
+        self._wait(seconds)
+
+    def _wait(self, seconds: float):
+        """可中斷的等待 (供 API 函數內部使用, 不更新行號)"""
+        start = self._clock()
+        while self._clock() - start < seconds:
             self._check_state()
             # 短暫睡眠以允許中斷，但不要太短以免消耗 CPU
-            remaining = seconds - (time.time() - start)
-            sleep_time = min(0.1, remaining)
+            remaining = seconds - (self._clock() - start)
+            # 有尚未推送的行號更新時縮短睡眠, 讓更新在節流間隔內送出
+            sleep_time = min(ENGINE_STATUS_INTERVAL if self._status_dirty else 0.1, remaining)
             if sleep_time > 0:
                 time.sleep(sleep_time)
+            # 補送節流期間被合併的行號更新
+            if self._status_dirty:
+                self._publish_status()
 
     def click(self, button="left", count=1):
         """點擊滑鼠"""
         self._check_state()
         self._update_line()
-        btn = Button.left if button == "left" else Button.right
+        btn = self._get_button(button)
         for _ in range(count):
             self._check_state()
             self.mouse.click(btn)
@@ -238,20 +629,14 @@ class ScriptEngine:
         """按下鍵盤按鍵 (包含按下、延遲、釋放)"""
         self._check_state()
         self._update_line()
+        # 未知的按鍵名稱直接拋出錯誤 (執行前的靜態檢查已攔下常數名稱)
+        resolved = resolve_key(key)
         try:
-            # 嘗試特殊鍵
-            special_key = getattr(Key, key.lower(), None)
-            if special_key:
-                self.keyboard.press(special_key)
-                self.sleep(duration)  # 使用可中斷的 sleep
-                self.keyboard.release(special_key)
-            else:
-                # 普通字元
-                self.keyboard.press(key)
-                self.sleep(duration)
-                self.keyboard.release(key)
+            self.keyboard.press(resolved)
+            self._wait(duration)  # 使用可中斷的等待
+            self.keyboard.release(resolved)
         except Exception as e:
-            print(f"按鍵錯誤: {e}")
+            logger.warning("按鍵錯誤: %s", e)
 
     def type_text(self, text: str):
         """輸入文字"""
@@ -269,38 +654,358 @@ class ScriptEngine:
         """按下鍵盤按鍵 (不釋放)"""
         self._check_state()
         self._update_line()
+        resolved = resolve_key(key)
         try:
-            special_key = getattr(Key, key.lower(), None)
-            if special_key:
-                self.keyboard.press(special_key)
-            else:
-                self.keyboard.press(key)
+            self.keyboard.press(resolved)
         except Exception as e:
-            print(f"按鍵按下錯誤: {e}")
+            logger.warning("按鍵按下錯誤: %s", e)
 
     def key_release(self, key: str):
         """釋放鍵盤按鍵"""
         self._check_state()
         self._update_line()
+        resolved = resolve_key(key)
         try:
-            special_key = getattr(Key, key.lower(), None)
-            if special_key:
-                self.keyboard.release(special_key)
-            else:
-                self.keyboard.release(key)
+            self.keyboard.release(resolved)
         except Exception as e:
-            print(f"按鍵釋放錯誤: {e}")
+            logger.warning("按鍵釋放錯誤: %s", e)
 
     def mouse_down(self, button="left"):
         """按下滑鼠按鈕 (不釋放)"""
         self._check_state()
         self._update_line()
-        btn = Button.left if button == "left" else Button.right
+        btn = self._get_button(button)
         self.mouse.press(btn)
 
     def mouse_release(self, button="left"):
         """釋放滑鼠按鈕"""
         self._check_state()
         self._update_line()
-        btn = Button.left if button == "left" else Button.right
+        btn = self._get_button(button)
         self.mouse.release(btn)
+
+    # 批次 API: 一次呼叫送出大量輸入, 每 ENGINE_BATCH_CHUNK 個事件才檢查一次狀態
+    def move_path(self, points, duration: float = 0.0):
+        """
+        沿路徑依序移動滑鼠
+
+        Args:
+            points: (x, y) 座標序列 (list、tuple 或 N x 2 陣列)
+            duration: 整條路徑的時間 (秒), 0 表示盡快送出
+        """
+        self._check_state()
+        self._update_line()
+        path = self._to_points(points)
+        interval = duration / (len(path) - 1) if duration > 0 and len(path) > 1 else 0.0
+        mouse = self.mouse
+
+        def emit(point):
+            mouse.position = point
+
+        self._run_batch(path, emit, interval)
+
+    def click_many(self, points, button="left", interval: float = 0.0):
+        """
+        依序移動到各座標並點擊
+
+        Args:
+            points: (x, y) 座標序列
+            button: 滑鼠按鈕
+            interval: 相鄰兩次點擊的間隔 (秒)
+        """
+        self._check_state()
+        self._update_line()
+        path = self._to_points(points)
+        btn = self._get_button(button)
+        mouse = self.mouse
+
+        def emit(point):
+            mouse.position = point
+            mouse.click(btn)
+
+        self._run_batch(path, emit, interval)
+
+    def key_sequence(self, events, interval: float = 0.0):
+        """
+        依序送出按鍵事件
+
+        Args:
+            events: 事件序列, 每個事件為按鍵名稱 (按下並釋放),
+                或 (動作, 按鍵) 其中動作為 "down"、"up" 或 "tap"
+            interval: 相鄰兩個事件的間隔 (秒)
+        """
+        self._check_state()
+        self._update_line()
+        # 先解析全部事件, 格式錯誤時不會送出任何輸入
+        actions = []
+        for event in events:
+            action, key = ("tap", event) if isinstance(event, str) else event
+            if action not in ("down", "up", "tap"):
+                raise ValueError(f"不支援的按鍵動作: {action}")
+            actions.append((action, resolve_key(key)))
+        keyboard = self.keyboard
+
+        def emit(item):
+            action, key = item
+            if action != "up":
+                keyboard.press(key)
+            if action != "down":
+                keyboard.release(key)
+
+        self._run_batch(actions, emit, interval)
+
+    def glide(
+        self,
+        x: int,
+        y: int,
+        duration: float = 0.3,
+        curve: str = "ease_in_out",
+        hz: float = ENGINE_GLIDE_HZ,
+        control=None,
+    ) -> dict:
+        """
+        平滑移動滑鼠到指定位置 (預先算出整條軌跡, 再依影格時間送出)
+
+        Args:
+            x, y: 目標座標
+            duration: 移動時間 (秒)
+            curve: linear, ease_in, ease_out, ease_in_out 或 bezier
+            hz: 影格頻率 (上限 ENGINE_GLIDE_MAX_HZ)
+            control: 貝茲曲線的兩個控制點 ((x1, y1), (x2, y2)), 未指定時自動產生
+
+        Returns:
+            影格數、目標與實際頻率、實際耗時及時間誤差 (毫秒)
+        """
+        self._check_state()
+        self._update_line()
+        # 延遲載入 numpy, 只有使用 glide 的腳本才需要
+        from core.trajectory import build_trajectory
+
+        hz = min(max(float(hz), 1.0), ENGINE_GLIDE_MAX_HZ)
+        duration = max(float(duration), 0.0)
+        start_pos = self.mouse.position
+        points, offsets = build_trajectory(start_pos, (x, y), duration, hz, curve, control)
+        mouse = self.mouse
+
+        def emit(point):
+            mouse.position = point
+
+        started = self._clock()
+        stats = self._run_batch(points, emit, offsets=offsets)
+        elapsed = self._clock() - started
+
+        frames = len(points)
+        # 實際頻率以排程影格數計算 (座標未改變而省略的影格也算在內);
+        # duration 為 0 時直接移到終點, 沒有頻率可言
+        scheduled = round(duration * hz)
+        # 重新對齊的影格不計入累計落後, 平均值也不應計入
+        timed = frames - int(stats["resyncs"])
+        return {
+            "frames": frames,
+            "target_hz": hz,
+            "hz": round(scheduled / elapsed, 1) if scheduled and elapsed > 0 else 0.0,
+            "duration": round(elapsed, 4),
+            "max_error_ms": round(stats["max_lag"] * 1000, 3),
+            "mean_error_ms": round(stats["total_lag"] * 1000 / timed, 3) if timed > 0 else 0.0,
+            "resyncs": stats["resyncs"],
+        }
+
+    # 函式庫 API
+    def import_script(self, ref: str):
+        """
+        匯入其他腳本作為模組 (第一次匯入時執行一次, 之後直接使用快取的模組)
+
+        Args:
+            ref: 腳本 ID 或名稱
+
+        Returns:
+            模組, 以屬性存取其中定義的函數與變數
+        """
+        self._check_state()
+        self._update_line()
+        return self._get_library().import_module(ref, self._api_functions)
+
+    def call_script(self, ref: str, **kwargs):
+        """
+        執行其他腳本, 關鍵字參數作為該腳本的全域變數
+
+        Returns:
+            被呼叫腳本中 result 變數的值 (未設定時為 None)
+        """
+        self._check_state()
+        self._update_line()
+        return self._get_library().call(ref, self._api_functions(), kwargs)
+
+    def _get_library(self) -> ScriptLibrary:
+        if self.library is None:
+            raise ImportError("未設定腳本函式庫來源")
+        return self.library
+
+    @staticmethod
+    def _to_points(points) -> list[tuple[int, int]]:
+        """將座標序列轉為整數座標列表 (在送出任何輸入前驗證)"""
+        try:
+            return [(int(x), int(y)) for x, y in points]
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"座標格式錯誤, 需要 (x, y) 序列: {e}") from e
+
+    def _run_batch(
+        self,
+        items: list,
+        emit: Callable,
+        interval: float = 0.0,
+        offsets: list[float] | None = None,
+    ) -> dict:
+        """
+        依單調時鐘排程送出批次事件
+
+        Args:
+            items: 事件列表
+            emit: 送出單一事件的函數
+            interval: 事件間隔 (秒), 0 且未指定 offsets 時不等待, 以注入速度送出
+            offsets: 各事件相對於開始的目標時間 (秒), 指定時取代 interval
+
+        Returns:
+            排程誤差統計: 最大與累計落後秒數、因大幅落後而重新對齊的次數
+        """
+        stats = {"max_lag": 0.0, "total_lag": 0.0, "resyncs": 0}
+        paced = offsets is not None or interval > 0
+        clock = self._clock
+        start = clock()
+        for chunk_start in range(0, len(items), ENGINE_BATCH_CHUNK):
+            self._check_state()
+            chunk_end = min(chunk_start + ENGINE_BATCH_CHUNK, len(items))
+            if not paced:
+                for i in range(chunk_start, chunk_end):
+                    emit(items[i])
+                continue
+
+            for i in range(chunk_start, chunk_end):
+                # 以起點加上偏移計算目標時間, 誤差不會逐次累積
+                target = start + (offsets[i] if offsets is not None else i * interval)
+                now = clock()
+                if target > now:
+                    self._wait(target - now)
+                    now = clock()
+                lag = now - target
+                if lag > ENGINE_BATCH_MAX_LAG:
+                    # 暫停或系統延遲造成大幅落後, 從目前時間重新排程, 不瞬間補送
+                    start += lag
+                    stats["resyncs"] += 1
+                else:
+                    stats["total_lag"] += lag
+                    if lag > stats["max_lag"]:
+                        stats["max_lag"] = lag
+                emit(items[i])
+        return stats
+
+    # 螢幕讀取 API
+    @property
+    def screen(self) -> "ScreenReader":
+        """螢幕讀取器 (延遲建立, 可替換為使用其他擷取後端的讀取器)"""
+        if self._screen is None:
+            from core.screen import ScreenReader, create_backend
+
+            self._screen = ScreenReader(create_backend(ENGINE_SCREEN_BACKEND), ENGINE_SCREEN_TICK)
+        return self._screen
+
+    @screen.setter
+    def screen(self, reader: "ScreenReader") -> None:
+        self._screen = reader
+
+    def pixel(self, x: int, y: int) -> tuple[int, int, int]:
+        """取得螢幕像素顏色 (r, g, b)"""
+        self._check_state()
+        self._update_line()
+        return self.screen.pixel(x, y)
+
+    def wait_pixel(
+        self,
+        x: int,
+        y: int,
+        color,
+        timeout: float = 10.0,
+        tolerance: float = ENGINE_MATCH_TOLERANCE,
+        interval: float = ENGINE_SCREEN_POLL,
+    ) -> bool:
+        """
+        等待螢幕像素變成指定顏色
+
+        Args:
+            color: (r, g, b) 或 "#rrggbb"
+            timeout: 最長等待時間 (秒)
+            tolerance: 各色版可接受的誤差
+            interval: 輪詢間隔 (秒)
+
+        Returns:
+            是否在逾時前符合
+        """
+        self._check_state()
+        self._update_line()
+        from core.screen import parse_color
+
+        target = parse_color(color)
+
+        def matches() -> bool:
+            return all(
+                abs(a - b) <= tolerance
+                for a, b in zip(self.screen.pixel(x, y), target, strict=True)
+            )
+
+        return self._poll(matches, timeout, interval) is not None
+
+    def find_image(self, template, region=None, tolerance: float = ENGINE_MATCH_TOLERANCE):
+        """
+        在螢幕上尋找影像
+
+        Args:
+            template: 圖片檔路徑或 RGB 陣列
+            region: 搜尋範圍 (left, top, width, height), 未指定時搜尋整個螢幕 (較慢)
+            tolerance: 每像素可接受的平均誤差
+
+        Returns:
+            匹配位置的中心座標 (x, y), 找不到時返回 None
+        """
+        self._check_state()
+        self._update_line()
+        return self.screen.find(template, region, tolerance, self._check_state)
+
+    def wait_image(
+        self,
+        template,
+        region=None,
+        timeout: float = 10.0,
+        tolerance: float = ENGINE_MATCH_TOLERANCE,
+        interval: float = ENGINE_SCREEN_POLL,
+    ):
+        """
+        等待影像出現在螢幕上
+
+        Returns:
+            匹配位置的中心座標 (x, y), 逾時返回 None
+        """
+        self._check_state()
+        self._update_line()
+        return self._poll(
+            lambda: self.screen.find(template, region, tolerance, self._check_state),
+            timeout,
+            interval,
+        )
+
+    def _poll(self, probe: Callable, timeout: float, interval: float):
+        """
+        輪詢直到 probe 回傳真值或逾時 (等待期間可被停止/暫停)
+
+        Returns:
+            probe 的真值結果, 逾時返回 None
+        """
+        deadline = self._clock() + max(timeout, 0.0)
+        interval = max(interval, ENGINE_SCREEN_TICK)
+        while True:
+            result = probe()
+            if result:
+                return result
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                return None
+            self._wait(min(interval, remaining))
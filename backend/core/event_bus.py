@@ -0,0 +1,59 @@
+"""
+事件匯流排
+讓監聽器、引擎、錄製器等背景執行緒將事件投遞到伺服器的事件迴圈
+投遞只呼叫 call_soon_threadsafe, 不建立事件迴圈也不等待發送完成
+"""
+
+import asyncio
+from collections.abc import Callable
+
+
+class EventBus:
+    """執行緒安全的事件匯流排"""
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._handler: Callable[[dict], None] | None = None
+
+    @property
+    def attached(self) -> bool:
+        """是否已連接到事件迴圈"""
+        return self._loop is not None
+
+    def attach(self, loop: asyncio.AbstractEventLoop, handler: Callable[[dict], None]) -> None:
+        """
+        連接到伺服器事件迴圈 (於 lifespan 啟動時呼叫)
+
+        Args:
+            loop: 伺服器的事件迴圈
+            handler: 在事件迴圈執行緒中處理事件的函數 (例如廣播)
+        """
+        self._loop = loop
+        self._handler = handler
+
+    def detach(self) -> None:
+        """中斷連接 (於 lifespan 關閉時呼叫), 之後投遞的事件會被忽略"""
+        self._loop = None
+        self._handler = None
+
+    def post(self, message: dict) -> bool:
+        """
+        從任意執行緒投遞事件
+
+        Returns:
+            是否成功投遞 (尚未連接或事件迴圈已關閉時為 False)
+        """
+        loop = self._loop
+        handler = self._handler
+        if loop is None or handler is None:
+            return False
+        try:
+            loop.call_soon_threadsafe(handler, message)
+        except RuntimeError:
+            # 事件迴圈已關閉
+            return False
+        return True
+
+
+# 全域事件匯流排
+event_bus = EventBus()
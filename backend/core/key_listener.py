@@ -4,14 +4,23 @@
 支援組合鍵 (Ctrl+Shift+F1 等)
 """
 
+import logging
 import threading
+import time
 from collections.abc import Callable
 
 from pynput import keyboard
 
+logger = logging.getLogger(__name__)
+
 
 class KeyListener:
     def __init__(self, on_trigger: Callable, on_f2: Callable | None = None):
+        """
+        Args:
+            on_trigger: 熱鍵觸發時的回呼, 參數為 (腳本 ID, 腳本內容, 觸發時間 perf_counter)
+            on_f2: F2 按下時的回呼
+        """
         self.on_trigger = on_trigger
         self.on_f2 = on_f2
         self.hotkeys: dict[str, dict] = {}  # {key_combo: {script_id, script_content}}
@@ -22,13 +31,13 @@ class KeyListener:
     def register_hotkey(self, key_combo: str, script_id: str, script_content: str):
         """註冊熱鍵"""
         self.hotkeys[key_combo.lower()] = {"script_id": script_id, "script_content": script_content}
-        print(f"已註冊熱鍵: {key_combo} -> 腳本 {script_id}")
+        logger.debug("已註冊熱鍵: %s -> 腳本 %s", key_combo, script_id)
 
     def unregister_hotkey(self, key_combo: str):
         """取消註冊熱鍵"""
         if key_combo.lower() in self.hotkeys:
             del self.hotkeys[key_combo.lower()]
-            print(f"已取消熱鍵: {key_combo}")
+            logger.debug("已取消熱鍵: %s", key_combo)
 
     def clear_all(self):
         """清除所有熱鍵"""
@@ -70,8 +79,8 @@ class KeyListener:
 
             # 處理系統功能鍵 (例如 F2)
             if key_str == "f2" and self.on_f2:
-                # 在新執行緒中執行回呼, 以免阻塞監聽器
-                threading.Thread(target=self.on_f2).start()
+                # 回呼只讀取座標並投遞事件, 直接在監聽器執行緒中執行
+                self.on_f2()
                 return
 
             # 取得目前組合鍵
@@ -79,14 +88,17 @@ class KeyListener:
 
             # 檢查是否為註冊的熱鍵
             if current_combo in self.hotkeys:
+                triggered_at = time.perf_counter()
                 script_info = self.hotkeys[current_combo]
-                print(f"觸發熱鍵: {current_combo}")
+                # 監聽器執行緒只將記錄入列, 不做主控台 I/O
+                logger.info("觸發熱鍵: %s -> 腳本 %s", current_combo, script_info["script_id"])
                 # 在新執行緒中執行腳本,避免阻塞監聽器
                 threading.Thread(
-                    target=self.on_trigger, args=(script_info["script_content"],)
+                    target=self.on_trigger,
+                    args=(script_info["script_id"], script_info["script_content"], triggered_at),
                 ).start()
         except Exception as e:
-            print(f"按鍵處理錯誤: {e}")
+            logger.error("按鍵處理錯誤: %s", e)
 
     def on_release(self, key):
         """按鍵釋放事件"""
@@ -95,7 +107,7 @@ class KeyListener:
             if key_str and key_str in self.pressed_keys:
                 self.pressed_keys.remove(key_str)
         except Exception as e:
-            print(f"按鍵釋放錯誤: {e}")
+            logger.error("按鍵釋放錯誤: %s", e)
 
     def _key_to_string(self, key) -> str:
         """將按鍵轉換為字串"""
@@ -130,7 +142,7 @@ class KeyListener:
         self.pressed_keys.clear()
         self.listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release)
         self.listener.start()
-        print("按鍵監聽器已啟動")
+        logger.info("按鍵監聽器已啟動")
 
     def stop(self):
         """停止監聽器"""
@@ -138,4 +150,4 @@ class KeyListener:
             self.listener.stop()
             self.running = False
             self.pressed_keys.clear()
-            print("按鍵監聽器已停止")
+            logger.info("按鍵監聽器已停止")
@@ -0,0 +1,136 @@
+"""
+按鍵名稱對照
+模組載入時建立一次不可變的「名稱 -> pynput 按鍵」對照表 (含常見別名),
+執行時只需查表; 並提供靜態檢查, 在執行前找出腳本中的未知按鍵名稱
+"""
+
+import ast
+from types import MappingProxyType
+
+from pynput.keyboard import Key
+
+# 別名 -> pynput Key 成員名稱 (目標不存在於目前平台時略過)
+_ALIASES = {
+    "return": "enter",
+    "escape": "esc",
+    "control": "ctrl",
+    "lctrl": "ctrl_l",
+    "rctrl": "ctrl_r",
+    "lshift": "shift_l",
+    "rshift": "shift_r",
+    "option": "alt",
+    "lalt": "alt_l",
+    "ralt": "alt_r",
+    "altgr": "alt_gr",
+    "win": "cmd",
+    "windows": "cmd",
+    "super": "cmd",
+    "meta": "cmd",
+    "command": "cmd",
+    "del": "delete",
+    "ins": "insert",
+    "bksp": "backspace",
+    "spacebar": "space",
+    "pgup": "page_up",
+    "pageup": "page_up",
+    "pgdn": "page_down",
+    "pagedown": "page_down",
+    "capslock": "caps_lock",
+    "numlock": "num_lock",
+    "scrolllock": "scroll_lock",
+    "printscreen": "print_screen",
+    "prtsc": "print_screen",
+    "arrowup": "up",
+    "arrowdown": "down",
+    "arrowleft": "left",
+    "arrowright": "right",
+}
+
+
+def _build_key_map() -> MappingProxyType:
+    keys = {member.name.lower(): member for member in Key}
+    for alias, target in _ALIASES.items():
+        if target in keys and alias not in keys:
+            keys[alias] = keys[target]
+    return MappingProxyType(keys)
+
+
+# 特殊鍵對照表 (名稱皆為小寫), 載入後不可修改
+KEY_MAP = _build_key_map()
+
+# 接受按鍵名稱作為參數的腳本 API
+_SINGLE_KEY_APIS = frozenset({"press", "key_down", "key_release", "resolve_key"})
+_KEY_ACTIONS = frozenset({"down", "up", "tap"})
+
+
+def resolve_key(key):
+    """
+    將按鍵名稱轉為 pynput 按鍵
+
+    Args:
+        key: 特殊鍵名稱或別名 (不分大小寫)、單一字元, 或已解析的按鍵 (原樣返回)
+
+    Returns:
+        特殊鍵為 pynput Key, 單一字元為字元本身
+
+    Raises:
+        ValueError: 未知的按鍵名稱
+    """
+    if not isinstance(key, str):
+        return key
+    special = KEY_MAP.get(key)
+    if special is not None:
+        return special
+    if len(key) == 1:
+        return key
+    special = KEY_MAP.get(key.lower())
+    if special is None:
+        raise ValueError(f"未知的按鍵名稱: {key}")
+    return special
+
+
+def is_valid_key(name: str) -> bool:
+    """按鍵名稱是否可解析"""
+    return len(name) == 1 or name.lower() in KEY_MAP
+
+
+def find_unknown_keys(tree: ast.AST) -> list[tuple[int, int, str]]:
+    """
+    找出腳本中以字串常數傳入的未知按鍵名稱
+    檢查 press/key_down/key_release/resolve_key 的第一個參數,
+    以及 key_sequence 的事件列表常數
+
+    Returns:
+        (行號, 欄號 (從 1 開始), 按鍵名稱) 列表
+    """
+    unknown = []
+
+    def check(node: ast.expr | None) -> None:
+        if (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, str)
+            and not is_valid_key(node.value)
+        ):
+            unknown.append((node.lineno, node.col_offset + 1, node.value))
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Name):
+            continue
+        name = node.func.id
+        if name in _SINGLE_KEY_APIS:
+            key_arg = node.args[0] if node.args else None
+            for keyword in node.keywords:
+                if keyword.arg == "key":
+                    key_arg = keyword.value
+            check(key_arg)
+        elif (
+            name == "key_sequence" and node.args and isinstance(node.args[0], ast.List | ast.Tuple)
+        ):
+            for event in node.args[0].elts:
+                if isinstance(event, ast.Tuple) and len(event.elts) == 2:
+                    action = event.elts[0]
+                    if isinstance(action, ast.Constant) and action.value in _KEY_ACTIONS:
+                        check(event.elts[1])
+                else:
+                    check(event)
+    return unknown
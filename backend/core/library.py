@@ -0,0 +1,166 @@
+"""
+腳本函式庫
+腳本可透過 import_script() 匯入其他腳本作為模組, 或以 call_script() 帶參數執行其他腳本
+編譯結果與匯入後的模組物件都會快取, 腳本被修改或刪除時 (由倉庫回呼) 才失效
+"""
+
+import threading
+from collections.abc import Callable
+from types import CodeType, ModuleType
+
+# 以 ID 或名稱查詢腳本, 返回 (腳本 ID, 內容), 找不到時返回 None
+ScriptSource = Callable[[str], tuple[str, str] | None]
+
+# call_script() 以被呼叫腳本中此變數的值作為回傳值
+RESULT_NAME = "result"
+
+# 函式庫程式碼的檔名, 與執行中腳本的 frame 區分 (行號回報、效能分析與錯誤行號只看執行中的腳本)
+LIBRARY_FILENAME = "<library>"
+
+
+def _as_library(code: CodeType) -> CodeType:
+    """將程式碼物件 (含巢狀的函數與類別) 的檔名改為 LIBRARY_FILENAME"""
+    consts = tuple(_as_library(c) if isinstance(c, CodeType) else c for c in code.co_consts)
+    return code.replace(co_filename=LIBRARY_FILENAME, co_consts=consts)
+
+
+class _Entry:
+    """單一函式庫腳本的快取"""
+
+    __slots__ = ("code", "module", "name", "version")
+
+    def __init__(self, name: str, code: CodeType, version: int):
+        self.name = name
+        self.code = code
+        self.version = version
+        self.module: ModuleType | None = None
+
+
+class ScriptLibrary:
+    """函式庫腳本的編譯與模組快取 (含循環匯入偵測)"""
+
+    def __init__(self, source: ScriptSource, compile_fn: Callable[[str], CodeType]):
+        """
+        Args:
+            source: 以 ID 或名稱查詢腳本內容的函數
+            compile_fn: 編譯函數 (與一般執行相同的檢查與快取)
+        """
+        self._source = source
+        self._compile = compile_fn
+        self._lock = threading.RLock()
+        self._entries: dict[str, _Entry] = {}  # 腳本 ID -> 快取
+        self._refs: dict[str, str] = {}  # ID 或名稱 -> 腳本 ID
+        self._version = 0
+        # 目前執行緒正在匯入/呼叫中的腳本 ID, 用於偵測循環
+        self._local = threading.local()
+
+    def invalidate(self, script_id: str | None = None) -> None:
+        """
+        讓快取失效
+
+        Args:
+            script_id: 被修改或刪除的腳本 ID, None 表示全部
+        """
+        with self._lock:
+            if script_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(script_id, None)
+            # 名稱可能已改變, 重新解析所有參照
+            self._refs.clear()
+
+    def entry(self, ref: str) -> tuple[str, _Entry]:
+        """
+        取得函式庫腳本的快取 (必要時查詢並編譯)
+
+        Returns:
+            (腳本 ID, 快取)
+
+        Raises:
+            ImportError: 找不到腳本
+        """
+        with self._lock:
+            script_id = self._refs.get(ref)
+            if script_id is not None:
+                entry = self._entries.get(script_id)
+                if entry is not None:
+                    return script_id, entry
+
+        found = self._source(ref)
+        if found is None:
+            raise ImportError(f"找不到腳本: {ref}")
+        script_id, content = found
+        with self._lock:
+            entry = self._entries.get(script_id)
+            if entry is None:
+                self._version += 1
+                # 編譯結果可能與執行中的腳本共用快取, 改名後的是新的程式碼物件
+                code = _as_library(self._compile(content))
+                entry = self._entries[script_id] = _Entry(ref, code, self._version)
+            self._refs[ref] = script_id
+        return script_id, entry
+
+    def import_module(self, ref: str, api: Callable[[], dict]) -> ModuleType:
+        """
+        匯入函式庫腳本: 第一次匯入時執行一次並快取模組, 之後直接返回同一個模組
+
+        Args:
+            ref: 腳本 ID 或名稱
+            api: 返回模組可使用的腳本 API 的函數 (只在第一次匯入時呼叫)
+        """
+        script_id, entry = self.entry(ref)
+        module = entry.module
+        if module is not None:
+            return module
+
+        module = ModuleType(f"script:{ref}")
+        module.__dict__.update(api())
+        with self._enter(script_id, ref):
+            exec(entry.code, module.__dict__)
+        # 執行期間腳本被修改時, 不快取舊版本的模組
+        with self._lock:
+            if self._entries.get(script_id) is entry:
+                entry.module = module
+        return module
+
+    def call(self, ref: str, api: dict, kwargs: dict):
+        """
+        以新的命名空間執行腳本, 關鍵字參數作為全域變數
+
+        Returns:
+            被呼叫腳本中 result 變數的值 (未設定時為 None)
+        """
+        script_id, entry = self.entry(ref)
+        namespace = dict(api)
+        namespace.update(kwargs)
+        with self._enter(script_id, ref):
+            exec(entry.code, namespace)
+        return namespace.get(RESULT_NAME)
+
+    def begin_run(self, script_id: str | None) -> None:
+        """開始一次執行 (在腳本執行緒呼叫), 以執行中的腳本作為循環偵測的起點"""
+        self._local.stack = [(script_id, script_id)] if script_id else []
+
+    def _enter(self, script_id: str, ref: str) -> "_Frame":
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return _Frame(stack, script_id, ref)
+
+
+class _Frame:
+    """匯入/呼叫期間在堆疊上記錄腳本, 同一個腳本重複出現即為循環"""
+
+    def __init__(self, stack: list, script_id: str, ref: str):
+        self._stack = stack
+        self._item = (script_id, ref)
+
+    def __enter__(self):
+        script_id = self._item[0]
+        if any(item[0] == script_id for item in self._stack):
+            chain = " -> ".join(ref for _, ref in [*self._stack, self._item])
+            raise ImportError(f"偵測到循環匯入: {chain}")
+        self._stack.append(self._item)
+
+    def __exit__(self, *exc):
+        self._stack.pop()
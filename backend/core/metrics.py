@@ -0,0 +1,330 @@
+"""
+指標收集
+Prometheus 文字格式的計數器、直方圖與量表, 由 /metrics 端點輸出
+記錄時只寫入目前執行緒的分片 (不加鎖), 輸出時才合併所有分片
+"""
+
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Generic, TypeVar
+
+# 預設直方圖區間 (秒), 涵蓋微秒級的熱路徑到數分鐘的腳本執行
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+# 分片數量超過此值時, 先合併已結束執行緒的分片 (腳本與熱鍵每次都會建立新執行緒)
+_MAX_SHARDS = 64
+
+# 每組標籤的數值型別 (計數器為 float, 直方圖為各區間次數、總和與總次數的列表)
+ValueT = TypeVar("ValueT")
+
+
+class _Shard(Generic[ValueT]):
+    """單一執行緒的指標數值"""
+
+    __slots__ = ("thread", "values")
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.values: dict[tuple, ValueT] = {}
+
+
+class _Metric(ABC):
+    """指標基礎類別"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _label_text(self, key: tuple, extra: str = "") -> str:
+        # 標籤數量不符 (呼叫端錯誤) 時只輸出對應的部分, 不影響其他指標的輸出
+        parts = [
+            f'{name}="{_escape(str(value))}"'
+            for name, value in zip(self.labelnames, key, strict=False)
+        ]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> list[str]:
+        """輸出 Prometheus 文字格式"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    @abstractmethod
+    def _render_samples(self) -> list[str]:
+        """輸出各組標籤的樣本行"""
+
+
+class _ShardedMetric(_Metric, Generic[ValueT]):
+    """依執行緒分片記錄的指標 - 處理分片管理與合併"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[_Shard[ValueT]] = []
+        # 已結束執行緒的累計數值
+        self._retired: dict[tuple, ValueT] = {}
+
+    def _new_shard(self) -> dict[tuple, ValueT]:
+        """建立目前執行緒的分片, 回傳其數值字典"""
+        shard: _Shard[ValueT] = _Shard()
+        with self._lock:
+            if len(self._shards) >= _MAX_SHARDS:
+                self._retire_dead_shards()
+            self._shards.append(shard)
+        self._local.values = shard.values
+        return shard.values
+
+    def _retire_dead_shards(self) -> None:
+        """將已結束執行緒的分片併入累計數值 (需持有鎖)"""
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                for key, value in shard.values.items():
+                    self._merge(self._retired, key, value)
+        self._shards = alive
+
+    def _collect(self) -> dict[tuple, ValueT]:
+        """合併所有分片的數值"""
+        with self._lock:
+            self._retire_dead_shards()
+            merged: dict[tuple, ValueT] = {}
+            for key, value in self._retired.items():
+                self._merge(merged, key, value)
+            for shard in self._shards:
+                # 複製以避免在其他執行緒新增標籤時迭代
+                for key, value in list(shard.values.items()):
+                    self._merge(merged, key, value)
+        return merged
+
+    @abstractmethod
+    def _merge(self, target: dict[tuple, ValueT], key: tuple, value: ValueT) -> None:
+        """將一個分片的數值併入 target"""
+
+
+class Counter(_ShardedMetric[float]):
+    """只增不減的計數器"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, labels: tuple = ()) -> None:
+        """增加計數"""
+        # 熱路徑: 直接存取目前執行緒的分片, 不加鎖
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._new_shard()
+        values[labels] = values.get(labels, 0.0) + amount
+
+    def _merge(self, target: dict[tuple, float], key: tuple, value: float) -> None:
+        target[key] = target.get(key, 0.0) + value
+
+    def _render_samples(self) -> list[str]:
+        return [
+            f"{self.name}{self._label_text(key)} {_format(value)}"
+            for key, value in sorted(self._collect().items())
+        ]
+
+
+class Histogram(_ShardedMetric[list[float]]):
+    """直方圖 (記錄各區間的次數、總和與總次數)"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        """記錄一個觀測值"""
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._new_shard()
+        data = values.get(labels)
+        if data is None:
+            # [各區間次數..., +Inf 區間次數, 總和, 總次數]
+            data = [0.0] * (len(self.buckets) + 3)
+            values[labels] = data
+        data[bisect.bisect_left(self.buckets, value)] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    @contextmanager
+    def time(self, labels: tuple = ()) -> Iterator[None]:
+        """計時區塊並記錄耗時 (秒)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def _merge(self, target: dict[tuple, list[float]], key: tuple, value: list[float]) -> None:
+        existing = target.get(key)
+        if existing is None:
+            target[key] = list(value)
+        else:
+            for i, count in enumerate(value):
+                existing[i] += count
+
+    def _render_samples(self) -> list[str]:
+        lines = []
+        for key, data in sorted(self._collect().items()):
+            cumulative = 0.0
+            # data 的最後兩項為總和與總次數
+            bounds = (*self.buckets, math.inf)
+            for bound, count in zip(bounds, data[: len(bounds)], strict=True):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _format(bound)
+                labels = self._label_text(key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {_format(cumulative)}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format(data[-2])}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {_format(data[-1])}")
+        return lines
+
+
+class Gauge(_Metric):
+    """量表 (輸出時才呼叫回呼函數取值, 不佔用熱路徑)"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.callback = callback
+
+    def _render_samples(self) -> list[str]:
+        try:
+            value = float(self.callback())
+        except Exception:
+            return []
+        return [f"{self.name} {_format(value)}"]
+
+
+class MetricsRegistry:
+    """指標註冊表"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        """註冊指標 (同名指標會被取代)"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float]) -> Gauge:
+        metric = Gauge(name, documentation, callback)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """輸出所有指標 (Prometheus 文字格式 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# 全域註冊表與指標定義
+registry = MetricsRegistry()
+
+HOTKEY_TO_EXEC_SECONDS = registry.histogram(
+    "xxscript_hotkey_to_exec_seconds", "熱鍵按下到腳本開始執行的延遲"
+)
+SCRIPT_DURATION_SECONDS = registry.histogram(
+    "xxscript_script_duration_seconds", "腳本執行時長", ("status",)
+)
+ENGINE_API_CALLS = registry.counter(
+    "xxscript_engine_api_calls_total", "腳本引擎 API 呼叫次數", ("function",)
+)
+ENGINE_PAUSE_WAIT_SECONDS = registry.histogram(
+    "xxscript_engine_pause_wait_seconds", "_check_state 因暫停而等待的時間"
+)
+RECORDER_EVENTS = registry.counter(
+    "xxscript_recorder_events_total", "錄製器記錄的事件數", ("type",)
+)
+RECORDER_EVENTS_DROPPED = registry.counter(
+    "xxscript_recorder_events_dropped_total", "錄製器捨棄或合併的事件數", ("reason",)
+)
+COMPILE_CACHE_LOOKUPS = registry.counter(
+    "xxscript_compile_cache_lookups_total", "腳本編譯快取查詢次數", ("result",)
+)
+SCHEDULER_RUNS = registry.counter(
+    "xxscript_scheduler_runs_total", "排程到期的處理結果", ("result",)
+)
+STORAGE_SECONDS = registry.histogram(
+    "xxscript_storage_seconds", "資料檔載入/儲存耗時", ("store", "operation")
+)
+WS_BROADCAST_SECONDS = registry.histogram(
+    "xxscript_ws_broadcast_seconds", "WebSocket 廣播分派到所有連線佇列的耗時"
+)
+WS_DISCONNECTS = registry.counter(
+    "xxscript_ws_disconnects_total", "因緩慢或發送失敗而中斷的 WebSocket 連線數", ("reason",)
+)
@@ -0,0 +1,219 @@
+"""
+腳本效能分析器
+以 sys.settrace 追蹤腳本的每一行, 統計執行次數、累計時間與自身時間,
+並將自身時間拆分為引擎 API 時間與使用者程式碼時間
+只在啟用分析的執行中安裝追蹤函數, 未啟用時沒有任何額外開銷
+"""
+
+import sys
+import time
+from bisect import bisect_right
+from collections.abc import Callable
+from types import CodeType, FrameType
+
+# 腳本編譯時使用的檔名, 用來辨識腳本自身的 frame
+SCRIPT_FILENAME = "<script>"
+
+# 程式碼物件超過此長度 (bytecode 位元組) 才使用行號對照表, 一般腳本直接讀取 f_lineno
+_LINE_TABLE_MIN_CODE = 4096
+_LINE_TABLE_MAX_ENTRIES = 64
+# id(程式碼物件) -> (程式碼物件, 各範圍起點 offset, 對應行號)
+_line_tables: dict[int, tuple[CodeType, list[int], list[int | None]]] = {}
+
+
+def frame_line(frame: FrameType) -> int:
+    """
+    frame 目前執行的行號
+    未追蹤時 f_lineno 每次都從頭掃描行號表, 錄製產生的數千行腳本 (單一程式碼物件)
+    每次 API 呼叫都變成 O(行數); 大型程式碼物件改為建立一次對照表, 之後以二分搜尋查詢
+    """
+    code = frame.f_code
+    if len(code.co_code) < _LINE_TABLE_MIN_CODE:
+        return frame.f_lineno
+    table = _line_tables.get(id(code))
+    if table is None or table[0] is not code:
+        if len(_line_tables) >= _LINE_TABLE_MAX_ENTRIES:
+            _line_tables.clear()
+        starts, lines = [], []
+        for start, _end, line in code.co_lines():
+            starts.append(start)
+            lines.append(line)
+        table = _line_tables[id(code)] = (code, starts, lines)
+    line = table[2][bisect_right(table[1], frame.f_lasti) - 1]
+    return line if line is not None else frame.f_lineno
+
+
+class _LineStats:
+    """單一行的統計"""
+
+    __slots__ = ("api_calls", "api_time", "hits", "self_time", "total_time")
+
+    def __init__(self):
+        self.hits = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+        self.api_time = 0.0
+        self.api_calls: dict[str, int] = {}
+
+
+class _FrameState:
+    """腳本 frame 目前所在行的計時狀態"""
+
+    __slots__ = ("api_time", "child_time", "entered", "line", "start")
+
+    def __init__(self, now: float):
+        self.entered = now
+        self.line = 0
+        self.start = now
+        self.child_time = 0.0
+        self.api_time = 0.0
+
+
+class ScriptProfiler:
+    """腳本行級效能分析器"""
+
+    def __init__(self, api_functions: dict[str, Callable]):
+        """
+        Args:
+            api_functions: 腳本可用的引擎 API (名稱 -> 綁定方法), 用於辨識 API 呼叫
+        """
+        self._api_codes: dict[CodeType, str] = {}
+        for name, func in api_functions.items():
+            code = getattr(getattr(func, "__func__", func), "__code__", None)
+            if code is not None:
+                self._api_codes[code] = name
+
+        self._lines: dict[int, _LineStats] = {}
+        self._api_totals: dict[str, list] = {}  # {name: [次數, 時間]}
+        self._stack: list[_FrameState] = []
+        self._api_started: dict[FrameType, float] = {}
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def start(self) -> None:
+        """在目前執行緒安裝追蹤函數 (必須在腳本執行緒中呼叫)"""
+        self._started = time.perf_counter()
+        sys.settrace(self._trace_call)
+
+    def stop(self) -> None:
+        """移除追蹤函數"""
+        sys.settrace(None)
+        if self._started:
+            self._elapsed = time.perf_counter() - self._started
+
+    def _stats(self, line: int) -> _LineStats:
+        stats = self._lines.get(line)
+        if stats is None:
+            stats = self._lines[line] = _LineStats()
+        return stats
+
+    def _close_line(self, state: _FrameState, now: float) -> None:
+        """結束 frame 目前所在行的計時, 累加到該行統計"""
+        if state.line:
+            elapsed = now - state.start
+            stats = self._stats(state.line)
+            stats.total_time += elapsed
+            stats.self_time += elapsed - state.child_time
+            stats.api_time += state.api_time
+        state.start = now
+        state.child_time = 0.0
+        state.api_time = 0.0
+
+    def _trace_call(self, frame: FrameType, event: str, arg):
+        """全域追蹤函數: 只追蹤腳本 frame 與腳本直接呼叫的 API"""
+        if event != "call":
+            return None
+
+        if frame.f_code.co_filename == SCRIPT_FILENAME:
+            self._stack.append(_FrameState(time.perf_counter()))
+            return self._trace_script
+
+        api_name = self._api_codes.get(frame.f_code)
+        caller = frame.f_back
+        if api_name is not None and caller and caller.f_code.co_filename == SCRIPT_FILENAME:
+            # API 內部不需要逐行事件, 只需要 return 事件計時
+            frame.f_trace_lines = False
+            self._api_started[frame] = time.perf_counter()
+            return self._trace_api
+        return None
+
+    def _trace_script(self, frame: FrameType, event: str, arg):
+        """腳本 frame 的追蹤函數"""
+        if not self._stack:
+            return None
+        now = time.perf_counter()
+        state = self._stack[-1]
+
+        if event == "line":
+            self._close_line(state, now)
+            state.line = frame.f_lineno
+            self._stats(state.line).hits += 1
+        elif event == "return":
+            self._close_line(state, now)
+            self._stack.pop()
+            # 子 frame 的完整耗時計入呼叫端所在行的累計時間
+            if self._stack:
+                self._stack[-1].child_time += now - state.entered
+        return self._trace_script
+
+    def _trace_api(self, frame: FrameType, event: str, arg):
+        """API frame 的追蹤函數: 計時並歸屬到呼叫端所在行"""
+        if event != "return":
+            return self._trace_api
+
+        started = self._api_started.pop(frame, None)
+        if started is None or not self._stack:
+            return None
+        elapsed = time.perf_counter() - started
+        name = self._api_codes[frame.f_code]
+
+        state = self._stack[-1]
+        state.api_time += elapsed
+        stats = self._stats(state.line)
+        stats.api_calls[name] = stats.api_calls.get(name, 0) + 1
+
+        totals = self._api_totals.setdefault(name, [0, 0.0])
+        totals[0] += 1
+        totals[1] += elapsed
+        return None
+
+    def report(self, source: str) -> dict:
+        """
+        產生分析報告
+
+        Args:
+            source: 腳本原始碼 (用於附上每行內容)
+
+        Returns:
+            包含總計、每行統計與各 API 統計的報告
+        """
+        source_lines = source.splitlines()
+        lines = []
+        for line_no in sorted(self._lines):
+            stats = self._lines[line_no]
+            lines.append(
+                {
+                    "line": line_no,
+                    "source": source_lines[line_no - 1].strip()
+                    if 0 < line_no <= len(source_lines)
+                    else "",
+                    "hits": stats.hits,
+                    "total_time": round(stats.total_time, 6),
+                    "self_time": round(stats.self_time, 6),
+                    "api_time": round(stats.api_time, 6),
+                    "user_time": round(max(0.0, stats.self_time - stats.api_time), 6),
+                    "api_calls": stats.api_calls,
+                }
+            )
+
+        api_time = sum(totals[1] for totals in self._api_totals.values())
+        return {
+            "total_time": round(self._elapsed, 6),
+            "api_time": round(api_time, 6),
+            "user_time": round(max(0.0, self._elapsed - api_time), 6),
+            "lines": lines,
+            "api": {
+                name: {"calls": totals[0], "time": round(totals[1], 6)}
+                for name, totals in sorted(self._api_totals.items())
+            },
+        }
@@ -1,20 +1,47 @@
 """
 腳本錄製器
 記錄滑鼠與鍵盤操作,生成可執行的 Python 腳本
+按下/釋放成對記錄,時間戳使用單調時鐘 (perf_counter_ns),回放時重現實際按住時長
 """
 
+import logging
+import threading
 import time
 
 from pynput import keyboard, mouse
 
+from config.settings import RECORDER_MIN_DELAY, RECORDER_MOVE_THRESHOLD
+from core.engine import MOUSE_BUTTONS
+from core.metrics import RECORDER_EVENTS, RECORDER_EVENTS_DROPPED
+
+logger = logging.getLogger(__name__)
+
+_NS_PER_SECOND = 1_000_000_000
+# 生成的 sleep() 精度為毫秒, 更短的延遲累積到下一次輸出
+_MIN_SLEEP_NS = 1_000_000
+# 按下/釋放事件: 之前的延遲一律輸出 (按住時長與按鍵之間的間隔都需精確保留)
+_PRESS_EVENTS = ("key_down", "key_release", "mouse_down", "mouse_release")
+
 
 class ScriptRecorder:
     def __init__(self):
         self.recording = False
         self.events: list[dict] = []
-        self.start_time: float = 0.0
+        self.start_ns: int = 0
         self.mouse_listener: mouse.Listener | None = None
         self.keyboard_listener: keyboard.Listener | None = None
+        # 目前按住中的按鍵/按鈕, 用於過濾重複按下 (自動連發) 與未配對的釋放
+        # 按鍵以虛擬鍵碼 (沒有時以名稱) 識別: 按下 shift+a 得到 'A', 先放開 shift 時釋放的是 'a'
+        self._held_keys: dict[int | str, str] = {}
+        self._held_buttons: set[str] = set()
+        # 滑鼠與鍵盤監聽器在不同執行緒回呼, 修改事件列表時需加鎖
+        self._lock = threading.Lock()
+        # 即時串流: 自上次取出後第一個新增或變更的事件索引
+        self._stream_from = 0
+
+    def _elapsed_ns(self) -> int:
+        """取得自錄製開始經過的奈秒數 (單調時鐘)"""
+        return time.perf_counter_ns() - self.start_ns
 
     def start_recording(self):
         """開始錄製"""
@@ -23,19 +50,24 @@ class ScriptRecorder:
 
         self.recording = True
         self.events = []
-        self.start_time = time.time()
+        self._stream_from = 0
+        self._held_keys.clear()
+        self._held_buttons.clear()
+        self.start_ns = time.perf_counter_ns()
 
         # 啟動滑鼠監聽
         self.mouse_listener = mouse.Listener(
-            on_move=self.on_mouse_move, on_click=self.on_mouse_click
+            on_move=self.on_mouse_move, on_click=self.on_mouse_click, on_scroll=self.on_mouse_scroll
         )
         self.mouse_listener.start()
 
         # 啟動鍵盤監聽
-        self.keyboard_listener = keyboard.Listener(on_press=self.on_key_press)
+        self.keyboard_listener = keyboard.Listener(
+            on_press=self.on_key_press, on_release=self.on_key_release
+        )
         self.keyboard_listener.start()
 
-        print("開始錄製腳本...")
+        logger.info("開始錄製腳本")
 
     def stop_recording(self) -> str:
         """停止錄製並生成腳本"""
@@ -52,7 +84,7 @@ class ScriptRecorder:
 
         # 生成腳本
         script = self.generate_script()
-        print(f"錄製完成,共記錄 {len(self.events)} 個事件")
+        logger.info("錄製完成, 共記錄 %d 個事件", len(self.events))
 
         return script
 
@@ -61,36 +93,66 @@ class ScriptRecorder:
         if not self.recording:
             return
 
-        # 只記錄間隔較大的移動,避免過多事件
-        if self.events and self.events[-1]["type"] == "mouse_move":
-            last_event = self.events[-1]
-            # 如果距離很近,更新最後一個事件而不是新增
-            if abs(last_event["x"] - x) < 10 and abs(last_event["y"] - y) < 10:
-                last_event["x"] = x
-                last_event["y"] = y
-                last_event["timestamp"] = time.time() - self.start_time
-                return
+        t_ns = self._elapsed_ns()
 
-        self.events.append(
-            {"type": "mouse_move", "x": x, "y": y, "timestamp": time.time() - self.start_time}
-        )
+        with self._lock:
+            # 只記錄間隔較大的移動,避免過多事件
+            if self.events and self.events[-1]["type"] == "mouse_move":
+                last_event = self.events[-1]
+                # 如果距離很近,更新最後一個事件而不是新增
+                if (
+                    abs(last_event["x"] - x) < RECORDER_MOVE_THRESHOLD
+                    and abs(last_event["y"] - y) < RECORDER_MOVE_THRESHOLD
+                ):
+                    last_event["x"] = x
+                    last_event["y"] = y
+                    last_event["t_ns"] = t_ns
+                    # 已推送過的事件被更新, 下次串流需重新送出
+                    self._stream_from = min(self._stream_from, len(self.events) - 1)
+                    RECORDER_EVENTS_DROPPED.inc(labels=("coalesced",))
+                    return
+
+            self.events.append({"type": "mouse_move", "x": x, "y": y, "t_ns": t_ns})
+        RECORDER_EVENTS.inc(labels=("mouse_move",))
 
     def on_mouse_click(self, x, y, button, pressed):
-        """滑鼠點擊事件"""
-        if not self.recording or not pressed:  # 只記錄按下,不記錄釋放
+        """滑鼠按下/釋放事件"""
+        if not self.recording:
+            return
+
+        t_ns = self._elapsed_ns()
+        button_name = self._button_to_string(button)
+        # 回放不支援的按鈕 (例如部分滑鼠的額外按鍵) 不記錄, 避免生成無法執行的腳本
+        if button_name is None:
+            RECORDER_EVENTS_DROPPED.inc(labels=("unsupported_button",))
             return
 
-        button_name = "left" if button == mouse.Button.left else "right"
+        with self._lock:
+            if pressed:
+                self._held_buttons.add(button_name)
+                event_type = "mouse_down"
+            else:
+                # 忽略錄製開始前就已按下的按鈕
+                if button_name not in self._held_buttons:
+                    RECORDER_EVENTS_DROPPED.inc(labels=("unpaired_release",))
+                    return
+                self._held_buttons.discard(button_name)
+                event_type = "mouse_release"
 
-        self.events.append(
-            {
-                "type": "mouse_click",
-                "x": x,
-                "y": y,
-                "button": button_name,
-                "timestamp": time.time() - self.start_time,
-            }
-        )
+            self.events.append(
+                {"type": event_type, "x": x, "y": y, "button": button_name, "t_ns": t_ns}
+            )
+        RECORDER_EVENTS.inc(labels=(event_type,))
+
+    def on_mouse_scroll(self, x, y, dx, dy):
+        """滑鼠滾輪事件"""
+        if not self.recording:
+            return
+
+        event = {"type": "scroll", "x": x, "y": y, "dx": dx, "dy": dy, "t_ns": self._elapsed_ns()}
+        with self._lock:
+            self.events.append(event)
+        RECORDER_EVENTS.inc(labels=("scroll",))
 
     def on_key_press(self, key):
         """鍵盤按下事件"""
@@ -98,20 +160,67 @@ class ScriptRecorder:
             return
 
         try:
-            # 取得按鍵字串
-            if hasattr(key, "char") and key.char:
-                key_str = key.char
-            elif hasattr(key, "name"):
-                key_str = key.name
-            else:
+            key_str = self._key_to_string(key)
+            # 按住時系統會持續送出按下事件 (自動連發), 只記錄第一次
+            if not key_str:
+                return
+            identity = self._key_identity(key, key_str)
+            if identity in self._held_keys:
+                RECORDER_EVENTS_DROPPED.inc(labels=("autorepeat",))
                 return
 
-            self.events.append(
-                {"type": "key_press", "key": key_str, "timestamp": time.time() - self.start_time}
-            )
+            self._held_keys[identity] = key_str
+            event = {"type": "key_down", "key": key_str, "t_ns": self._elapsed_ns()}
+            with self._lock:
+                self.events.append(event)
+            RECORDER_EVENTS.inc(labels=("key_down",))
+        except Exception:
+            pass
+
+    def on_key_release(self, key):
+        """鍵盤釋放事件"""
+        if not self.recording:
+            return
+
+        try:
+            key_str = self._key_to_string(key)
+            if not key_str:
+                return
+            # 以按下時記錄的名稱釋放; 忽略錄製開始前就已按下的按鍵
+            pressed = self._held_keys.pop(self._key_identity(key, key_str), None)
+            if pressed is None:
+                RECORDER_EVENTS_DROPPED.inc(labels=("unpaired_release",))
+                return
+            key_str = pressed
+            event = {"type": "key_release", "key": key_str, "t_ns": self._elapsed_ns()}
+            with self._lock:
+                self.events.append(event)
+            RECORDER_EVENTS.inc(labels=("key_release",))
         except Exception:
             pass
 
+    def _key_to_string(self, key) -> str:
+        """將按鍵轉換為字串 (字母一律小寫, 大小寫由同時錄製的 shift 決定)"""
+        if hasattr(key, "char") and key.char:
+            return str(key.char).lower()
+        if hasattr(key, "name"):
+            return str(key.name)
+        return ""
+
+    @staticmethod
+    def _key_identity(key, key_str: str) -> int | str:
+        """按下與釋放配對用的識別 (虛擬鍵碼不受 shift 影響, 沒有時以名稱識別)"""
+        vk = getattr(key, "vk", None)
+        if vk is None:
+            # 特殊鍵 (Key.shift 等) 的鍵碼在 value 中
+            vk = getattr(getattr(key, "value", None), "vk", None)
+        return vk if isinstance(vk, int) else key_str
+
+    def _button_to_string(self, button) -> str | None:
+        """將滑鼠按鈕轉換為字串 (左、右、中鍵與側鍵, 依 pynput 的名稱), 回放不支援時返回 None"""
+        name = str(getattr(button, "name", button))
+        return name if name in MOUSE_BUTTONS else None
+
     def generate_script(self) -> str:
         """生成 Python 腳本"""
         if not self.events:
@@ -123,34 +232,64 @@ class ScriptRecorder:
             "",
         ]
 
-        last_timestamp = 0
+        min_delay_ns = int(RECORDER_MIN_DELAY * _NS_PER_SECOND)
+        # 尚未輸出的延遲 (奈秒), 小於閾值的延遲會累積到下一次輸出, 避免總時長漂移
+        pending_ns = 0
+        last_ns = 0
+        last_position = None
 
         for event in self.events:
-            # 計算延遲
-            delay = event["timestamp"] - last_timestamp
-            if delay > 0.05:  # 大於 50ms 才加入延遲
-                lines.append(f"sleep({delay:.2f})")
+            pending_ns += event["t_ns"] - last_ns
+            last_ns = event["t_ns"]
+
+            # 按住時長與按鍵之間的間隔必須精確保留, 其他事件只在延遲大於閾值時才加入
+            if pending_ns >= _MIN_SLEEP_NS and (
+                pending_ns >= min_delay_ns or event["type"] in _PRESS_EVENTS
+            ):
+                lines.append(f"sleep({pending_ns / _NS_PER_SECOND:.3f})")
+                pending_ns = 0
 
             # 根據事件類型生成程式碼
-            if event["type"] == "mouse_move":
-                lines.append(f"move({event['x']}, {event['y']})")
-            elif event["type"] == "mouse_click":
-                lines.append(f"click(button='{event['button']}')")
-            elif event["type"] == "key_press":
-                key = event["key"]
-                if len(key) == 1:  # 單一字元
-                    lines.append(f"type_text('{key}')")
-                else:  # 特殊鍵
-                    lines.append(f"press('{key}')")
-
-            last_timestamp = event["timestamp"]
+            event_type = event["type"]
+            if "x" in event:
+                # 滑鼠事件前確保游標位於錄製到的位置
+                position = (event["x"], event["y"])
+                if position != last_position:
+                    lines.append(f"move({event['x']}, {event['y']})")
+                    last_position = position
+
+            if event_type in ("mouse_down", "mouse_release"):
+                lines.append(f"{event_type}({event['button']!r})")
+            elif event_type == "scroll":
+                lines.append(f"scroll({event['dx']}, {event['dy']})")
+            elif event_type in ("key_down", "key_release"):
+                lines.append(f"{event_type}({event['key']!r})")
+
+        # 錄製結束時仍按住的按鍵/按鈕需釋放, 避免回放後卡住
+        for key_str in sorted(self._held_keys.values()):
+            lines.append(f"key_release({key_str!r})")
+        for button_name in sorted(self._held_buttons):
+            lines.append(f"mouse_release({button_name!r})")
 
         return "\n".join(lines)
 
+    def drain_updates(self) -> tuple[int, list[dict]]:
+        """
+        取出自上次呼叫後新增或變更的事件 (供即時串流使用)
+
+        Returns:
+            (起始索引, 事件副本列表), 客戶端以起始索引覆寫/附加到本地事件列表
+        """
+        with self._lock:
+            offset = self._stream_from
+            batch = [dict(event) for event in self.events[offset:]]
+            self._stream_from = len(self.events)
+        return offset, batch
+
     def get_status(self) -> dict:
         """取得錄製狀態"""
         return {
             "recording": self.recording,
             "event_count": len(self.events),
-            "duration": time.time() - self.start_time if self.recording else 0,
+            "duration": self._elapsed_ns() / _NS_PER_SECOND if self.recording else 0,
         }
@@ -0,0 +1,273 @@
+"""
+腳本排程器
+單一執行緒以最小堆積管理所有排程 (新增、更新、移除皆為 O(log n)),
+只在最早的到期時間醒來, 到期時將腳本交給引擎執行
+支援固定間隔 (interval)、cron 表示式 (cron) 與指定時間執行一次 (at)
+每個排程最後一次處理的預定時間寫入狀態檔, 重新啟動後據此套用錯過執行的處理方式
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from core.metrics import SCHEDULER_RUNS
+from core.triggers import Trigger
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    """單一腳本的排程狀態"""
+
+    __slots__ = ("due", "script_id", "trigger")
+
+    def __init__(self, script_id: str, trigger: Trigger, due: datetime):
+        self.script_id = script_id
+        self.trigger = trigger
+        self.due = due
+
+
+class Scheduler:
+    """
+    排程器
+    更新或移除排程時不從堆積中刪除舊項目, 只讓它失效 (不再是該腳本目前的排程),
+    取出時略過; 失效項目過多時重建堆積
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[str], bool],
+        misfire_grace: float,
+        retry_interval: float,
+        max_sleep: float,
+        min_interval: float = 0.0,
+        state_file: Path | None = None,
+    ):
+        """
+        Args:
+            dispatch: 執行腳本的函數, 參數為腳本 ID, 返回是否已開始執行 (引擎忙碌時為 False)
+            misfire_grace: 到期後超過此秒數 (例如系統休眠) 才執行即視為錯過
+            retry_interval: run_once 排程遇到引擎忙碌時的重試間隔 (秒)
+            max_sleep: 最長睡眠時間 (秒), 定期醒來以因應系統時間調整
+            min_interval: interval 排程的最小間隔 (秒)
+            state_file: 記錄各排程最後執行時間的檔案 (None 表示不保存, 重新啟動後不補執行)
+        """
+        self._dispatch = dispatch
+        self._grace = timedelta(seconds=misfire_grace)
+        self._retry = timedelta(seconds=retry_interval)
+        self._max_sleep = max_sleep
+        self.min_interval = min_interval
+        self._state_file = state_file
+        # 腳本 ID -> 最後一次處理 (執行或略過) 的預定時間, 由 replace_all 從狀態檔載入
+        self._last_runs: dict[str, datetime] = {}
+
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int, _Job]] = []
+        self._jobs: dict[str, _Job] = {}
+        self._seq = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    # 排程管理
+    def set(
+        self,
+        script_id: str,
+        schedule: dict | None,
+        now: datetime | None = None,
+        catch_up: bool = False,
+    ) -> None:
+        """
+        設定腳本的排程 (取代原有排程), schedule 為 None 時移除
+
+        Args:
+            catch_up: 依最後執行時間檢查停止期間錯過的執行 (啟動時使用),
+                run_once 排程立即補執行一次, skip 排程記錄後略過
+
+        Raises:
+            ValueError: 排程設定錯誤 (原有排程已移除)
+        """
+        with self._cond:
+            self._jobs.pop(script_id, None)
+            if schedule is None:
+                return
+            trigger = Trigger.from_dict(schedule, self.min_interval)
+            now = now or datetime.now()
+            due = trigger.first(now)
+            if catch_up:
+                missed = trigger.missed_since(self._last_runs.get(script_id), now)
+                if missed is not None and trigger.missed == "run_once":
+                    # 保留原本的預定時間, 到期處理時視為錯過並補執行
+                    due = missed
+                elif missed is not None:
+                    self._last_runs[script_id] = missed
+                    SCHEDULER_RUNS.inc(labels=("missed",))
+                    logger.info("排程在停止期間錯過, 略過: %s (預定 %s)", script_id, missed)
+            if due is None:
+                if trigger.at is not None and trigger.at > self._last_runs.get(
+                    script_id, datetime.min
+                ):
+                    logger.warning("排程時間已過, 不會執行: %s (%s)", script_id, trigger.at)
+                return
+            self._push(_Job(script_id, trigger, due))
+            self._cond.notify()
+
+    def remove(self, script_id: str) -> None:
+        """移除腳本的排程"""
+        self.set(script_id, None)
+
+    def replace_all(self, schedules: Iterable[tuple[str, dict]]) -> int:
+        """
+        以新的排程列表取代全部排程 (設定錯誤的排程記錄警告並略過)
+
+        Returns:
+            已排程的腳本數
+        """
+        now = datetime.now()
+        with self._cond:
+            self._jobs.clear()
+            self._heap.clear()
+            self._last_runs = self._load_state()
+            for script_id, schedule in schedules:
+                try:
+                    self.set(script_id, schedule, now, catch_up=True)
+                except ValueError as e:
+                    logger.warning("腳本 %s 的排程設定錯誤: %s", script_id, e)
+            return len(self._jobs)
+
+    def upcoming(self, limit: int = 100) -> list[dict]:
+        """即將執行的排程 (依時間排序)"""
+        with self._cond:
+            jobs = list(self._jobs.values())
+        nearest = heapq.nsmallest(limit, jobs, key=lambda job: job.due)
+        return [
+            {"script_id": job.script_id, "type": job.trigger.kind, "next_run": job.due}
+            for job in nearest
+        ]
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _push(self, job: _Job) -> None:
+        """加入堆積 (呼叫端需持有鎖)"""
+        self._jobs[job.script_id] = job
+        heapq.heappush(self._heap, (job.due.timestamp(), next(self._seq), job))
+        # 失效項目超過有效項目兩倍時重建, 避免頻繁更新讓堆積無限成長
+        if len(self._heap) > 64 and len(self._heap) > 3 * len(self._jobs):
+            self._heap = [item for item in self._heap if self._is_live(item[2])]
+            heapq.heapify(self._heap)
+
+    def _is_live(self, job: _Job) -> bool:
+        return self._jobs.get(job.script_id) is job
+
+    # 執行緒
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _next_due(self) -> _Job | None:
+        """等待並取出下一個到期的排程 (停止時返回 None)"""
+        with self._cond:
+            while self._running:
+                while self._heap and not self._is_live(self._heap[0][2]):
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait(self._max_sleep)
+                    continue
+                remaining = self._heap[0][0] - time.time()
+                if remaining > 0:
+                    self._cond.wait(min(remaining, self._max_sleep))
+                    continue
+                return heapq.heappop(self._heap)[2]
+            return None
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_due()
+            if job is None:
+                return
+            try:
+                self._fire(job)
+            except Exception:
+                logger.exception("排程執行失敗: %s", job.script_id)
+
+    def _fire(self, job: _Job) -> None:
+        """執行到期的排程並安排下一次"""
+        now = datetime.now()
+        trigger = job.trigger
+        missed = now - job.due > self._grace
+        if missed and trigger.missed == "skip":
+            SCHEDULER_RUNS.inc(labels=("missed",))
+            logger.info("排程已錯過, 略過本次: %s (預定 %s)", job.script_id, job.due)
+        elif self._dispatch(job.script_id):
+            SCHEDULER_RUNS.inc(labels=("started",))
+        elif trigger.missed == "run_once":
+            # 引擎忙碌: 稍後重試, 預定時間不變 (重試期間錯過的執行合併為這一次)
+            SCHEDULER_RUNS.inc(labels=("retry",))
+            self._reschedule(job, now + self._retry, keep_due=True)
+            return
+        else:
+            SCHEDULER_RUNS.inc(labels=("busy",))
+            logger.info("引擎忙碌, 略過排程: %s", job.script_id)
+
+        self._record_run(job)
+        self._reschedule(job, trigger.next_after(job.due, now))
+
+    # 狀態檔
+    def _load_state(self) -> dict[str, datetime]:
+        """讀取各排程最後處理的預定時間 (檔案不存在或損毀時返回空字典)"""
+        if self._state_file is None or not self._state_file.exists():
+            return {}
+        try:
+            data = json.loads(self._state_file.read_text(encoding="utf-8"))
+            return {script_id: datetime.fromisoformat(due) for script_id, due in data.items()}
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            logger.warning("無法讀取排程狀態檔, 不補執行錯過的排程: %s", e)
+            return {}
+
+    def _record_run(self, job: _Job) -> None:
+        """記錄已處理的預定時間並寫入狀態檔 (只在排程執行緒呼叫)"""
+        with self._cond:
+            self._last_runs[job.script_id] = job.due
+            data = {script_id: due.isoformat() for script_id, due in self._last_runs.items()}
+        if self._state_file is None:
+            return
+        try:
+            self._state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._state_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            tmp.replace(self._state_file)
+        except OSError as e:
+            logger.warning("無法寫入排程狀態檔: %s", e)
+
+    def _reschedule(self, job: _Job, at: datetime | None, keep_due: bool = False) -> None:
+        with self._cond:
+            # 執行期間排程已被更新或移除
+            if self._jobs.get(job.script_id) is not job:
+                return
+            if at is None:
+                del self._jobs[job.script_id]
+                return
+            if keep_due:
+                # 以重試時間排入堆積, job.due 保留原本的預定時間供計算下一次
+                heapq.heappush(self._heap, (at.timestamp(), next(self._seq), job))
+                return
+            job.due = at
+            self._push(job)
+            self._cond.notify()
@@ -0,0 +1,322 @@
+"""
+螢幕擷取與影像比對
+擷取後端可替換: 實機使用 mss, 無桌面環境 (測試、基準測試) 使用合成畫面緩衝區
+擷取結果為 numpy RGB 陣列 (高 x 寬 x 3, uint8), 同一個時間片內的重複擷取共用同一張畫面
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+# 區域: (left, top, width, height), 以螢幕座標表示
+Region = tuple[int, int, int, int]
+
+# 讀取單一像素時擷取所在的對齊方塊, 讓同一時間片內鄰近像素的讀取共用擷取結果
+# (小區域擷取的成本主要是系統呼叫, 64 x 64 與 1 x 1 幾乎相同)
+_PIXEL_TILE = 64
+
+
+class CaptureBackend(Protocol):
+    """螢幕擷取後端"""
+
+    def bounds(self) -> Region:
+        """整個 (虛擬) 螢幕的範圍"""
+        ...
+
+    def grab(self, region: Region) -> np.ndarray:
+        """擷取區域, 回傳 RGB 陣列 (高 x 寬 x 3, uint8)"""
+        ...
+
+    def close(self) -> None:
+        """釋放擷取資源 (之後再次擷取時重新取得)"""
+        ...
+
+
+class MssBackend:
+    """
+    以 mss 擷取實際螢幕
+    整個後端共用一個 mss 物件 (第一次擷取時建立, 以鎖保護; mss 9 起可在建立以外的執行緒使用),
+    不再使用時需呼叫 close 釋放顯示連線
+    """
+
+    def __init__(self):
+        try:
+            import mss  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("螢幕擷取需要安裝 mss (pip install mss)") from e
+        self._sct = None
+        self._lock = threading.Lock()
+
+    def _instance(self):
+        # 呼叫端需持有 self._lock
+        if self._sct is None:
+            import mss
+
+            self._sct = mss.mss()
+        return self._sct
+
+    def bounds(self) -> Region:
+        with self._lock:
+            monitor = self._instance().monitors[0]
+        return monitor["left"], monitor["top"], monitor["width"], monitor["height"]
+
+    def grab(self, region: Region) -> np.ndarray:
+        left, top, width, height = region
+        with self._lock:
+            shot = self._instance().grab(
+                {"left": left, "top": top, "width": width, "height": height}
+            )
+        # BGRA -> RGB
+        return np.asarray(shot)[:, :, 2::-1]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sct is not None:
+                self._sct.close()
+                self._sct = None
+
+
+class SyntheticFramebuffer:
+    """合成畫面緩衝區, 供無桌面環境測試使用 (可由測試程式繪製內容)"""
+
+    def __init__(self, width: int = 1920, height: int = 1080, color=(0, 0, 0)):
+        self._pixels = np.empty((height, width, 3), dtype=np.uint8)
+        self._pixels[:] = parse_color(color)
+        self._lock = threading.Lock()
+        self.grabs = 0  # 擷取次數 (用於驗證畫面快取)
+
+    def bounds(self) -> Region:
+        height, width = self._pixels.shape[:2]
+        return 0, 0, width, height
+
+    def grab(self, region: Region) -> np.ndarray:
+        left, top, width, height = region
+        with self._lock:
+            self.grabs += 1
+            return self._pixels[top : top + height, left : left + width].copy()
+
+    def close(self) -> None:
+        pass
+
+    def fill(self, region: Region, color) -> None:
+        """以單一顏色填滿區域"""
+        left, top, width, height = region
+        with self._lock:
+            self._pixels[top : top + height, left : left + width] = parse_color(color)
+
+    def paste(self, image: np.ndarray, x: int, y: int) -> None:
+        """將影像貼到指定位置 (左上角)"""
+        image = _to_rgb(image)
+        height, width = image.shape[:2]
+        with self._lock:
+            self._pixels[y : y + height, x : x + width] = image
+
+
+def create_backend(name: str) -> CaptureBackend:
+    """依名稱建立擷取後端 (mss 或 synthetic)"""
+    if name == "mss":
+        return MssBackend()
+    if name == "synthetic":
+        return SyntheticFramebuffer()
+    raise ValueError(f"不支援的螢幕擷取後端: {name}")
+
+
+def parse_color(color) -> tuple[int, int, int]:
+    """將 (r, g, b) 或 "#rrggbb" 轉為 RGB tuple"""
+    if isinstance(color, str):
+        value = color.lstrip("#")
+        if len(value) != 6:
+            raise ValueError(f"顏色格式錯誤: {color}")
+        return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+    r, g, b = color[:3]
+    return int(r), int(g), int(b)
+
+
+def _to_rgb(image: np.ndarray) -> np.ndarray:
+    """確保影像為 RGB uint8 陣列 (捨棄 alpha 通道)"""
+    image = np.asarray(image)
+    if image.ndim != 3 or image.shape[2] < 3:
+        raise ValueError("影像必須為 高 x 寬 x 3 (或 4) 的陣列")
+    return image[:, :, :3].astype(np.uint8, copy=False)
+
+
+def load_template(template) -> np.ndarray:
+    """載入範本影像: numpy 陣列, 或圖片檔路徑 (需要 Pillow)"""
+    if isinstance(template, str | Path):
+        try:
+            from PIL import Image
+        except ImportError as e:
+            raise RuntimeError("從檔案載入範本需要安裝 Pillow (pip install pillow)") from e
+        with Image.open(template) as image:
+            return np.asarray(image.convert("RGB"))
+    return _to_rgb(template)
+
+
+# 灰階轉換權重 (ITU-R BT.601)
+_LUMA = np.array([0.299, 0.587, 0.114])
+# 灰階比對後以彩色驗證的候選位置數
+_CANDIDATES = 8
+
+
+def match_template(
+    image: np.ndarray,
+    template: np.ndarray,
+    tolerance: float,
+    checkpoint: Callable[[], None] | None = None,
+) -> tuple[int, int] | None:
+    """
+    在影像中尋找範本
+    先以灰階平方差總和 (FFT 互相關一次算出所有位置) 找出候選位置,
+    再以彩色逐一驗證, 避免灰階相同但顏色不同的誤判
+
+    Args:
+        image: 搜尋範圍 RGB 陣列
+        template: 範本 RGB 陣列
+        tolerance: 可接受的每像素平均誤差 (RMS, 0-255)
+        checkpoint: 耗時步驟之間呼叫 (用於檢查停止/暫停)
+
+    Returns:
+        最佳匹配的左上角 (x, y) (相對於 image), 無匹配時返回 None
+    """
+    img_h, img_w = image.shape[:2]
+    tpl_h, tpl_w = template.shape[:2]
+    if tpl_h > img_h or tpl_w > img_w:
+        return None
+
+    shape = (img_h, img_w)
+    out_h, out_w = img_h - tpl_h + 1, img_w - tpl_w + 1
+    img = image @ _LUMA
+    tpl = template @ _LUMA
+
+    if checkpoint is not None:
+        checkpoint()
+    # SSD = sum(I^2) - 2 * sum(I * T) + sum(T^2)
+    corr = np.fft.irfft2(np.fft.rfft2(img) * np.conj(np.fft.rfft2(tpl, shape)), shape)
+    ssd = _window_sum(img * img, tpl_h, tpl_w) - 2 * corr[:out_h, :out_w] + (tpl * tpl).sum()
+    if checkpoint is not None:
+        checkpoint()
+
+    flat = ssd.ravel()
+    count = min(_CANDIDATES, flat.size)
+    candidates = np.argpartition(flat, count - 1)[:count]
+    reference = template.astype(np.float64)
+    limit = tolerance * tolerance
+    for index in candidates[np.argsort(flat[candidates])]:
+        y, x = divmod(int(index), out_w)
+        window = image[y : y + tpl_h, x : x + tpl_w].astype(np.float64)
+        if np.mean((window - reference) ** 2) <= limit:
+            return x, y
+    return None
+
+
+def _window_sum(values: np.ndarray, height: int, width: int) -> np.ndarray:
+    """以積分影像計算每個 height x width 視窗的總和"""
+    integral = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(values, axis=0), axis=1, out=integral[1:, 1:])
+    return (
+        integral[height:, width:]
+        - integral[:-height, width:]
+        - integral[height:, :-width]
+        + integral[:-height, :-width]
+    )
+
+
+class ScreenReader:
+    """
+    帶快取的螢幕讀取器
+    一個時間片 (tick) 內的擷取若落在上一張畫面的範圍內, 直接切片重用, 不重新擷取
+    """
+
+    def __init__(self, backend: CaptureBackend, tick: float):
+        self.backend = backend
+        self.tick = tick
+        self._frame: np.ndarray | None = None
+        self._frame_region: Region = (0, 0, 0, 0)
+        self._frame_time = 0.0
+        self._templates: dict[str, np.ndarray] = {}
+
+    def clip(self, region: Region | None) -> Region:
+        """將區域裁切到螢幕範圍內 (None 表示整個螢幕)"""
+        b_left, b_top, b_width, b_height = self.backend.bounds()
+        if region is None:
+            return b_left, b_top, b_width, b_height
+        left, top, width, height = (int(v) for v in region)
+        right = min(left + width, b_left + b_width)
+        bottom = min(top + height, b_top + b_height)
+        left, top = max(left, b_left), max(top, b_top)
+        if right <= left or bottom <= top:
+            raise ValueError(f"區域不在螢幕範圍內: {region}")
+        return left, top, right - left, bottom - top
+
+    def grab(self, region: Region) -> np.ndarray:
+        """擷取區域 (同一時間片內重用涵蓋此區域的畫面)"""
+        left, top, width, height = region
+        f_left, f_top, f_width, f_height = self._frame_region
+        if (
+            self._frame is not None
+            and time.perf_counter() - self._frame_time < self.tick
+            and f_left <= left
+            and f_top <= top
+            and left + width <= f_left + f_width
+            and top + height <= f_top + f_height
+        ):
+            x, y = left - f_left, top - f_top
+            return self._frame[y : y + height, x : x + width]
+
+        frame = self.backend.grab(region)
+        self._frame, self._frame_region, self._frame_time = frame, region, time.perf_counter()
+        return frame
+
+    def close(self) -> None:
+        """捨棄快取的畫面並釋放擷取後端的資源"""
+        self._frame = None
+        self.backend.close()
+
+    def pixel(self, x: int, y: int) -> tuple[int, int, int]:
+        """取得單一像素顏色"""
+        x, y = int(x), int(y)
+        b_left, b_top, b_width, b_height = self.backend.bounds()
+        right, bottom = b_left + b_width, b_top + b_height
+        if not (b_left <= x < right and b_top <= y < bottom):
+            raise ValueError(f"座標不在螢幕範圍內: ({x}, {y})")
+
+        left = max(x - x % _PIXEL_TILE, b_left)
+        top = max(y - y % _PIXEL_TILE, b_top)
+        width = min(left + _PIXEL_TILE, right) - left
+        height = min(top + _PIXEL_TILE, bottom) - top
+        r, g, b = self.grab((left, top, width, height))[y - top, x - left].tolist()
+        return r, g, b
+
+    def template(self, template) -> np.ndarray:
+        """載入範本 (以檔案路徑指定時快取, 避免每次輪詢重新解碼)"""
+        if isinstance(template, str | Path):
+            key = str(template)
+            cached = self._templates.get(key)
+            if cached is None:
+                cached = self._templates[key] = load_template(template)
+            return cached
+        return load_template(template)
+
+    def find(
+        self,
+        template,
+        region: Region | None,
+        tolerance: float,
+        checkpoint: Callable[[], None] | None = None,
+    ) -> tuple[int, int] | None:
+        """
+        在螢幕區域內尋找範本
+
+        Returns:
+            匹配位置的中心螢幕座標 (x, y), 無匹配時返回 None
+        """
+        tpl = self.template(template)
+        area = self.clip(region)
+        found = match_template(self.grab(area), tpl, tolerance, checkpoint)
+        if found is None:
+            return None
+        return area[0] + found[0] + tpl.shape[1] // 2, area[1] + found[1] + tpl.shape[0] // 2
@@ -0,0 +1,225 @@
+"""
+腳本全文搜尋的倒排索引
+以詞 (英數字與底線組成, 不分大小寫) 對應到包含該詞的腳本與出現次數,
+查詢只讀取查詢詞的索引項, 時間與腳本總數及內容大小無關
+中日韓文字之間沒有空白, 連續的中日韓文字以相鄰兩字 (bigram) 與單字索引:
+查詢「登入」對應 "登入" 一項, 查詢「自動登入」則需同時符合 "自動"、"動登"、"登入"
+
+索引的欄位:
+    n: 腳本名稱的詞
+    c: 腳本內容的詞
+    a: 腳本呼叫的函數名稱 (例如 click、type_text)
+
+查詢語法 (以空白分隔, 所有條件都必須符合):
+    click 100         名稱或內容包含這些詞
+    "move(100, 200)"  名稱或內容包含這段文字 (區分大小寫)
+    name:登入         名稱包含這個詞 (也可搭配引號)
+    api:type_text     呼叫了這個函數
+"""
+
+import heapq
+import re
+import threading
+from collections import Counter
+
+# 中日韓文字 (平假名、片假名、漢字、諺文)
+_CJK = "\u3041-\u3096\u309d-\u309f\u30a1-\u30fa\u30fc-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7a3"
+_HAS_CJK = re.compile(f"[{_CJK}]")
+# 詞: 連續的中日韓文字, 或連續的其他英數字與底線 (兩者相鄰時分開)
+_TOKEN = re.compile(rf"[{_CJK}]+|[^\W{_CJK}]+")
+_CALL = re.compile(r"(\w+)\s*\(")
+_TERM = re.compile(r'(?:(name|api):)?(?:"([^"]*)"?|(\S+))')
+
+_EMPTY: dict[str, int] = {}
+
+# 名稱符合的分數權重 (一次名稱符合相當於內容中出現多次)
+_NAME_WEIGHT = 10
+
+
+def _tokens(text: str, query: bool = False) -> list[str]:
+    """
+    文字中的詞 (小寫)
+    連續的中日韓文字切成相鄰兩字, 只有一個字時為單字; 索引 (query=False) 另外加入每個單字,
+    只查一個字的條件也能符合較長的詞
+    """
+    text = text.lower()
+    if not _HAS_CJK.search(text):
+        return _TOKEN.findall(text)
+    tokens = []
+    for run in _TOKEN.findall(text):
+        if len(run) == 1 or not _HAS_CJK.match(run):
+            tokens.append(run)
+            continue
+        tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        if not query:
+            tokens.extend(run)
+    return tokens
+
+
+class _Term:
+    """查詢條件: 必須存在的索引項 (每個詞可符合其中任一欄位), 以及引號文字的比對"""
+
+    def __init__(self, field: str | None, text: str, phrase: bool):
+        self.field = field
+        # 函數名稱本身就是完整的詞, 引號不影響
+        phrase = phrase and field != "api"
+        tokens = _tokens(text, query=True)
+        if field == "api":
+            self.alternatives = [[f"a:{token}"] for token in tokens]
+        else:
+            fields = ("n",) if field == "name" else ("n", "c")
+            self.alternatives = [[f"{f}:{token}" for f in fields] for token in tokens]
+        # 引號文字需逐字比對 (不經過正規表示式, 直接以子字串搜尋)
+        self.phrase = text if phrase else None
+        # 一般的詞需符合完整的詞; 包含中日韓文字時沒有詞的邊界, 以子字串比對
+        self.whole_word = not phrase and not _HAS_CJK.search(text)
+        # 用於找出內容中第一次出現的行 (只限名稱或函數的條件不需要)
+        self.pattern: re.Pattern[str] | None
+        if field is not None:
+            self.pattern = None
+        elif not self.whole_word:
+            flags = re.IGNORECASE if not phrase and text.lower() != text.upper() else 0
+            self.pattern = re.compile(re.escape(text), flags)
+        else:
+            # 不使用 (?<!\w) 與不必要的 IGNORECASE, 以字面文字開頭的模式才能快速掃描;
+            # 前方的字元在 _first_line 另外檢查
+            flags = re.IGNORECASE if text.lower() != text.upper() else 0
+            self.pattern = re.compile(rf"{re.escape(text)}(?!\w)", flags)
+
+
+def parse_query(query: str) -> list[_Term]:
+    """解析查詢字串 (沒有任何詞的條件會被略過, 例如只有標點)"""
+    terms = []
+    for match in _TERM.finditer(query):
+        field, quoted, word = match.groups()
+        term = _Term(field, quoted if quoted is not None else word, quoted is not None)
+        if term.alternatives:
+            terms.append(term)
+    return terms
+
+
+class SearchIndex:
+    """可逐一新增與移除腳本的倒排索引 (執行緒安全)"""
+
+    def __init__(self):
+        # 索引項 -> {腳本 ID: 出現次數}
+        self._postings: dict[str, dict[str, int]] = {}
+        # 腳本 ID -> (名稱, 內容, 索引項), 內容用於比對引號文字與找出行號
+        self._docs: dict[str, tuple[str, str, tuple[str, ...]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: str, name: str, content: str) -> None:
+        """新增或更新腳本"""
+        counts: Counter[str] = Counter()
+        for token in _tokens(name):
+            counts[f"n:{token}"] += 1
+        for token in _tokens(content):
+            counts[f"c:{token}"] += 1
+        for call in _CALL.findall(content):
+            counts[f"a:{call.lower()}"] += 1
+
+        with self._lock:
+            self._remove(doc_id)
+            for key, count in counts.items():
+                self._postings.setdefault(key, {})[doc_id] = count
+            self._docs[doc_id] = (name, content, tuple(counts))
+
+    def remove(self, doc_id: str) -> None:
+        """移除腳本 (不存在時不做任何事)"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for key in doc[2]:
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._docs.clear()
+
+    def search(self, query: str, limit: int) -> tuple[int, list[dict]]:
+        """
+        查詢腳本 (依分數由高到低, 分數相同時依名稱)
+
+        Returns:
+            (符合的總數, 前 limit 筆: id、name、score 與 line
+            (內容中第一個符合的行號, 只符合名稱時為 None))
+        """
+        terms = parse_query(query)
+        if not terms:
+            return 0, []
+
+        phrases = [term for term in terms if term.phrase is not None]
+        with self._lock:
+            # 每個詞對應的索引項 (符合其中任一即可) 與計分權重
+            groups = [
+                [self._postings.get(key, _EMPTY) for key in keys]
+                for term in terms
+                for keys in term.alternatives
+            ]
+            weights = [
+                (self._postings.get(key, _EMPTY), _NAME_WEIGHT if key[0] == "n" else 1)
+                for term in terms
+                for keys in term.alternatives
+                for key in keys
+            ]
+            # 從腳本數最少的詞開始, 其餘的詞只做字典查詢
+            groups.sort(key=lambda group: sum(map(len, group)))
+            # 行號只依最少腳本包含的條件計算 (每筆結果只搜尋一次內容)
+            located = min(
+                (term for term in terms if term.pattern is not None),
+                key=lambda term: min(
+                    sum(len(self._postings.get(key, _EMPTY)) for key in keys)
+                    for keys in term.alternatives
+                ),
+                default=None,
+            )
+            first, rest = groups[0], groups[1:]
+
+            scored = []
+            for doc_id in set().union(*first):
+                if not all(any(doc_id in postings for postings in group) for group in rest):
+                    continue
+                name, content, _ = self._docs[doc_id]
+                if phrases and not all(self._phrase_matches(t, name, content) for t in phrases):
+                    continue
+                score = sum(postings.get(doc_id, 0) * weight for postings, weight in weights)
+                scored.append((score, name, doc_id, content))
+
+        top = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+        hits = [
+            {"id": doc_id, "name": name, "score": score, "line": _first_line(located, content)}
+            for score, name, doc_id, content in top
+        ]
+        return len(scored), hits
+
+    @staticmethod
+    def _phrase_matches(term: _Term, name: str, content: str) -> bool:
+        phrase = term.phrase
+        if phrase is None:
+            return True
+        return phrase in name or (term.field != "name" and phrase in content)
+
+
+def _first_line(term: _Term | None, content: str) -> int | None:
+    """條件在內容中第一次出現的行號 (從 1 開始)"""
+    if term is None or term.pattern is None:
+        return None
+    for match in term.pattern.finditer(content):
+        start = match.start()
+        # 一般的詞必須是完整的詞
+        if term.whole_word and start and _TOKEN.match(content, start - 1):
+            continue
+        return content.count("\n", 0, start) + 1
+    return None
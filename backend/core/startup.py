@@ -0,0 +1,49 @@
+"""
+啟動計時
+記錄從載入主模組到服務就緒各階段的時間, 供 /ready 端點、指標與日誌回報
+"""
+
+import threading
+import time
+
+
+class StartupTracker:
+    """啟動階段計時器 (時間皆為自建立起經過的毫秒數)"""
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases: dict[str, float] = {}
+        self.ready = False
+
+    def mark(self, phase: str) -> float:
+        """記錄階段完成的時間, 返回自開始經過的毫秒數"""
+        elapsed = round((time.perf_counter() - self._origin) * 1000, 2)
+        with self._lock:
+            self._phases[phase] = elapsed
+        return elapsed
+
+    def set_ready(self) -> float:
+        """標記服務已就緒, 返回總啟動時間 (毫秒)"""
+        elapsed = self.mark("ready")
+        self.ready = True
+        return elapsed
+
+    def set_stopping(self) -> None:
+        """服務開始關閉, 不再視為就緒"""
+        self.ready = False
+
+    @property
+    def startup_ms(self) -> float | None:
+        """總啟動時間 (毫秒), 尚未就緒時為 None"""
+        return self._phases.get("ready")
+
+    def report(self) -> dict:
+        """就緒狀態與各階段時間"""
+        with self._lock:
+            phases = dict(self._phases)
+        return {"ready": self.ready, "startup_ms": phases.get("ready"), "phases": phases}
+
+
+# 主模組最先載入此模組, 計時起點約等於直譯器完成啟動
+startup = StartupTracker()
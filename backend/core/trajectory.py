@@ -0,0 +1,82 @@
+"""
+滑鼠軌跡生成
+以 numpy 一次算出整條軌跡的所有影格 (座標與目標時間), 送出時只需依序設定位置
+"""
+
+import numpy as np
+
+# 緩動函數: 輸入 [0, 1] 的時間比例陣列, 輸出 [0, 1] 的進度比例陣列
+EASINGS = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t * t,
+    "ease_out": lambda t: 1 - (1 - t) ** 3,
+    "ease_in_out": lambda t: np.where(t < 0.5, 4 * t * t * t, 1 - (-2 * t + 2) ** 3 / 2),
+}
+
+CURVES = (*EASINGS, "bezier")
+
+# 未指定控制點時, 貝茲曲線往路徑垂直方向偏移的比例 (相對於起終點距離)
+_BEZIER_BEND = 0.2
+
+
+def _bezier_controls(start: np.ndarray, end: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """產生預設控制點: 分別位於路徑 1/3、2/3 處, 往同一側偏移形成弧線"""
+    delta = end - start
+    normal = np.array([-delta[1], delta[0]]) * _BEZIER_BEND
+    return start + delta / 3 + normal, start + delta * 2 / 3 + normal
+
+
+def build_trajectory(
+    start: tuple[float, float],
+    end: tuple[float, float],
+    duration: float,
+    hz: float,
+    curve: str = "ease_in_out",
+    control: tuple[tuple[float, float], tuple[float, float]] | None = None,
+) -> tuple[list[tuple[int, int]], list[float]]:
+    """
+    生成滑鼠軌跡
+
+    Args:
+        start: 起點座標
+        end: 終點座標
+        duration: 移動時間 (秒)
+        hz: 影格頻率
+        curve: 曲線類型 (linear, ease_in, ease_out, ease_in_out, bezier)
+        control: 貝茲曲線的兩個控制點 (僅 bezier 使用, 未指定時自動產生)
+
+    Returns:
+        (各影格的整數座標, 各影格相對於開始的目標時間 秒);
+        座標與前一影格相同的影格會被省略, 最後一個影格一定是終點
+    """
+    if curve not in CURVES:
+        raise ValueError(f"不支援的曲線: {curve}, 可用: {', '.join(CURVES)}")
+
+    p0 = np.asarray(start, dtype=np.float64)
+    p3 = np.asarray(end, dtype=np.float64)
+    frames = max(1, round(duration * hz))
+    # 不含起點 (游標已在起點), 最後一格 t = 1 即為終點
+    t = np.linspace(0.0, 1.0, frames + 1)[1:]
+
+    if curve == "bezier":
+        if control:
+            p1, p2 = (np.asarray(c, dtype=np.float64) for c in control)
+        else:
+            p1, p2 = _bezier_controls(p0, p3)
+        # 三次貝茲曲線, 以等時間參數取樣並套用 ease_in_out 讓起訖速度較慢
+        u = EASINGS["ease_in_out"](t)[:, None]
+        points = (1 - u) ** 3 * p0 + 3 * (1 - u) ** 2 * u * p1 + 3 * (1 - u) * u**2 * p2 + u**3 * p3
+    else:
+        progress = EASINGS[curve](t)[:, None]
+        points = p0 + (p3 - p0) * progress
+
+    pixels = np.rint(points).astype(np.int64)
+    times = t * duration
+
+    # 省略座標未改變的影格 (慢速移動時常見), 不影響其餘影格的時間
+    previous = np.vstack([np.rint(p0).astype(np.int64), pixels[:-1]])
+    keep = np.any(pixels != previous, axis=1)
+    keep[-1] = True
+    pixels, times = pixels[keep], times[keep]
+
+    return list(map(tuple, pixels.tolist())), times.tolist()
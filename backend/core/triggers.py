@@ -0,0 +1,102 @@
+"""
+排程觸發條件
+只依賴標準函式庫與 cron 解析 (沒有指標等副作用), 排程器與資料模型的驗證共用
+"""
+
+import math
+from datetime import datetime, timedelta
+
+from core.cron import CronExpression
+
+TRIGGER_TYPES = ("interval", "cron", "at")
+# 錯過執行時的處理: skip 略過該次, run_once 盡快補執行一次 (多次錯過只補一次)
+MISSED_POLICIES = ("skip", "run_once")
+
+
+class Trigger:
+    """排程觸發條件 (時間皆為本地時間)"""
+
+    def __init__(
+        self,
+        kind: str,
+        every: float | None = None,
+        cron: str | None = None,
+        at: datetime | str | None = None,
+        missed: str = "skip",
+        min_interval: float = 0.0,
+    ):
+        """
+        Raises:
+            ValueError: 設定不完整或格式錯誤
+        """
+        if kind not in TRIGGER_TYPES:
+            raise ValueError(f"不支援的排程類型: {kind}")
+        if missed not in MISSED_POLICIES:
+            raise ValueError(f"不支援的錯過處理方式: {missed}")
+        self.kind = kind
+        self.missed = missed
+        self.every: timedelta | None = None
+        self.cron: CronExpression | None = None
+        self.at: datetime | None = None
+
+        if kind == "interval":
+            if every is None or every < min_interval:
+                raise ValueError(f"interval 排程需要至少 {min_interval:g} 秒的 every")
+            self.every = timedelta(seconds=every)
+        elif kind == "cron":
+            if not cron:
+                raise ValueError("cron 排程需要 cron 表示式")
+            self.cron = CronExpression(cron)
+        else:
+            if at is None:
+                raise ValueError("at 排程需要執行時間")
+            if isinstance(at, str):
+                at = datetime.fromisoformat(at)
+            if at.tzinfo is not None:
+                at = at.astimezone().replace(tzinfo=None)
+            self.at = at
+
+    @classmethod
+    def from_dict(cls, data: dict, min_interval: float = 0.0) -> "Trigger":
+        """由腳本的 schedule 設定建立"""
+        return cls(
+            data.get("type", ""),
+            every=data.get("every"),
+            cron=data.get("cron"),
+            at=data.get("at"),
+            missed=data.get("missed", "skip"),
+            min_interval=min_interval,
+        )
+
+    def first(self, now: datetime) -> datetime | None:
+        """從 now 開始的第一次執行時間 (at 排程已過時返回 None)"""
+        if self.every is not None:
+            return now + self.every
+        if self.cron is not None:
+            return self.cron.next_after(now)
+        return self.at if self.at is not None and self.at > now else None
+
+    def missed_since(self, last: datetime | None, now: datetime) -> datetime | None:
+        """
+        上次執行 (預定於 last, None 表示從未執行) 之後、now 之前錯過的第一次執行時間
+        沒有錯過時返回 None; 錯過多次也只返回最早的一次
+        """
+        if self.at is not None:
+            missed = self.at <= now and (last is None or last < self.at)
+            return self.at if missed else None
+        if last is None:
+            return None
+        due = self.next_after(last, last)
+        return due if due is not None and due <= now else None
+
+    def next_after(self, due: datetime, now: datetime) -> datetime | None:
+        """
+        本次 (預定於 due) 之後的下一次執行時間, 一定晚於 now
+        interval 排程維持原本的相位, 錯過的多次執行不會累積補送
+        """
+        if self.every is not None:
+            skipped = math.floor((now - due) / self.every) + 1
+            return due + self.every * max(skipped, 1)
+        if self.cron is not None:
+            return self.cron.next_after(max(due, now))
+        return None
@@ -0,0 +1,346 @@
+"""
+腳本工作行程池
+行程模式下腳本在預先啟動的工作行程中執行: 不與 API 伺服器、輸入監聽器競爭 GIL,
+停止時直接結束行程, 不需等腳本呼叫 API
+引擎 API 仍在主行程執行 (輸入控制器、螢幕擷取與執行狀態都在主行程),
+工作行程內的腳本以代理函數透過 stdin/stdout 管線呼叫
+
+訊息格式: 4 位元組長度 + pickle 資料
+    主行程 -> 工作行程: ("run", 程式碼 (marshal), API 名稱列表, 腳本 ID)、("reply", 成功, 值)、
+                        None (結束)
+    工作行程 -> 主行程: ("ready", None)、("call", 名稱, args, kwargs, 行號)、
+                        ("done", None)、("error", 例外名稱, 訊息, 行號)
+
+import_script()/call_script() 在工作行程內執行: 函式庫的程式碼由主行程編譯後傳來,
+工作行程保留模組快取, 每次匯入只向主行程確認版本 (未改變時不重新傳送)
+
+此模組同時是工作行程的進入點 (python -m core.worker_pool), 工作行程只載入標準函式庫
+"""
+
+import builtins
+import contextlib
+import logging
+import marshal
+import os
+import pickle
+import queue
+import signal
+import struct
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from core.library import ScriptLibrary, _Entry
+from core.profiler import SCRIPT_FILENAME, frame_line
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<I")
+# 工作行程以 backend 目錄為工作目錄, 以模組方式啟動
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class WorkerExitedError(RuntimeError):
+    """工作行程已結束 (被停止或異常終止)"""
+
+    pass
+
+
+def _write(stream, message) -> None:
+    """寫出一則訊息 (先完整序列化, 失敗時不會寫出不完整的資料)"""
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def _read_frame(stream) -> bytes:
+    """讀取一則訊息的原始資料"""
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise EOFError
+    (size,) = _HEADER.unpack(header)
+    data: bytes = stream.read(size)
+    if len(data) < size:
+        raise EOFError
+    return data
+
+
+class Worker:
+    """單一工作行程 (建立時啟動, 等到工作行程回報就緒才返回)"""
+
+    def __init__(self):
+        self.runs = 0
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "core.worker_pool"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=_BACKEND_DIR,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        try:
+            kind, _ = self.receive()
+        except Exception:
+            self.kill()
+            raise
+        if kind != "ready":
+            self.kill()
+            raise WorkerExitedError(f"工作行程啟動失敗: {kind}")
+
+    def send(self, message) -> None:
+        try:
+            _write(self.process.stdin, message)
+        except (OSError, ValueError) as e:
+            raise WorkerExitedError("工作行程已結束") from e
+
+    def receive(self):
+        """
+        讀取一則訊息
+
+        Raises:
+            WorkerExitedError: 工作行程已結束
+        """
+        try:
+            data = _read_frame(self.process.stdout)
+        except (EOFError, OSError, ValueError) as e:
+            raise WorkerExitedError("工作行程已結束") from e
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            # 腳本傳遞了主行程無法還原的物件 (例如腳本內定義的類別)
+            return ("invalid", f"無法傳遞參數: {e}")
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self) -> None:
+        """強制結束工作行程 (可從任何執行緒呼叫)"""
+        with contextlib.suppress(OSError):
+            self.process.kill()
+
+    def close(self) -> None:
+        """要求工作行程結束, 逾時則強制結束, 並釋放管線"""
+        with contextlib.suppress(WorkerExitedError):
+            self.send(None)
+        try:
+            self.process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            if stream is not None:
+                with contextlib.suppress(OSError):
+                    stream.close()
+
+
+class WorkerPool:
+    """
+    待命工作行程池
+    保持 size 個已啟動的工作行程; 執行結束後歸還重用, 被強制結束或達到執行次數上限時
+    在背景啟動替代的工作行程, 下一次執行不需等待 Python 啟動
+    """
+
+    def __init__(self, size: int, max_runs: int, start_timeout: float):
+        """
+        Args:
+            size: 待命的工作行程數
+            max_runs: 每個工作行程最多執行的腳本數 (之後替換, 避免腳本殘留的狀態累積)
+            start_timeout: 等待背景啟動中的工作行程就緒的最長時間 (秒)
+        """
+        self._size = max(1, size)
+        self._max_runs = max_runs
+        self._start_timeout = start_timeout
+        self._idle: queue.SimpleQueue[Worker] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._starting = 0
+        self._closed = False
+
+    def start(self) -> None:
+        """在背景啟動待命的工作行程"""
+        for _ in range(self._size):
+            self._spawn_async()
+
+    def _spawn_async(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._starting += 1
+        threading.Thread(target=self._spawn, name="script-worker-spawn", daemon=True).start()
+
+    def _spawn(self) -> None:
+        worker = None
+        try:
+            worker = Worker()
+        except Exception as e:
+            logger.warning("工作行程啟動失敗: %s", e)
+        with self._lock:
+            self._starting -= 1
+            closed = self._closed
+        if worker is None:
+            return
+        if closed:
+            worker.close()
+        else:
+            self._idle.put(worker)
+
+    def acquire(self) -> Worker:
+        """取得一個待命的工作行程 (沒有待命且沒有啟動中的工作行程時同步啟動)"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    starting = self._starting
+                if not starting:
+                    return Worker()
+                try:
+                    worker = self._idle.get(timeout=self._start_timeout)
+                except queue.Empty:
+                    return Worker()
+            if worker.alive():
+                return worker
+            # 待命期間意外結束
+            worker.close()
+            self._spawn_async()
+
+    def release(self, worker: Worker) -> None:
+        """歸還工作行程; 已結束或達到執行次數上限時以新的工作行程替代"""
+        worker.runs += 1
+        with self._lock:
+            closed = self._closed
+        if not closed and worker.alive() and worker.runs < self._max_runs:
+            self._idle.put(worker)
+            return
+        worker.kill()
+        worker.close()
+        self._spawn_async()
+
+    def shutdown(self) -> None:
+        """結束所有待命的工作行程"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.close()
+
+
+class _RemoteLibrary(ScriptLibrary):
+    """工作行程內的函式庫: 程式碼向主行程取得, 版本未改變時沿用快取的模組"""
+
+    def __init__(self, fetch):
+        """
+        Args:
+            fetch: (參照, 已快取的版本) -> (腳本 ID, 版本, 程式碼 (marshal) 或 None (未改變))
+        """
+        # 程式碼一律由主行程查詢與編譯, 不使用本地的來源
+        super().__init__(
+            lambda ref: None, lambda content: compile(content, SCRIPT_FILENAME, "exec")
+        )
+        self._fetch = fetch
+
+    def entry(self, ref: str) -> tuple[str, _Entry]:
+        script_id = self._refs.get(ref)
+        cached = self._entries.get(script_id) if script_id else None
+        script_id, version, code = self._fetch(ref, cached.version if cached else None)
+        self._refs[ref] = script_id
+        # 以其他參照 (ID 或名稱) 匯入過的同一版本沿用原本的模組
+        existing = self._entries.get(script_id)
+        if existing is not None and existing.version == version:
+            return script_id, existing
+        entry = self._entries[script_id] = _Entry(ref, marshal.loads(code), version)
+        return script_id, entry
+
+
+def _script_line() -> int:
+    """呼叫端最接近的腳本 frame 的行號 (函式庫內的呼叫以呼叫函式庫的腳本行為準)"""
+    # frame 0: _script_line, frame 1: call, frame 2 起: 代理函數、函式庫實作或函式庫的程式碼,
+    # 往上找到腳本 (函式庫的程式碼以 LIBRARY_FILENAME 編譯, 不會被誤認為腳本)
+    frame: FrameType | None = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename != SCRIPT_FILENAME:
+        frame = frame.f_back
+    return frame_line(frame) if frame is not None else 0
+
+
+def _error_line(exc: BaseException) -> int:
+    """例外發生處最內層的腳本 frame 的行號 (在函式庫內發生時為呼叫函式庫的行), 找不到時為 0"""
+    line = 0
+    tb = exc.__traceback__
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename == SCRIPT_FILENAME:
+            line = tb.tb_lineno
+        tb = tb.tb_next
+    return line
+
+
+def _remote_exception(name: str, message: str) -> Exception:
+    """依例外名稱重建主行程拋出的例外 (非內建例外以 RuntimeError 表示)"""
+    exc_type = getattr(builtins, name, None)
+    if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+        return exc_type(message)
+    return RuntimeError(f"{name}: {message}")
+
+
+def _worker_main() -> None:
+    """工作行程主迴圈: 依序執行主行程送來的腳本"""
+    # 由主行程控制生命週期, 不回應終端機的 Ctrl+C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # 訊息使用原本的 stdin/stdout, 其餘輸出一律改到 stderr, 避免破壞訊息串流
+    channel_in = sys.stdin.buffer
+    channel_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    sys.stdin = Path(os.devnull).open()  # noqa: SIM115
+
+    def call(name: str, args: tuple, kwargs: dict):
+        _write(channel_out, ("call", name, args, kwargs, _script_line()))
+        _, ok, value = pickle.loads(_read_frame(channel_in))
+        if ok:
+            return value
+        raise _remote_exception(*value)
+
+    def proxy(name: str):
+        def api(*args, **kwargs):
+            return call(name, args, kwargs)
+
+        api.__name__ = api.__qualname__ = name
+        return api
+
+    library = _RemoteLibrary(lambda ref, version: call("_library_code", (ref, version), {}))
+
+    def import_script(ref: str):
+        return library.import_module(ref, lambda: api)
+
+    def call_script(ref: str, **kwargs):
+        return library.call(ref, api, kwargs)
+
+    local_apis = {"import_script": import_script, "call_script": call_script}
+
+    _write(channel_out, ("ready", None))
+    while True:
+        try:
+            message = pickle.loads(_read_frame(channel_in))
+        except EOFError:
+            return
+        if message is None:
+            return
+        _, code, names, script_id = message
+        # 函式庫模組使用乾淨的 API 命名空間, 不包含執行中腳本自己的變數
+        api = {name: local_apis.get(name) or proxy(name) for name in names}
+        library.begin_run(script_id)
+        try:
+            exec(marshal.loads(code), dict(api))
+        except BaseException as e:  # 包含 SystemExit, 工作行程本身不結束
+            _write(channel_out, ("error", type(e).__name__, str(e), _error_line(e)))
+        else:
+            _write(channel_out, ("done", None))
+
+
+if __name__ == "__main__":
+    _worker_main()
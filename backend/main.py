@@ -3,37 +3,84 @@ XXScript Backend - 重構版本
 遵循 SOLID 原則的分層架構
 """
 
+# 最先載入, 作為啟動計時的起點
+from core.startup import startup  # isort: skip
+
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from api import scripts, system
-from config.settings import API_TITLE, CORS_CREDENTIALS, CORS_HEADERS, CORS_METHODS, CORS_ORIGINS
+from config.logging_config import setup_logging, shutdown_logging
+from config.settings import (
+    API_GZIP_MIN_SIZE,
+    API_TITLE,
+    CORS_CREDENTIALS,
+    CORS_HEADERS,
+    CORS_METHODS,
+    CORS_ORIGINS,
+)
+
+logger = logging.getLogger(__name__)
+startup.mark("imports")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """應用生命週期管理"""
     # 啟動時
-    print("🚀 XXScript Backend 啟動中...")
-    # 啟動監聽器
-    from api.system import key_listener, script_service
-
+    from api.system import (
+        key_listener,
+        load_schedules,
+        manager,
+        refresh_listener_hotkeys,
+        scheduler,
+        script_engine,
+        script_service,
+    )
+    from core.event_bus import event_bus
+
+    # 日誌由背景執行緒寫出, 並透過事件匯流排推送到前端主控台
+    setup_logging(event_bus.post)
+    logger.info("XXScript Backend 啟動中...")
+    startup.mark("logging")
+
+    # 讓背景執行緒 (監聽器、引擎、錄製器) 可將事件投遞到此事件迴圈
+    event_bus.attach(asyncio.get_running_loop(), manager.broadcast_nowait)
+
+    # 行程模式下預先啟動工作行程 (背景進行), 第一次執行不需等待 Python 啟動
+    script_engine.start_workers()
+
+    # 註冊熱鍵並啟動監聽器 (與腳本變更時使用相同的流程)
+    refresh_listener_hotkeys()
+    startup.mark("listener")
+
+    # 排程執行緒只在下一個排程到期時醒來
+    scheduled = load_schedules()
+    scheduler.start()
+    logger.info("排程器已啟動: %d 個排程", scheduled)
+
+    # 在背景載入熱鍵腳本的編譯快取, 不延後就緒時間
     enabled_scripts = script_service.get_enabled_scripts()
-    key_listener.clear_all()
-    for script in enabled_scripts:
-        if script.hotkey:
-            key_listener.register_hotkey(script.hotkey, script.id, script.content)
-    key_listener.start()
-    print("✅ 按鍵監聽器已啟動")
+    script_engine.preload([script.content for script in enabled_scripts if script.hotkey])
+
+    logger.info("XXScript Backend 已就緒, 啟動耗時 %.1f ms", startup.set_ready())
 
     yield
 
     # 關閉時
-    print("🛑 XXScript Backend 關閉中...")
+    startup.set_stopping()
+    logger.info("XXScript Backend 關閉中...")
+    scheduler.stop()
     key_listener.stop()
-    print("✅ 按鍵監聽器已停止")
+    script_engine.shutdown()
+    # 先送出剩餘日誌, 再中斷事件匯流排
+    shutdown_logging()
+    event_bus.detach()
 
 
 # 創建 FastAPI 應用
@@ -47,6 +94,8 @@ app.add_middleware(
     allow_methods=CORS_METHODS,
     allow_headers=CORS_HEADERS,
 )
+# 大型列表 (腳本內容、歷史記錄) 壓縮後傳送
+app.add_middleware(GZipMiddleware, minimum_size=API_GZIP_MIN_SIZE)
 
 # 註冊路由
 app.include_router(scripts.router)
@@ -54,8 +103,22 @@ app.include_router(system.router)
 
 
 if __name__ == "__main__":
-    import uvicorn
+    import argparse
 
-    from config.settings import API_HOST, API_PORT
+    import uvicorn
 
-    uvicorn.run("main:app", host=API_HOST, port=API_PORT, reload=True)
+    from config.settings import API_HOST, API_PORT, API_PRODUCTION
+
+    parser = argparse.ArgumentParser(description=API_TITLE)
+    parser.add_argument(
+        "--prod", action="store_true", help="正式模式: 不啟用自動重新載入 (或設定 XXSCRIPT_PROD=1)"
+    )
+    parser.add_argument("--port", type=int, default=API_PORT, help="監聽埠號")
+    args = parser.parse_args()
+
+    if args.prod or API_PRODUCTION:
+        # 直接傳入已建立的 app: 不啟動檔案監看的監督行程, 也不重新匯入本模組;
+        # 日誌交由 setup_logging 處理, 不記錄每個請求
+        uvicorn.run(app, host=API_HOST, port=args.port, log_config=None, access_log=False)
+    else:
+        uvicorn.run("main:app", host=API_HOST, port=args.port, reload=True)
@@ -3,9 +3,31 @@
 使用 Pydantic 進行數據驗證
 """
 
+from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from config.settings import SCHEDULER_MIN_INTERVAL
+from core.triggers import Trigger
+
+
+class Schedule(BaseModel):
+    """腳本排程設定 (時間皆為本地時間)"""
+
+    type: Literal["interval", "cron", "at"] = Field(..., description="排程類型")
+    every: float | None = Field(None, description="間隔秒數 (interval)")
+    cron: str | None = Field(None, description="cron 表示式: 分 時 日 月 星期 (cron)")
+    at: datetime | None = Field(None, description="執行時間, 只執行一次 (at)")
+    missed: Literal["skip", "run_once"] = Field(
+        "skip", description="錯過執行 (系統休眠或引擎忙碌) 時: skip 略過, run_once 補執行一次"
+    )
+
+    @model_validator(mode="after")
+    def _check_trigger(self) -> "Schedule":
+        # 與排程器使用相同的解析, 錯誤的設定 (包含永遠不會觸發的 cron) 在儲存前就回報
+        Trigger.from_dict(self.model_dump(), SCHEDULER_MIN_INTERVAL).first(datetime.now())
+        return self
 
 
 class ScriptBase(BaseModel):
@@ -14,6 +36,7 @@ class ScriptBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="腳本名稱")
     content: str = Field(default="", description="腳本內容")
     hotkey: str | None = Field(None, max_length=50, description="觸發熱鍵")
+    schedule: Schedule | None = Field(None, description="排程 (None 表示不排程)")
 
 
 class ScriptCreate(ScriptBase):
@@ -25,10 +48,12 @@ class ScriptCreate(ScriptBase):
 class ScriptUpdate(BaseModel):
     """更新腳本請求模型"""
 
-    name: str | None = Field(None, min_length=1, max_length=100)
+    name: str | None = Field(default=None, min_length=1, max_length=100)
     content: str | None = None
-    hotkey: str | None = Field(None, max_length=50)
+    hotkey: str | None = Field(default=None, max_length=50)
     enabled: bool | None = None
+    # 明確傳入 null 時清除排程
+    schedule: Schedule | None = None
 
 
 class Script(ScriptBase):
@@ -41,11 +66,93 @@ class Script(ScriptBase):
         from_attributes = True
 
 
+class ScriptImport(ScriptBase):
+    """批次匯入的腳本 (NDJSON 的一行, 匯出內容的 id 等其他欄位會被忽略)"""
+
+    enabled: bool = Field(default=True, description="是否啟用")
+
+
+class ImportResult(BaseModel):
+    """批次匯入結果"""
+
+    created: int = Field(0, description="新增的數量")
+    updated: int = Field(0, description="覆寫的數量 (腳本名稱相同)")
+    unchanged: int = Field(0, description="與現有腳本完全相同而略過的數量")
+
+
+class HistoryImportResult(BaseModel):
+    """歷史記錄匯入結果"""
+
+    status: str = "ok"
+    imported: int = Field(0, description="保留下來的匯入記錄數")
+    duplicates: int = Field(0, description="已存在而略過的記錄數")
+
+
+class ScriptSearchHit(BaseModel):
+    """搜尋結果中的腳本"""
+
+    id: str
+    name: str
+    score: int = Field(..., description="相關程度 (查詢詞出現次數, 名稱符合加權)")
+    line: int | None = Field(None, description="內容中第一個符合的行號 (只符合名稱時為 None)")
+
+
+class ScriptSearchResult(BaseModel):
+    """腳本搜尋結果"""
+
+    total: int = Field(..., description="符合的腳本總數")
+    hits: list[ScriptSearchHit]
+
+
+class ScriptVersion(BaseModel):
+    """腳本版本"""
+
+    version: int = Field(..., description="版本號 (從 1 開始)")
+    hash: str = Field(..., description="內容的 SHA-256")
+    timestamp: datetime
+    size: int = Field(..., description="內容字元數")
+
+
+class ScriptVersionContent(ScriptVersion):
+    """腳本版本與其內容"""
+
+    content: str
+
+
+class ScriptVersionDiff(BaseModel):
+    """兩個版本的差異"""
+
+    from_version: int
+    to_version: int
+    diff: str = Field(..., description="unified diff")
+
+
 class ExecutionResult(BaseModel):
     """執行結果模型"""
 
     status: str = Field(..., description="執行狀態: success/error")
     message: str = Field(..., description="執行訊息")
+    run_id: str | None = Field(None, description="執行 ID, 用於查詢歷史記錄與分析報告")
+
+
+class DryRunRequest(BaseModel):
+    """模擬執行請求模型"""
+
+    content: str
+
+
+class DryRunResult(BaseModel):
+    """模擬執行結果 (時間皆為從腳本開始的虛擬毫秒數)"""
+
+    status: Literal["success", "error", "truncated", "timeout"]
+    error: str | None = None
+    duration_ms: float = Field(..., description="模擬的總執行時間")
+    action_count: int
+    counts: dict[str, int] = Field(default_factory=dict, description="各類動作數")
+    api_calls: dict[str, int] = Field(default_factory=dict, description="各 API 呼叫次數")
+    timeline: list[dict] = Field(
+        default_factory=list, description="依時間排序的動作: time_ms、line、action 與參數"
+    )
 
 
 class HistoryRecord(BaseModel):
@@ -56,6 +163,38 @@ class HistoryRecord(BaseModel):
     status: str
     duration: float
     error: str | None = None
+    run_id: str | None = None
+    has_profile: bool = False
+
+
+class ProfileLine(BaseModel):
+    """效能分析 - 單行統計 (時間單位: 秒)"""
+
+    line: int
+    source: str
+    hits: int = Field(..., description="執行次數")
+    total_time: float = Field(..., description="累計時間 (含呼叫的腳本函數)")
+    self_time: float = Field(..., description="自身時間 (不含呼叫的腳本函數)")
+    api_time: float = Field(..., description="自身時間中花在引擎 API 的部分")
+    user_time: float = Field(..., description="自身時間中花在使用者程式碼的部分")
+    api_calls: dict[str, int] = Field(default_factory=dict, description="各 API 呼叫次數")
+
+
+class ProfileApiStats(BaseModel):
+    """效能分析 - 單一 API 統計"""
+
+    calls: int
+    time: float
+
+
+class ProfileReport(BaseModel):
+    """效能分析報告"""
+
+    total_time: float
+    api_time: float
+    user_time: float
+    lines: list[ProfileLine]
+    api: dict[str, ProfileApiStats]
 
 
 class RecorderStatus(BaseModel):
@@ -81,6 +220,22 @@ class StatusResponse(BaseModel):
     listener_running: bool
 
 
+class ScheduledRun(BaseModel):
+    """即將執行的排程"""
+
+    script_id: str
+    type: str
+    next_run: datetime
+
+
+class ReadinessStatus(BaseModel):
+    """就緒狀態響應模型"""
+
+    ready: bool
+    startup_ms: float | None = None  # 總啟動時間 (毫秒)
+    phases: dict[str, float] = Field(default_factory=dict)  # 各階段完成時間 (毫秒)
+
+
 class ScriptCheckRequest(BaseModel):
     """代碼檢查請求"""
 
@@ -111,6 +266,7 @@ class EngineStatus(BaseModel):
     script_id: str | None = None
     script_name: str | None = None
     current_line: int | None = None
+    total_lines: int | None = None
 
 
 class EngineCommandResponse(BaseModel):
@@ -0,0 +1,130 @@
+"""
+JSON 列表檔案的讀寫與快取
+檔案內容載入後保留在記憶體, 以 (修改時間, 大小) 判斷檔案是否被外部修改;
+經由本物件寫入時直接更新快取, 不需重新讀取;
+只查詢版本時沿用記憶體中的版本, 每隔一段時間才重新檢查檔案
+序列化後的 API 回應本文也依版本快取, 讀取列表時不需重新驗證與序列化
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable, Collection
+from pathlib import Path
+
+from config.settings import STORAGE_RECHECK_INTERVAL
+from core.metrics import STORAGE_SECONDS
+
+
+class JsonListFile:
+    """JSON 列表檔案 (快取的記錄與回應本文皆為唯讀, 修改時需複製)"""
+
+    def __init__(self, path: Path, store: str, normalize: Callable[[dict], dict] | None = None):
+        """
+        Args:
+            path: 檔案路徑
+            store: 儲存區名稱 (指標標籤)
+            normalize: 載入或寫入後整理單筆記錄的函數 (例如驗證並補上預設欄位),
+                結果即為 API 回應的內容; 未指定時原樣使用
+        """
+        self.path = path
+        self._store = store
+        self._normalize = normalize
+        self._lock = threading.Lock()
+        # 建立實例時不做任何 I/O: 檔案不存在時讀取視為空, 第一次寫入時才建立目錄
+        self._dir_ready = False
+        self._records: list = []
+        self._stamp: tuple[int, int] | None = None
+        self._checked = 0.0  # 上次檢查檔案的時間 (time.monotonic)
+        self._body: bytes | None = None
+        # 內容每次改變 (寫入或偵測到外部修改) 加一
+        self.version = 0
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def current_version(self) -> int:
+        """
+        目前內容的版本
+        經由本物件的寫入直接反映; 外部修改最遲在 STORAGE_RECHECK_INTERVAL 秒後才偵測到
+        (尚未載入或超過間隔時才檢查檔案)
+        """
+        if self.version and time.monotonic() - self._checked < STORAGE_RECHECK_INTERVAL:
+            return self.version
+        self.load()
+        return self.version
+
+    def load(self) -> list:
+        """取得目前的記錄 (檔案未改變時直接返回快取)"""
+        stamp = self._file_stamp()
+        with self._lock:
+            self._checked = time.monotonic()
+            if self.version and stamp == self._stamp:
+                return self._records
+            records = self._read() if stamp is not None else []
+            normalize = self._normalize
+            self._set([normalize(r) for r in records] if normalize else records, stamp)
+            return self._records
+
+    def save(self, records: list, changed: Collection[int] | None = None) -> None:
+        """
+        寫入記錄並更新快取 (整理失敗時不寫入)
+
+        Args:
+            records: 所有記錄
+            changed: 新增或修改的記錄索引, 只整理這些記錄 (其餘必須是 load() 返回的記錄或其複本);
+                None 表示全部整理
+        """
+        normalize = self._normalize
+        if normalize is None:
+            normalized = records
+        elif changed is None:
+            normalized = [normalize(record) for record in records]
+        else:
+            normalized = list(records)
+            for index in changed:
+                normalized[index] = normalize(records[index])
+        with self._lock:
+            if not self._dir_ready:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._dir_ready = True
+            # 先寫入暫存檔再取代: 寫入中途失敗 (例如磁碟已滿) 時原檔案保持完整
+            tmp = self.path.with_name(f"{self.path.name}.tmp")
+            with STORAGE_SECONDS.time((self._store, "save")):
+                with tmp.open("w", encoding="utf-8") as f:
+                    json.dump(records, f, ensure_ascii=False, indent=2)
+                tmp.replace(self.path)
+            self._set(normalized, self._file_stamp())
+
+    def body(self) -> bytes:
+        """目前記錄的 JSON 回應本文 (格式與 FastAPI 預設的 JSONResponse 相同)"""
+        self.load()
+        with self._lock:
+            if self._body is None:
+                self._body = json.dumps(
+                    self._records, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+                ).encode("utf-8")
+            return self._body
+
+    def _read(self) -> list:
+        try:
+            with (
+                STORAGE_SECONDS.time((self._store, "load")),
+                self.path.open(encoding="utf-8") as f,
+            ):
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return []
+        return data if isinstance(data, list) else []
+
+    def _set(self, records: list, stamp: tuple[int, int] | None) -> None:
+        """更新快取 (呼叫端需持有鎖)"""
+        self._records = records
+        self._stamp = stamp
+        self._checked = time.monotonic()
+        self._body = None
+        self.version += 1
@@ -3,50 +3,95 @@
 負責腳本的持久化操作
 """
 
-import json
+import contextlib
+from collections.abc import Callable, Collection, Iterable
 from pathlib import Path
 
 from config.settings import SCRIPTS_FILE
-from models.schemas import Script, ScriptCreate, ScriptUpdate
+from models.schemas import Script, ScriptCreate, ScriptImport, ScriptUpdate
+from repositories.json_file import JsonListFile
+from repositories.version_store import ScriptVersionStore
+
+
+def _normalize_script(item: dict) -> dict:
+    """驗證並補上預設欄位, 結果與 API 回應的 Script 格式相同"""
+    return Script.model_validate(item).model_dump(mode="json")
 
 
 class ScriptRepository:
     """腳本倉庫類 - 處理腳本數據的 CRUD 操作"""
 
-    def __init__(self, storage_file: Path = SCRIPTS_FILE):
+    def __init__(
+        self, storage_file: Path = SCRIPTS_FILE, versions: ScriptVersionStore | None = None
+    ):
+        """
+        Args:
+            storage_file: 腳本資料檔
+            versions: 版本歷史 (未提供時不保留歷史), 建立或修改內容時記錄新版本
+        """
         self.storage_file = storage_file
-        self._ensure_file_exists()
-
-    def _ensure_file_exists(self) -> None:
-        """確保儲存文件存在"""
-        if not self.storage_file.exists():
-            self.storage_file.parent.mkdir(parents=True, exist_ok=True)
-            self._save_scripts([])
+        self.versions = versions
+        # 檔案內容與序列化後的列表快取在記憶體, 只在寫入或檔案被外部修改後重新產生
+        self._file = JsonListFile(storage_file, "scripts", _normalize_script)
+        # 依版本快取的 Script 物件與 ID 索引: (版本, 列表, ID -> 腳本)
+        self._models: tuple[int, list[Script], dict[str, Script]] = (0, [], {})
+        # 腳本新增、修改或刪除後的回呼 (參數為腳本 ID), 例如讓已快取的函式庫失效
+        self._listeners: list[Callable[[str], None]] = []
+
+    @property
+    def version(self) -> int:
+        """腳本資料的版本, 每次內容改變加一"""
+        return self._file.current_version()
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """註冊腳本變更的回呼"""
+        self._listeners.append(listener)
+
+    def _notify(self, script_id: str) -> None:
+        for listener in self._listeners:
+            with contextlib.suppress(Exception):
+                listener(script_id)
 
     def _load_scripts(self) -> list[dict]:
-        """從文件載入腳本數據"""
-        try:
-            with self.storage_file.open(encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
-
-    def _save_scripts(self, scripts: list[dict]) -> None:
-        """儲存腳本數據到文件"""
-        with self.storage_file.open("w", encoding="utf-8") as f:
-            json.dump(scripts, f, ensure_ascii=False, indent=2)
+        """從文件載入腳本數據 (複本, 可修改後寫回)"""
+        return [dict(item) for item in self._file.load()]
+
+    def _save_scripts(self, scripts: list[dict], changed: Collection[int]) -> None:
+        """儲存腳本數據到文件 (changed: 新增或修改的腳本索引, 其餘沿用已整理的記錄)"""
+        self._file.save(scripts, changed)
+
+    def _snapshot(self) -> tuple[list[Script], dict[str, Script]]:
+        """目前版本的 Script 物件 (共用, 呼叫端不應修改)"""
+        records = self._file.load()
+        version = self._file.version
+        cached_version, models, by_id = self._models
+        if cached_version != version:
+            models = [Script.model_validate(item) for item in records]
+            # ID 重複時與逐一搜尋相同, 以第一個為準
+            by_id = {script.id: script for script in reversed(models)}
+            self._models = (version, models, by_id)
+        return models, by_id
 
     def get_all(self) -> list[Script]:
         """取得所有腳本"""
-        data = self._load_scripts()
-        return [Script(**item) for item in data]
+        return list(self._snapshot()[0])
+
+    def get_all_records(self) -> list[dict]:
+        """所有腳本的原始記錄 (共用的快取, 呼叫端不應修改), 用於匯出"""
+        return self._file.load()
+
+    def get_all_json(self) -> bytes:
+        """所有腳本的 JSON 回應本文 (與 list[Script] 的回應格式相同, 依版本快取)"""
+        return self._file.body()
 
     def get_by_id(self, script_id: str) -> Script | None:
         """根據 ID 取得腳本"""
-        scripts = self.get_all()
-        for script in scripts:
-            if script.id == script_id:
+        return self._snapshot()[1].get(script_id)
+
+    def get_by_name(self, name: str) -> Script | None:
+        """根據名稱取得腳本 (名稱重複時返回第一個)"""
+        for script in self._snapshot()[0]:
+            if script.name == name:
                 return script
         return None
 
@@ -55,18 +100,21 @@ class ScriptRepository:
         scripts_data = self._load_scripts()
 
         # 生成唯一 ID
-        script_id = f"script_{len(scripts_data) + 1}"
+        script_id = self._new_id(len(scripts_data), {s["id"] for s in scripts_data})
 
         new_script = Script(
             id=script_id,
             name=script_data.name,
             content=script_data.content,
             hotkey=script_data.hotkey,
+            schedule=script_data.schedule,
             enabled=True,
         )
 
-        scripts_data.append(new_script.model_dump())
-        self._save_scripts(scripts_data)
+        scripts_data.append(new_script.model_dump(mode="json"))
+        self._save_scripts(scripts_data, [len(scripts_data) - 1])
+        self._record_version(script_id, None, new_script.content)
+        self._notify(script_id)
 
         return new_script
 
@@ -76,6 +124,7 @@ class ScriptRepository:
 
         for i, script_dict in enumerate(scripts_data):
             if script_dict["id"] == script_id:
+                old_content = script_dict["content"]
                 # 只更新提供的字段
                 if update_data.name is not None:
                     script_dict["name"] = update_data.name
@@ -85,14 +134,70 @@ class ScriptRepository:
                     script_dict["hotkey"] = update_data.hotkey
                 if update_data.enabled is not None:
                     script_dict["enabled"] = update_data.enabled
+                # 排程可明確設為 null 以清除, 以是否有傳入欄位判斷
+                if "schedule" in update_data.model_fields_set:
+                    schedule = update_data.schedule
+                    script_dict["schedule"] = schedule.model_dump(mode="json") if schedule else None
 
                 scripts_data[i] = script_dict
-                self._save_scripts(scripts_data)
+                self._save_scripts(scripts_data, [i])
+                # 寫入成功後才記錄版本, 寫入失敗時不留下不存在的版本
+                self._record_version(script_id, old_content, script_dict["content"])
+                self._notify(script_id)
 
                 return Script(**script_dict)
 
         return None
 
+    def import_scripts(self, items: Iterable[ScriptImport]) -> tuple[int, int, int]:
+        """
+        批次匯入腳本 (單一交易): 名稱相同的腳本覆寫內容與設定, 其餘新增
+        與現有腳本完全相同的項目不算修改; 全部處理完才寫入一次檔案,
+        寫入成功後才記錄版本與通知變更 (沒有任何變更時不寫入也不通知)
+
+        Returns:
+            (新增數, 覆寫數, 未改變數)
+        """
+        scripts_data = self._load_scripts()
+        by_name: dict[str, int] = {}
+        for i, script_dict in enumerate(scripts_data):
+            by_name.setdefault(script_dict["name"], i)
+        used_ids = {script_dict["id"] for script_dict in scripts_data}
+
+        # (腳本 ID, 匯入前的內容, 匯入的內容)
+        changes: list[tuple[str, str | None, str]] = []
+        changed: set[int] = set()
+        created = updated = unchanged = 0
+        for item in items:
+            record = item.model_dump(mode="json")
+            index = by_name.get(item.name)
+            if index is None:
+                script_id = self._new_id(len(scripts_data), used_ids)
+                used_ids.add(script_id)
+                by_name[item.name] = len(scripts_data)
+                changed.add(len(scripts_data))
+                scripts_data.append({"id": script_id, **record})
+                changes.append((script_id, None, item.content))
+                created += 1
+            else:
+                previous = scripts_data[index]
+                if all(previous.get(key) == value for key, value in record.items()):
+                    unchanged += 1
+                    continue
+                scripts_data[index] = {**previous, **record}
+                changed.add(index)
+                changes.append((previous["id"], previous["content"], item.content))
+                updated += 1
+
+        if not changes:
+            return 0, 0, unchanged
+        self._save_scripts(scripts_data, changed)
+        for script_id, old_content, new_content in changes:
+            self._record_version(script_id, old_content, new_content)
+        for script_id in dict.fromkeys(script_id for script_id, _, _ in changes):
+            self._notify(script_id)
+        return created, updated, unchanged
+
     def delete(self, script_id: str) -> bool:
         """刪除腳本"""
         scripts_data = self._load_scripts()
@@ -101,11 +206,31 @@ class ScriptRepository:
         scripts_data = [s for s in scripts_data if s["id"] != script_id]
 
         if len(scripts_data) < original_length:
-            self._save_scripts(scripts_data)
+            self._save_scripts(scripts_data, ())
+            if self.versions is not None:
+                self.versions.remove(script_id)
+            self._notify(script_id)
             return True
 
         return False
 
+    @staticmethod
+    def _new_id(count: int, used_ids: set[str]) -> str:
+        """新腳本的 ID (刪除過腳本時, 依數量產生的 ID 可能已被使用)"""
+        number = count + 1
+        while f"script_{number}" in used_ids:
+            number += 1
+        return f"script_{number}"
+
+    def _record_version(self, script_id: str, old_content: str | None, content: str) -> None:
+        """內容改變時記錄新版本 (old_content 為 None 表示新建立的腳本)"""
+        if self.versions is None or content == old_content:
+            return
+        # 啟用版本歷史前建立的腳本, 先保留修改前的內容
+        if old_content is not None and not self.versions.list_versions(script_id):
+            self.versions.record(script_id, old_content)
+        self.versions.record(script_id, content)
+
     def get_enabled_scripts(self) -> list[Script]:
         """取得所有啟用的腳本"""
         all_scripts = self.get_all()
@@ -0,0 +1,322 @@
+"""
+腳本版本歷史
+每個版本的內容以 SHA-256 定址存放 (相同內容只存一份), 並以行為單位與前一版本做差異壓縮:
+錄製腳本很大但每次修改很小, 儲存空間隨修改量成長, 而不是隨版本數成長
+每隔固定版本數存一份完整內容 (關鍵版本), 讀取任何版本最多套用固定次數的差異
+目前版本仍由腳本檔直接讀取, 版本歷史只在查詢、比較與還原時使用
+
+目錄結構:
+    objects/<雜湊前 2 碼>/<雜湊其餘部分>   內容物件
+    index/<腳本 ID>.json                   版本列表
+
+物件格式:
+    b"F" + zlib(內容)                        完整內容
+    b"D" + 基準版本雜湊 (64 碼) + zlib(差異)  差異: [["c", 起始行, 結束行] 複製基準版本的行,
+                                                     ["i", 文字] 插入新文字]
+"""
+
+import contextlib
+import difflib
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+_FULL = b"F"
+_DELTA = b"D"
+_HASH_SIZE = 64
+_CONTENT_CACHE_ENTRIES = 32
+
+
+class ScriptVersionStore:
+    """內容定址、差異壓縮的腳本版本儲存"""
+
+    def __init__(self, root: Path, keyframe_interval: int):
+        """
+        Args:
+            root: 儲存目錄
+            keyframe_interval: 差異鏈的最大長度, 超過時存完整內容
+        """
+        self.root = root
+        self._objects = root / "objects"
+        self._index = root / "index"
+        self._keyframe_interval = max(1, keyframe_interval)
+        self._lock = threading.RLock()
+        # 內容不可變 (以雜湊定址), 最近讀取的內容直接快取
+        self._contents: OrderedDict[str, str] = OrderedDict()
+
+    # 版本列表
+    def _index_file(self, script_id: str) -> Path:
+        """
+        Raises:
+            ValueError: 腳本 ID 含有不允許的字元
+        """
+        if not script_id or not script_id.replace("_", "").replace("-", "").isalnum():
+            raise ValueError(f"不合法的腳本 ID: {script_id}")
+        return self._index / f"{script_id}.json"
+
+    def list_versions(self, script_id: str) -> list[dict]:
+        """腳本的所有版本 (由舊到新): version、hash、timestamp、size"""
+        try:
+            with self._index_file(script_id).open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError, ValueError):
+            return []
+        return data if isinstance(data, list) else []
+
+    def get_version(self, script_id: str, version: int) -> dict | None:
+        """取得單一版本的資訊, 不存在時返回 None"""
+        for entry in self.list_versions(script_id):
+            if entry["version"] == version:
+                return entry
+        return None
+
+    def record(self, script_id: str, content: str) -> dict:
+        """
+        記錄新版本 (內容與最新版本相同時不新增)
+
+        Returns:
+            最新版本的資訊
+        """
+        with self._lock:
+            versions = self.list_versions(script_id)
+            latest = versions[-1] if versions else None
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if latest is not None and latest["hash"] == digest:
+                return latest
+
+            self._store(digest, content, latest["hash"] if latest else None)
+            entry = {
+                "version": latest["version"] + 1 if latest else 1,
+                "hash": digest,
+                "timestamp": datetime.now().isoformat(),
+                "size": len(content),
+            }
+            versions.append(entry)
+            self._write_index(script_id, versions)
+            return entry
+
+    def remove(self, script_id: str) -> None:
+        """刪除腳本的版本歷史, 並清除不再被任何腳本使用的物件"""
+        with self._lock:
+            with contextlib.suppress(OSError, ValueError):
+                self._index_file(script_id).unlink()
+            self.prune()
+
+    def _write_index(self, script_id: str, versions: list[dict]) -> None:
+        path = self._index_file(script_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(versions, f, ensure_ascii=False)
+        tmp.replace(path)
+
+    # 內容
+    def content(self, digest: str) -> str:
+        """
+        讀取物件內容 (依序套用差異鏈)
+
+        Raises:
+            KeyError: 物件不存在或損毀
+        """
+        with self._lock:
+            cached = self._contents.get(digest)
+            if cached is not None:
+                self._contents.move_to_end(digest)
+                return cached
+
+        # 由目標往基準版本找到最近的完整內容, 再依序套用差異
+        chain: list[list] = []
+        current = digest
+        while True:
+            with self._lock:
+                cached = self._contents.get(current)
+            if cached is not None:
+                text = cached
+                break
+            _, base, payload = self._read(current)
+            # 完整內容為字串, 差異為操作列表
+            if isinstance(payload, str):
+                text = payload
+                break
+            chain.append(payload)
+            current = base
+
+        for delta in reversed(chain):
+            text = _apply_delta(text, delta)
+        self._remember(digest, text)
+        return text
+
+    def diff(self, script_id: str, old: int, new: int) -> str:
+        """
+        兩個版本的 unified diff
+
+        Raises:
+            KeyError: 版本不存在
+        """
+        old_entry = self.get_version(script_id, old)
+        new_entry = self.get_version(script_id, new)
+        if old_entry is None or new_entry is None:
+            raise KeyError(f"版本不存在: {old if old_entry is None else new}")
+        return "".join(
+            difflib.unified_diff(
+                self.content(old_entry["hash"]).splitlines(keepends=True),
+                self.content(new_entry["hash"]).splitlines(keepends=True),
+                fromfile=f"v{old}",
+                tofile=f"v{new}",
+            )
+        )
+
+    # 物件
+    def _object_file(self, digest: str) -> Path:
+        return self._objects / digest[:2] / digest[2:]
+
+    def _read(self, digest: str) -> tuple[bytes, str, str | list]:
+        """
+        讀取物件
+
+        Returns:
+            (類型, 基準版本雜湊 (完整內容時為空字串), 內容或差異)
+        """
+        try:
+            data = self._object_file(digest).read_bytes()
+            kind = data[:1]
+            if kind == _FULL:
+                return kind, "", zlib.decompress(data[1:]).decode("utf-8")
+            if kind == _DELTA:
+                base = data[1 : 1 + _HASH_SIZE].decode("ascii")
+                delta = json.loads(zlib.decompress(data[1 + _HASH_SIZE :]))
+                return kind, base, delta
+        except (OSError, zlib.error, ValueError) as e:
+            raise KeyError(f"版本物件損毀或不存在: {digest}") from e
+        raise KeyError(f"版本物件格式錯誤: {digest}")
+
+    def _base_of(self, digest: str) -> str | None:
+        """
+        差異物件的基準版本雜湊 (只讀取檔頭), 完整內容時返回 None
+
+        Raises:
+            OSError: 物件不存在
+        """
+        with self._object_file(digest).open("rb") as f:
+            header = f.read(1 + _HASH_SIZE)
+        return header[1:].decode("ascii") if header[:1] == _DELTA else None
+
+    def _depth(self, digest: str) -> int:
+        """物件到最近完整內容的差異鏈長度 (物件不存在時視為已達上限)"""
+        depth = 0
+        current: str | None = digest
+        while current is not None:
+            try:
+                current = self._base_of(current)
+            except OSError:
+                return self._keyframe_interval
+            if current is not None:
+                depth += 1
+        return depth
+
+    def _store(self, digest: str, content: str, base: str | None) -> None:
+        """寫入物件 (已存在時直接沿用), 差異不比完整內容小時存完整內容"""
+        path = self._object_file(digest)
+        if path.exists():
+            return
+        full = _FULL + zlib.compress(content.encode("utf-8"))
+        data = full
+        if base is not None and self._depth(base) + 1 < self._keyframe_interval:
+            with contextlib.suppress(KeyError):
+                delta = _make_delta(self.content(base), content)
+                packed = (
+                    _DELTA
+                    + base.encode("ascii")
+                    + zlib.compress(json.dumps(delta, ensure_ascii=False).encode("utf-8"))
+                )
+                if len(packed) < len(full):
+                    data = packed
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        self._remember(digest, content)
+
+    def _remember(self, digest: str, content: str) -> None:
+        with self._lock:
+            self._contents[digest] = content
+            self._contents.move_to_end(digest)
+            while len(self._contents) > _CONTENT_CACHE_ENTRIES:
+                self._contents.popitem(last=False)
+
+    def prune(self) -> int:
+        """
+        刪除沒有被任何版本 (直接或作為差異基準) 使用的物件
+
+        Returns:
+            刪除的物件數
+        """
+        with self._lock:
+            reachable: set[str] = set()
+            with contextlib.suppress(OSError):
+                for index_file in self._index.glob("*.json"):
+                    for entry in self.list_versions(index_file.stem):
+                        current: str | None = entry["hash"]
+                        while current is not None and current not in reachable:
+                            reachable.add(current)
+                            try:
+                                current = self._base_of(current)
+                            except OSError:
+                                break
+
+            removed = 0
+            with contextlib.suppress(OSError):
+                for path in self._objects.glob("*/*"):
+                    digest = path.parent.name + path.name
+                    if digest not in reachable:
+                        with contextlib.suppress(OSError):
+                            path.unlink()
+                            removed += 1
+            return removed
+
+
+def _make_delta(base: str, content: str) -> list:
+    """以行為單位計算差異: 複製基準版本的行範圍或插入新文字"""
+    base_lines = base.splitlines(keepends=True)
+    new_lines = content.splitlines(keepends=True)
+    # 先去掉頭尾相同的行: 一般修改集中在一小段, 只需比對中間部分
+    limit = min(len(base_lines), len(new_lines))
+    head = 0
+    while head < limit and base_lines[head] == new_lines[head]:
+        head += 1
+    tail = 0
+    while (
+        tail < limit - head
+        and base_lines[len(base_lines) - 1 - tail] == new_lines[len(new_lines) - 1 - tail]
+    ):
+        tail += 1
+
+    delta: list = [["c", 0, head]] if head else []
+    # 錄製腳本中大量重複的行 (例如 sleep) 由 autojunk 略過, 避免比對時間隨重複次數暴增
+    matcher = difflib.SequenceMatcher(
+        None, base_lines[head : len(base_lines) - tail], new_lines[head : len(new_lines) - tail]
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append(["c", head + i1, head + i2])
+        elif j2 > j1:
+            delta.append(["i", "".join(new_lines[head + j1 : head + j2])])
+    if tail:
+        delta.append(["c", len(base_lines) - tail, len(base_lines)])
+    return delta
+
+
+def _apply_delta(base: str, delta: list) -> str:
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if op[0] == "c":
+            parts.extend(base_lines[op[1] : op[2]])
+        else:
+            parts.append(op[1])
+    return "".join(parts)
@@ -0,0 +1,137 @@
+"""
+WebSocket 連線管理
+廣播時只序列化一次, 每個連線擁有獨立的有界佇列與寫入任務,
+慢速客戶端不會拖慢其他連線
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+
+from fastapi import WebSocket
+
+from config.settings import WS_SEND_QUEUE_SIZE, WS_SEND_TIMEOUT
+from core.metrics import WS_BROADCAST_SECONDS, WS_DISCONNECTS
+
+# 慢速客戶端被中斷時使用的關閉代碼 (1013: Try Again Later)
+_CLOSE_SLOW_CONSUMER = 1013
+
+
+class ClientConnection:
+    """單一 WebSocket 連線的發送端"""
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.writer: asyncio.Task | None = None
+
+
+class ConnectionManager:
+    """WebSocket 連線管理類 - 處理連線註冊與非阻塞廣播"""
+
+    def __init__(self, queue_size: int = WS_SEND_QUEUE_SIZE, send_timeout: float = WS_SEND_TIMEOUT):
+        """
+        初始化連線管理器
+
+        Args:
+            queue_size: 每個連線的待發送訊息上限, 超過時視為慢速客戶端並中斷連線
+            send_timeout: 單一訊息的發送逾時 (秒)
+        """
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self._clients: dict[WebSocket, ClientConnection] = {}
+        self._count = 0
+        # 進行中的關閉任務 (保留參照, 避免任務在完成前被回收)
+        self._closing: set[asyncio.Task] = set()
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        """目前的連線列表 (只能在事件迴圈執行緒中讀取)"""
+        return list(self._clients)
+
+    @property
+    def connection_count(self) -> int:
+        """
+        目前的連線數 (任何執行緒皆可讀取)
+        連線只在事件迴圈中增減, 其他執行緒讀取數量不需走訪連線字典
+        """
+        return self._count
+
+    async def connect(self, websocket: WebSocket):
+        """接受連線並啟動寫入任務"""
+        await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size)
+        client.writer = asyncio.create_task(self._write_loop(client))
+        self._clients[websocket] = client
+        self._count = len(self._clients)
+
+    def disconnect(self, websocket: WebSocket):
+        """移除連線並停止寫入任務"""
+        client = self._clients.pop(websocket, None)
+        self._count = len(self._clients)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+    def send_personal(self, websocket: WebSocket, message: dict) -> None:
+        """透過佇列發送訊息給單一連線 (與廣播保持相同順序)"""
+        client = self._clients.get(websocket)
+        if client:
+            self._enqueue(client, json.dumps(message, ensure_ascii=False))
+
+    def broadcast_nowait(self, message: dict) -> None:
+        """
+        廣播訊息 (必須在事件迴圈執行緒中呼叫, 其他執行緒請透過 core.event_bus 投遞)
+
+        訊息只序列化一次, 放入各連線佇列後立即返回, 耗時與連線數量呈線性且不等待網路
+        """
+        if not self._clients:
+            return
+        self.broadcast_text_nowait(json.dumps(message, ensure_ascii=False))
+
+    def broadcast_text_nowait(self, text: str) -> None:
+        """廣播已序列化的訊息 (必須在事件迴圈執行緒中呼叫)"""
+        start = time.perf_counter()
+        for client in list(self._clients.values()):
+            self._enqueue(client, text)
+        WS_BROADCAST_SECONDS.observe(time.perf_counter() - start)
+
+    async def broadcast(self, message: dict):
+        """廣播訊息 (非同步介面, 不會等待任何連線完成發送)"""
+        self.broadcast_nowait(message)
+
+    async def broadcast_text(self, text: str):
+        """廣播已序列化的訊息 (非同步介面)"""
+        self.broadcast_text_nowait(text)
+
+    def _enqueue(self, client: ClientConnection, text: str) -> None:
+        """放入連線佇列, 佇列已滿代表客戶端跟不上, 直接中斷"""
+        try:
+            client.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            # 狀態訊息為增量編碼, 丟棄中間訊息會造成客戶端狀態錯誤;
+            # 中斷後客戶端重新連線時會收到完整狀態
+            WS_DISCONNECTS.inc(labels=("slow_consumer",))
+            self.disconnect(client.websocket)
+            task = asyncio.create_task(self._close(client.websocket))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _write_loop(self, client: ClientConnection):
+        """依序發送佇列中的訊息, 發送失敗或逾時則中斷連線"""
+        try:
+            while True:
+                text = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_text(text), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            reason = "timeout" if isinstance(e, TimeoutError) else "send_error"
+            WS_DISCONNECTS.inc(labels=(reason,))
+            self.disconnect(client.websocket)
+            await self._close(client.websocket)
+
+    async def _close(self, websocket: WebSocket):
+        """關閉慢速或失效的連線"""
+        with contextlib.suppress(Exception):
+            await websocket.close(code=_CLOSE_SLOW_CONSUMER)
@@ -4,56 +4,68 @@
 """
 
 import json
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 
-from config.settings import HISTORY_FILE, MAX_HISTORY_RECORDS
+from config.settings import HISTORY_FILE, MAX_HISTORY_RECORDS, PROFILES_DIR
+from repositories.json_file import JsonListFile
 
 
 class HistoryService:
     """歷史記錄服務類"""
 
-    def __init__(self, history_file: Path = HISTORY_FILE):
+    def __init__(self, history_file: Path = HISTORY_FILE, profiles_dir: Path = PROFILES_DIR):
         """
         初始化歷史記錄服務
 
         Args:
             history_file: 歷史記錄文件路徑
+            profiles_dir: 效能分析報告目錄
         """
         self.history_file = history_file
-        self._ensure_file_exists()
+        self.profiles_dir = profiles_dir
+        # 歷史記錄與序列化後的列表快取在記憶體, 新增或清除記錄時才更新
+        self._file = JsonListFile(history_file, "history")
 
-    def _ensure_file_exists(self) -> None:
-        """確保歷史記錄文件存在"""
-        if not self.history_file.exists():
-            self.history_file.parent.mkdir(parents=True, exist_ok=True)
-            self._save_history([])
+    @property
+    def version(self) -> int:
+        """歷史記錄的版本, 每次內容改變加一"""
+        return self._file.current_version()
 
     def _load_history(self) -> list[dict]:
-        """載入歷史記錄"""
-        try:
-            with self.history_file.open(encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
+        """載入歷史記錄 (列表複本, 記錄本身不應修改)"""
+        return list(self._file.load())
 
     def _save_history(self, history: list[dict]) -> None:
         """儲存歷史記錄"""
-        with self.history_file.open("w", encoding="utf-8") as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+        self._file.save(history)
+
+    def _profile_file(self, run_id: str) -> Path | None:
+        """取得分析報告檔案路徑 (run_id 不合法時回傳 None)"""
+        if not run_id or not run_id.isalnum():
+            return None
+        return self.profiles_dir / f"{run_id}.json"
 
     def add_record(
-        self, script_id: str, status: str, duration: float, error: str | None = None
+        self,
+        script_id: str,
+        status: str,
+        duration: float,
+        error: str | None = None,
+        run_id: str | None = None,
+        profile: dict | None = None,
     ) -> None:
         """
         添加執行記錄
 
         Args:
             script_id: 腳本 ID
-            status: 執行狀態 (success/error)
+            status: 執行狀態 (success/error/stopped)
             duration: 執行時長
             error: 錯誤訊息 (可選)
+            run_id: 執行 ID (可選)
+            profile: 效能分析報告 (可選, 需要 run_id), 另存為獨立檔案
         """
         history = self._load_history()
 
@@ -63,22 +75,113 @@ class HistoryService:
             "status": status,
             "duration": round(duration, 3),
             "error": error,
+            "run_id": run_id,
+            "has_profile": False,
         }
 
+        # 報告可能很大, 不放進歷史記錄檔, 避免拖慢歷史列表的讀寫
+        profile_file = self._profile_file(run_id) if profile is not None and run_id else None
+        if profile_file is not None:
+            profile_file.parent.mkdir(parents=True, exist_ok=True)
+            with profile_file.open("w", encoding="utf-8") as f:
+                json.dump(profile, f, ensure_ascii=False)
+            record["has_profile"] = True
+
         history.append(record)
 
-        # 只保留最近的記錄
+        # 只保留最近的記錄, 並刪除被移除記錄的分析報告
         if len(history) > MAX_HISTORY_RECORDS:
+            for removed in history[:-MAX_HISTORY_RECORDS]:
+                self._delete_profile(removed)
             history = history[-MAX_HISTORY_RECORDS:]
 
         self._save_history(history)
 
+    def _delete_profile(self, record: dict) -> None:
+        """刪除記錄對應的分析報告"""
+        if not record.get("has_profile"):
+            return
+        profile_file = self._profile_file(record.get("run_id") or "")
+        if profile_file is not None:
+            profile_file.unlink(missing_ok=True)
+
     def get_all(self) -> list[dict]:
         """取得所有歷史記錄"""
         return self._load_history()
 
+    def import_records(self, records: Iterable[dict]) -> tuple[int, int]:
+        """
+        匯入歷史記錄 (與現有記錄依時間合併, 只保留最近的記錄)
+        已存在的記錄 (run_id 相同, 沒有 run_id 時腳本與時間相同) 略過, 重複匯入同一份檔案不會產生重複
+        分析報告不隨記錄匯出, 匯入的記錄一律標記為沒有報告
+
+        Returns:
+            (保留下來的匯入記錄數, 略過的重複記錄數)
+        """
+        history = self._load_history()
+        seen = {self._record_key(record) for record in history}
+        imported: list[dict] = []
+        duplicates = 0
+        for record in records:
+            key = self._record_key(record)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            imported.append({**record, "has_profile": False})
+            # 匯入的記錄中只有最近的 MAX_HISTORY_RECORDS 筆可能被保留, 較舊的可先捨棄
+            if len(imported) >= 2 * MAX_HISTORY_RECORDS:
+                imported = self._by_time(imported)[-MAX_HISTORY_RECORDS:]
+        if not imported:
+            return 0, duplicates
+        # 依時間排序 (穩定排序, 時間相同時現有記錄在前)
+        merged = self._by_time(history + imported)
+        kept = merged[-MAX_HISTORY_RECORDS:]
+        for removed in merged[:-MAX_HISTORY_RECORDS]:
+            self._delete_profile(removed)
+        self._save_history(kept)
+        kept_ids = {id(record) for record in kept}
+        return sum(1 for record in imported if id(record) in kept_ids), duplicates
+
+    @staticmethod
+    def _by_time(records: list[dict]) -> list[dict]:
+        return sorted(records, key=lambda record: str(record.get("timestamp", "")))
+
+    @staticmethod
+    def _record_key(record: dict) -> tuple:
+        """判斷記錄是否相同的鍵"""
+        run_id = record.get("run_id")
+        if run_id:
+            return ("run", run_id)
+        return ("time", record.get("script_id"), record.get("timestamp"))
+
+    def get_all_json(self) -> bytes:
+        """所有歷史記錄的 JSON 回應本文 (依版本快取)"""
+        return self._file.body()
+
+    def get_profile(self, run_id: str) -> dict | None:
+        """
+        取得執行的效能分析報告
+
+        Args:
+            run_id: 執行 ID
+
+        Returns:
+            分析報告, 不存在時返回 None
+        """
+        profile_file = self._profile_file(run_id)
+        if profile_file is None:
+            return None
+        try:
+            with profile_file.open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return None
+        return data if isinstance(data, dict) else None
+
     def clear(self) -> None:
         """清除所有歷史記錄"""
+        for record in self._load_history():
+            self._delete_profile(record)
         if self.history_file.exists():
-            self.history_file.unlink()
-            self._ensure_file_exists()
+            self._save_history([])
@@ -5,13 +5,25 @@
 
 import ast
 import json
+import logging
 import subprocess
 import tempfile
+from collections.abc import Iterable
 from pathlib import Path
 
-from models.schemas import Script, ScriptCheckIssue, ScriptCreate, ScriptUpdate
+from core.keys import find_unknown_keys
+from models.schemas import (
+    ImportResult,
+    Script,
+    ScriptCheckIssue,
+    ScriptCreate,
+    ScriptImport,
+    ScriptUpdate,
+)
 from repositories.script_repository import ScriptRepository
 
+logger = logging.getLogger(__name__)
+
 
 class ScriptService:
     """腳本服務類 - 處理腳本相關業務邏輯"""
@@ -29,6 +41,14 @@ class ScriptService:
         """取得所有腳本"""
         return self.repository.get_all()
 
+    def get_version(self) -> int:
+        """腳本資料的版本 (每次內容改變加一), 用於產生 ETag"""
+        return self.repository.version
+
+    def get_all_scripts_json(self) -> bytes:
+        """所有腳本的 JSON 回應本文 (不經過 Script 物件, 直接使用倉庫快取的序列化結果)"""
+        return self.repository.get_all_json()
+
     def get_script(self, script_id: str) -> Script | None:
         """
         根據 ID 取得腳本
@@ -78,6 +98,85 @@ class ScriptService:
         """
         return self.repository.delete(script_id)
 
+    def export_scripts(self) -> list[dict]:
+        """匯出用的所有腳本記錄 (唯讀快照, 之後的修改不影響)"""
+        return self.repository.get_all_records()
+
+    def import_scripts(self, items: Iterable[ScriptImport]) -> ImportResult:
+        """
+        批次匯入腳本 (單一交易, 名稱相同的腳本被覆寫)
+
+        Args:
+            items: 已驗證的腳本 (逐筆處理, 可為串流)
+
+        Returns:
+            新增、覆寫與未改變的數量
+        """
+        created, updated, unchanged = self.repository.import_scripts(items)
+        return ImportResult(created=created, updated=updated, unchanged=unchanged)
+
+    def list_versions(self, script_id: str) -> list[dict] | None:
+        """
+        腳本的版本歷史 (由舊到新)
+
+        Returns:
+            版本列表, 腳本不存在時返回 None
+        """
+        if self.repository.get_by_id(script_id) is None:
+            return None
+        versions = self.repository.versions
+        return versions.list_versions(script_id) if versions is not None else []
+
+    def get_version_content(self, script_id: str, version: int) -> dict | None:
+        """
+        取得單一版本與其內容
+
+        Returns:
+            版本資訊加上 content, 版本不存在時返回 None
+        """
+        versions = self.repository.versions
+        if versions is None or self.repository.get_by_id(script_id) is None:
+            return None
+        entry = versions.get_version(script_id, version)
+        if entry is None:
+            return None
+        try:
+            return {**entry, "content": versions.content(entry["hash"])}
+        except KeyError:
+            logger.warning("腳本 %s 的版本 %d 內容遺失", script_id, version)
+            return None
+
+    def diff_versions(self, script_id: str, old: int, new: int) -> str | None:
+        """
+        兩個版本的 unified diff
+
+        Returns:
+            差異文字, 任一版本不存在時返回 None
+        """
+        versions = self.repository.versions
+        if versions is None or self.repository.get_by_id(script_id) is None:
+            return None
+        try:
+            return versions.diff(script_id, old, new)
+        except KeyError:
+            return None
+
+    def restore_version(self, script_id: str, version: int) -> Script | None:
+        """
+        將腳本內容還原為指定版本 (還原本身記錄為新版本, 歷史不會被覆寫)
+
+        Returns:
+            更新後的腳本, 腳本或版本不存在時返回 None
+        """
+        entry = self.get_version_content(script_id, version)
+        if entry is None:
+            return None
+        return self.repository.update(script_id, ScriptUpdate(content=entry["content"]))
+
+    def resolve_script(self, id_or_name: str) -> Script | None:
+        """以 ID 或名稱取得腳本 (ID 優先)"""
+        return self.repository.get_by_id(id_or_name) or self.repository.get_by_name(id_or_name)
+
     def get_enabled_scripts(self) -> list[Script]:
         """取得所有啟用的腳本"""
         return self.repository.get_enabled_scripts()
@@ -97,7 +196,7 @@ class ScriptService:
 
         # 1. 基礎 AST 語法檢查
         try:
-            ast.parse(content)
+            tree = ast.parse(content)
         except SyntaxError as e:
             line_no = e.lineno or 1
             issues.append(
@@ -125,7 +224,20 @@ class ScriptService:
             )
             return issues
 
-        # 2. 使用 Ruff 進行檢查 (如果可用)
+        # 2. 檢查以常數指定的按鍵名稱 (與引擎執行前的檢查相同)
+        for line_no, column, name in find_unknown_keys(tree):
+            issues.append(
+                ScriptCheckIssue(
+                    line=line_no,
+                    column=column,
+                    message=f"未知的按鍵名稱: '{name}'",
+                    severity="error",
+                    code="KEY",
+                    script_context=get_line_content(line_no),
+                )
+            )
+
+        # 3. 使用 Ruff 進行檢查 (如果可用)
         try:
             with tempfile.NamedTemporaryFile(
                 mode="w", suffix=".py", delete=False, encoding="utf-8"
@@ -165,6 +277,17 @@ class ScriptService:
                     "key_release",
                     "mouse_down",
                     "mouse_release",
+                    "move_path",
+                    "click_many",
+                    "key_sequence",
+                    "glide",
+                    "resolve_key",
+                    "pixel",
+                    "wait_pixel",
+                    "find_image",
+                    "wait_image",
+                    "import_script",
+                    "call_script",
                 }
 
                 if result.stdout:
@@ -198,7 +321,7 @@ class ScriptService:
                 Path(tmp_path).unlink(missing_ok=True)
 
         except Exception as e:
-            print(f"Ruff check failed: {e}")
+            logger.warning("Ruff 檢查失敗: %s", e)
             # fall back to AST only if ruff fails
             pass
 
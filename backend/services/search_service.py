@@ -0,0 +1,69 @@
+"""
+腳本搜尋服務
+維護腳本名稱、內容與呼叫函數的倒排索引: 第一次查詢時建立,
+之後由倉庫的變更通知逐一更新, 查詢不需重新讀取或掃描所有腳本
+"""
+
+import threading
+
+from core.search_index import SearchIndex
+from models.schemas import ScriptSearchHit, ScriptSearchResult
+from repositories.script_repository import ScriptRepository
+
+
+class ScriptSearchService:
+    """腳本搜尋服務類"""
+
+    def __init__(self, repository: ScriptRepository):
+        """
+        Args:
+            repository: 腳本數據倉庫實例 (需將 refresh 註冊為其變更回呼)
+        """
+        self.repository = repository
+        self._index = SearchIndex()
+        # 索引對應的腳本資料版本, 0 表示尚未建立
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, script_id: str) -> None:
+        """腳本新增、修改或刪除後更新該腳本的索引 (倉庫的變更回呼)"""
+        with self._lock:
+            if not self._version:
+                return
+            version = self.repository.version
+            # 每次寫入版本只加一; 跳號表示檔案被外部修改或有其他未通知的寫入, 下次查詢時重建
+            if version not in (self._version, self._version + 1):
+                self._version = 0
+                return
+            script = self.repository.get_by_id(script_id)
+            if script is None:
+                self._index.remove(script_id)
+            else:
+                self._index.add(script.id, script.name, script.content)
+            self._version = version
+
+    def _ensure_index(self) -> None:
+        """索引尚未建立或已過期時重建"""
+        with self._lock:
+            version = self.repository.version
+            if version == self._version:
+                return
+            self._index.clear()
+            for record in self.repository.get_all_records():
+                self._index.add(record["id"], record["name"], record["content"])
+            self._version = version
+
+    def search(self, query: str, limit: int) -> ScriptSearchResult:
+        """
+        搜尋腳本
+
+        Args:
+            query: 查詢字串 (語法見 core/search_index.py)
+            limit: 最多返回的筆數
+
+        Returns:
+            符合的總數與依分數排序的結果
+        """
+        self._ensure_index()
+        total, hits = self._index.search(query, max(1, limit))
+        return ScriptSearchResult(total=total, hits=[ScriptSearchHit(**hit) for hit in hits])
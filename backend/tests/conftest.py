@@ -0,0 +1,12 @@
+"""
+測試共用設定
+以假的 pynput 取代實際的輸入控制 (必須在匯入 core 模組之前), 資料目錄改用暫存目錄
+"""
+
+import os
+import tempfile
+
+from benchmarks.fakes import install_fake_pynput
+
+os.environ.setdefault("XXSCRIPT_DATA_DIR", tempfile.mkdtemp(prefix="xxscript-test-"))
+install_fake_pynput()
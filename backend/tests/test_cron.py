@@ -0,0 +1,67 @@
+"""cron 表示式的解析與下一次執行時間"""
+
+from datetime import datetime
+
+import pytest
+
+from core.cron import CronExpression
+
+
+def next_after(text: str, moment: str) -> datetime:
+    return CronExpression(text).next_after(datetime.fromisoformat(moment))
+
+
+def test_every_minute_skips_current_minute():
+    assert next_after("* * * * *", "2026-01-01T10:00:30") == datetime(2026, 1, 1, 10, 1)
+
+
+def test_steps_and_ranges():
+    assert next_after("*/15 9-17 * * *", "2026-01-01T17:50") == datetime(2026, 1, 2, 9, 0)
+    assert next_after("5/20 * * * *", "2026-01-01T10:30") == datetime(2026, 1, 1, 10, 45)
+    assert next_after("0 0 1,15 * *", "2026-01-02T00:00") == datetime(2026, 1, 15)
+
+
+def test_year_and_month_rollover():
+    assert next_after("0 0 1 1 *", "2026-06-01T00:00") == datetime(2027, 1, 1)
+    assert next_after("30 23 31 * *", "2026-04-01T00:00") == datetime(2026, 5, 31, 23, 30)
+
+
+def test_leap_day():
+    assert next_after("0 12 29 2 *", "2026-03-01T00:00") == datetime(2028, 2, 29, 12, 0)
+
+
+def test_sunday_as_0_or_7():
+    # 2026-01-04 是星期日
+    assert next_after("0 8 * * 0", "2026-01-01T00:00") == datetime(2026, 1, 4, 8, 0)
+    assert next_after("0 8 * * 7", "2026-01-01T00:00") == datetime(2026, 1, 4, 8, 0)
+
+
+def test_day_of_month_or_weekday():
+    # 日與星期都有限制: 符合任一即可 (1 號或星期一; 2026-01-05 是星期一)
+    assert next_after("0 0 1 * 1", "2026-01-02T00:00") == datetime(2026, 1, 5)
+
+
+def test_day_of_month_star_step_requires_both():
+    # 日以 * 開頭 (*/2) 時與星期同時符合才執行: 奇數日且為星期一 (2026-01-05)
+    assert next_after("0 0 */2 * 1", "2026-01-01T00:00") == datetime(2026, 1, 5)
+    assert next_after("0 0 */2 * 1", "2026-01-06T00:00") == datetime(2026, 1, 19)
+
+
+def test_weekday_star_step_requires_both():
+    # 星期以 * 開頭 (*/6 = 星期日與星期六) 時與日同時符合: 10 號且為週末 (2026-01-10 是星期六)
+    assert next_after("0 0 10 * */6", "2026-01-01T00:00") == datetime(2026, 1, 10)
+    assert next_after("0 0 10 * */6", "2026-01-11T00:00") == datetime(2026, 5, 10)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["* * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "* * * 13 *", "*/0 * * * *", "a * * * *"],
+)
+def test_invalid_expressions(text: str):
+    with pytest.raises(ValueError):
+        CronExpression(text)
+
+
+def test_impossible_date():
+    with pytest.raises(ValueError):
+        next_after("0 0 30 2 *", "2026-01-01T00:00")
@@ -0,0 +1,34 @@
+"""模擬執行: 虛擬時間與逾時停止"""
+
+import threading
+import time
+
+from core.dry_run import DryRunEngine
+from core.engine import ScriptEngine
+
+
+def test_long_sleep_script_finishes_instantly():
+    source = "\n".join(["move(10, 20)", "sleep(3600)", "click()", "sleep(1800)", "press('a')"])
+    start = time.perf_counter()
+    result = ScriptEngine().dry_run(source)
+    assert time.perf_counter() - start < 2.0
+    assert result["status"] == "success"
+    assert result["duration_ms"] >= 5400 * 1000
+    assert result["action_count"] >= 3
+
+
+def test_virtual_time_limit_truncates():
+    engine = DryRunEngine(max_actions=1000, max_seconds=60.0)
+    result = engine.simulate("while True:\n    sleep(1)", "test", timeout=5.0)
+    assert result["status"] == "truncated"
+    assert result["duration_ms"] <= 62 * 1000
+
+
+def test_infinite_loop_without_api_calls_times_out():
+    engine = DryRunEngine(max_actions=1000, max_seconds=3600.0)
+    start = time.perf_counter()
+    result = engine.simulate("x = 0\nwhile True:\n    x += 1", "test", timeout=0.2)
+    assert result["status"] == "timeout"
+    # 逾時後腳本在下一行停止, 不會留在背景空轉
+    assert time.perf_counter() - start < 1.0
+    assert not any(thread.name == "dry-run" for thread in threading.enumerate())
@@ -0,0 +1,63 @@
+"""螢幕 API (pixel、wait_pixel、find_image) 在合成畫面上的行為"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from core.engine import ScriptEngine
+from core.screen import ScreenReader, SyntheticFramebuffer
+
+
+@pytest.fixture
+def framebuffer() -> SyntheticFramebuffer:
+    return SyntheticFramebuffer(640, 480, (30, 30, 30))
+
+
+@pytest.fixture
+def engine(framebuffer: SyntheticFramebuffer) -> ScriptEngine:
+    engine = ScriptEngine()
+    engine.screen = ScreenReader(framebuffer, 0.01)
+    return engine
+
+
+def test_pixel_reads_framebuffer(engine: ScriptEngine, framebuffer: SyntheticFramebuffer):
+    framebuffer.fill((100, 200, 1, 1), "#ff8000")
+    assert engine.pixel(100, 200) == (255, 128, 0)
+    assert engine.pixel(101, 200) == (30, 30, 30)
+
+
+def test_pixel_outside_screen(engine: ScriptEngine):
+    with pytest.raises(ValueError):
+        engine.pixel(640, 0)
+
+
+def test_wait_pixel_sees_later_change(engine: ScriptEngine, framebuffer: SyntheticFramebuffer):
+    timer = threading.Timer(0.05, framebuffer.fill, ((10, 10, 1, 1), (0, 255, 0)))
+    timer.start()
+    try:
+        assert engine.wait_pixel(10, 10, (0, 250, 5), timeout=2.0, tolerance=8, interval=0.01)
+    finally:
+        timer.cancel()
+
+
+def test_wait_pixel_timeout(engine: ScriptEngine):
+    assert not engine.wait_pixel(10, 10, "#ffffff", timeout=0.05, tolerance=0, interval=0.01)
+
+
+def test_find_image(engine: ScriptEngine, framebuffer: SyntheticFramebuffer):
+    template = np.random.default_rng(0).integers(0, 255, (20, 30, 3), dtype=np.uint8)
+    framebuffer.paste(template, 400, 300)
+    # 回傳匹配位置的中心座標
+    assert engine.find_image(template) == (415, 310)
+    assert engine.find_image(template, region=(350, 250, 200, 150)) == (415, 310)
+    assert engine.find_image(template, region=(0, 0, 200, 150)) is None
+
+
+def test_find_image_rejects_different_colors(
+    engine: ScriptEngine, framebuffer: SyntheticFramebuffer
+):
+    # 灰階相同但顏色不同的區域不算匹配
+    framebuffer.fill((100, 100, 20, 20), (255, 0, 0))
+    template = np.full((10, 10, 3), (0, 130, 0), dtype=np.uint8)
+    assert engine.find_image(template, tolerance=10) is None
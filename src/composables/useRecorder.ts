@@ -2,23 +2,48 @@
  * 錄製功能 Composable
  * 處理腳本錄製相關邏輯
  */
-import { ref } from 'vue';
+import { ref, shallowRef, triggerRef, onUnmounted } from 'vue';
 import { scriptApi } from '../services/api';
-import type { Script } from '../types';
+import type { RecordedEvent, RecorderEventsMessage, Script } from '../types';
+import { useSystemSocket } from './useSystemSocket';
 import { useToast } from './useToast';
 
 export function useRecorder(selectedScript: { value: Script | null }) {
   const isRecording = ref(false);
+  // 即時錄製事件 (由後端批次推送, 不需輪詢)
+  const liveEvents = shallowRef<RecordedEvent[]>([]);
+  const recordingDuration = ref(0);
   const toast = useToast();
+  const { subscribe } = useSystemSocket();
+
+  let unsubscribe: (() => void) | null = null;
+
+  const handleRecorderEvents = (data: RecorderEventsMessage) => {
+    // 從 offset 開始覆寫 (最後一筆滑鼠移動可能被合併更新) 並附加新事件
+    const events = liveEvents.value;
+    events.length = Math.min(events.length, data.offset);
+    events.push(...data.events);
+    triggerRef(liveEvents);
+    recordingDuration.value = data.duration;
+  };
+
+  const stopStreaming = () => {
+    unsubscribe?.();
+    unsubscribe = null;
+  };
 
   /**
    * 開始錄製
    */
   const startRecording = async () => {
     try {
+      liveEvents.value = [];
+      recordingDuration.value = 0;
+      unsubscribe = subscribe<RecorderEventsMessage>('recorder_events', handleRecorderEvents);
       await scriptApi.startRecording();
       isRecording.value = true;
     } catch (err) {
+      stopStreaming();
       console.error('開始錄製失敗:', err);
       toast.error('開始錄製失敗');
     }
@@ -40,11 +65,19 @@ export function useRecorder(selectedScript: { value: Script | null }) {
       console.error('停止錄製失敗:', err);
       toast.error('停止錄製失敗');
       isRecording.value = false;
+    } finally {
+      stopStreaming();
     }
   };
 
+  onUnmounted(() => {
+    stopStreaming();
+  });
+
   return {
     isRecording,
+    liveEvents,
+    recordingDuration,
     startRecording,
     stopRecording,
   };
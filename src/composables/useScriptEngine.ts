@@ -1,65 +1,55 @@
 import { ref, onMounted, onUnmounted } from 'vue';
 import { scriptApi } from '../services/api';
 import { useConsoleStore } from '../stores/console';
+import { useSystemSocket } from './useSystemSocket';
 
 export type EngineStatus = 'IDLE' | 'RUNNING' | 'PAUSED';
 
+// 後端推送的狀態增量 (只包含變更的欄位)
+interface EngineStatusDelta {
+  status?: EngineStatus;
+  script_id?: string | null;
+  script_name?: string | null;
+  current_line?: number | null;
+  total_lines?: number | null;
+}
+
 export function useScriptEngine() {
   const status = ref<EngineStatus>('IDLE');
   const currentScriptId = ref<string | null>(null);
   const currentScriptName = ref<string | null>(null);
   const currentLine = ref<number | null>(null);
+  const totalLines = ref<number | null>(null);
   const loading = ref(false);
 
   const consoleStore = useConsoleStore();
+  const { subscribe } = useSystemSocket();
 
-  let pollTimeout: number | null = null;
-  let isActive = false;
+  let unsubscribe: (() => void) | null = null;
+
+  const applyStatus = (delta: EngineStatusDelta) => {
+    if (delta.status !== undefined) status.value = delta.status;
+    if (delta.script_id !== undefined) currentScriptId.value = delta.script_id;
+    if (delta.script_name !== undefined) currentScriptName.value = delta.script_name;
+    if (delta.current_line !== undefined) currentLine.value = delta.current_line;
+    if (delta.total_lines !== undefined) totalLines.value = delta.total_lines;
+  };
 
   const fetchStatus = async () => {
     try {
       const response = await scriptApi.getEngineStatus();
-      status.value = response.data.status;
-      currentScriptId.value = response.data.script_id;
-      currentScriptName.value = response.data.script_name;
-      currentLine.value = response.data.current_line;
+      applyStatus(response.data);
     } catch (e) {
       console.error('Failed to fetch engine status', e);
     }
   };
 
-  const poll = async () => {
-    if (!isActive) return;
-
-    await fetchStatus();
-
-    // 如果正在運行，加快輪詢頻率以更新行號
-    const interval = status.value === 'RUNNING' ? 200 : 1000;
-    pollTimeout = window.setTimeout(poll, interval);
-  };
-
-  const startPolling = () => {
-    if (isActive) return;
-    isActive = true;
-    poll();
-  };
-
-  const stopPolling = () => {
-    isActive = false;
-    if (pollTimeout) {
-      clearTimeout(pollTimeout);
-      pollTimeout = null;
-    }
-  };
-
   const executeScript = async (id: string, name: string) => {
     try {
       loading.value = true;
       currentLine.value = 0;
       await scriptApi.executeScript(id);
       consoleStore.info(`開始執行: ${name}`, 'Runtime');
-      // 立即更新一次狀態
-      await fetchStatus();
     } catch (err) {
       const errorObj = err as Error;
       consoleStore.error(`執行失敗: ${errorObj.message}`, 'Runtime');
@@ -73,7 +63,6 @@ export function useScriptEngine() {
     try {
       const response = await scriptApi.stopEngine();
       consoleStore.warn(`停止執行: ${response.data.message}`, 'Runtime');
-      await fetchStatus();
     } catch (e) {
       console.error(e);
     }
@@ -83,7 +72,6 @@ export function useScriptEngine() {
     try {
       const response = await scriptApi.pauseEngine();
       consoleStore.info(`暫停執行: ${response.data.message}`, 'Runtime');
-      await fetchStatus();
     } catch (e) {
       console.error(e);
     }
@@ -93,18 +81,19 @@ export function useScriptEngine() {
     try {
       const response = await scriptApi.resumeEngine();
       consoleStore.info(`繼續執行: ${response.data.message}`, 'Runtime');
-      await fetchStatus();
     } catch (e) {
       console.error(e);
     }
   };
 
+  // 狀態由後端透過 WebSocket 推送, 連線時會先收到完整狀態
   onMounted(() => {
-    startPolling();
+    unsubscribe = subscribe<EngineStatusDelta>('engine_status', applyStatus);
   });
 
   onUnmounted(() => {
-    stopPolling();
+    unsubscribe?.();
+    unsubscribe = null;
   });
 
   return {
@@ -112,6 +101,7 @@ export function useScriptEngine() {
     currentScriptId,
     currentScriptName,
     currentLine,
+    totalLines,
     loading,
     executeScript,
     stopEngine,
@@ -0,0 +1,78 @@
+/**
+ * 系統 WebSocket Composable
+ * 共用單一 /ws/system 連線, 依訊息類型分派給訂閱者
+ */
+
+export interface SystemMessage<T = unknown> {
+  type: string;
+  data: T;
+}
+
+type MessageHandler = (data: never) => void;
+
+const RECONNECT_DELAY = 1000;
+
+const handlers = new Map<string, Set<MessageHandler>>();
+let socket: WebSocket | null = null;
+let reconnectTimer: number | null = null;
+
+const connect = () => {
+  const wsUrl = `ws://${window.location.hostname}:8000/ws/system`;
+  socket = new WebSocket(wsUrl);
+
+  socket.onmessage = (event) => {
+    try {
+      const message = JSON.parse(event.data) as SystemMessage;
+      handlers.get(message.type)?.forEach((handler) => handler(message.data as never));
+    } catch (err) {
+      console.error('解析 WebSocket 訊息失敗:', err);
+    }
+  };
+
+  socket.onclose = () => {
+    socket = null;
+    // 仍有訂閱者時自動重新連線
+    if (handlers.size > 0 && reconnectTimer === null) {
+      reconnectTimer = window.setTimeout(() => {
+        reconnectTimer = null;
+        if (handlers.size > 0) connect();
+      }, RECONNECT_DELAY);
+    }
+  };
+
+  socket.onerror = (err) => {
+    console.error('WebSocket 錯誤:', err);
+  };
+};
+
+const disconnect = () => {
+  if (reconnectTimer !== null) {
+    clearTimeout(reconnectTimer);
+    reconnectTimer = null;
+  }
+  socket?.close();
+  socket = null;
+};
+
+export function useSystemSocket() {
+  /**
+   * 訂閱指定類型的訊息, 回傳取消訂閱函數
+   */
+  const subscribe = <T>(type: string, handler: (data: T) => void) => {
+    const typeHandlers = handlers.get(type) ?? new Set<MessageHandler>();
+    typeHandlers.add(handler as MessageHandler);
+    handlers.set(type, typeHandlers);
+
+    if (!socket && reconnectTimer === null) connect();
+
+    return () => {
+      typeHandlers.delete(handler as MessageHandler);
+      if (typeHandlers.size === 0) handlers.delete(type);
+      if (handlers.size === 0) disconnect();
+    };
+  };
+
+  return {
+    subscribe,
+  };
+}
@@ -1,6 +1,18 @@
 // API 服務層
 import axios from 'axios';
-import type { ScriptCheckIssue } from '../types';
+import type {
+  DryRunResult,
+  ExecutionResult,
+  ImportResult,
+  ProfileReport,
+  ScheduledRun,
+  ScriptCheckIssue,
+  ScriptSchedule,
+  ScriptSearchResult,
+  ScriptVersion,
+  ScriptVersionContent,
+  ScriptVersionDiff,
+} from '../types';
 
 const API_BASE_URL = 'http://127.0.0.1:8000';
 
@@ -16,6 +28,7 @@ export interface Script {
   name: string;
   content: string;
   hotkey?: string;
+  schedule?: ScriptSchedule | null;
   enabled: boolean;
 }
 
@@ -23,6 +36,7 @@ export interface ScriptCreate {
   name: string;
   content: string;
   hotkey?: string;
+  schedule?: ScriptSchedule | null;
 }
 
 export interface ScriptUpdate {
@@ -30,6 +44,7 @@ export interface ScriptUpdate {
   content?: string;
   hotkey?: string;
   enabled?: boolean;
+  schedule?: ScriptSchedule | null;
 }
 
 export const scriptApi = {
@@ -48,8 +63,39 @@ export const scriptApi = {
   // 刪除腳本
   deleteScript: (id: string) => api.delete(`/scripts/${id}`),
 
-  // 執行腳本
-  executeScript: (id: string) => api.post(`/scripts/${id}/execute`),
+  // 搜尋腳本 (例如 click 100、"move(100, 200)"、name:登入、api:type_text)
+  searchScripts: (q: string, limit = 50) =>
+    api.get<ScriptSearchResult>('/scripts/search', { params: { q, limit } }),
+
+  // 批次匯出/匯入 (NDJSON, 每行一個腳本; 名稱相同的腳本被覆寫)
+  exportScripts: () => api.get<string>('/scripts/export', { responseType: 'text' }),
+  importScripts: (ndjson: string) =>
+    api.post<ImportResult>('/scripts/import', ndjson, {
+      headers: { 'Content-Type': 'application/x-ndjson' },
+    }),
+
+  // 版本歷史 (修改內容時自動記錄, 還原也會記錄為新版本)
+  getVersions: (id: string) => api.get<ScriptVersion[]>(`/scripts/${id}/versions`),
+  getVersion: (id: string, version: number) =>
+    api.get<ScriptVersionContent>(`/scripts/${id}/versions/${version}`),
+  diffVersion: (id: string, version: number, against?: number) =>
+    api.get<ScriptVersionDiff>(`/scripts/${id}/versions/${version}/diff`, {
+      params: against !== undefined ? { against } : {},
+    }),
+  restoreVersion: (id: string, version: number) =>
+    api.post<Script>(`/scripts/${id}/versions/${version}/restore`),
+
+  // 執行腳本 (profile 為 true 時記錄效能分析報告)
+  executeScript: (id: string, profile = false) =>
+    api.post<ExecutionResult>(`/scripts/${id}/execute`, null, {
+      params: profile ? { profile } : {},
+    }),
+
+  // 模擬執行 (不送出輸入, 等待以虛擬時間瞬間完成)
+  dryRunScript: (id: string, timeline = true) =>
+    api.post<DryRunResult>(`/scripts/${id}/dry-run`, null, { params: { timeline } }),
+  dryRunContent: (content: string, timeline = true) =>
+    api.post<DryRunResult>('/scripts/dry-run', { content }, { params: { timeline } }),
 
   // 啟動監聽器
   startListener: () => api.post('/listener/start'),
@@ -69,6 +115,15 @@ export const scriptApi = {
   // 歷史記錄 API
   getHistory: () => api.get('/history'),
   clearHistory: () => api.delete('/history'),
+  exportHistory: () => api.get<string>('/history/export', { responseType: 'text' }),
+  importHistory: (ndjson: string) =>
+    api.post<{ status: string; imported: number }>('/history/import', ndjson, {
+      headers: { 'Content-Type': 'application/x-ndjson' },
+    }),
+  getProfile: (runId: string) => api.get<ProfileReport>(`/history/${runId}/profile`),
+
+  // 排程 API
+  getScheduledRuns: () => api.get<ScheduledRun[]>('/scheduler'),
 
   // 滑鼠位置 API
   getMousePosition: () => api.get<{ x: number; y: number }>('/mouse/position'),
@@ -80,6 +135,7 @@ export const scriptApi = {
       script_id: string | null;
       script_name: string | null;
       current_line: number | null;
+      total_lines: number | null;
     }>('/engine/status'),
   stopEngine: () => api.post<{ status: string; message: string }>('/engine/stop'),
   pauseEngine: () => api.post<{ status: string; message: string }>('/engine/pause'),
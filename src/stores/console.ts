@@ -1,6 +1,7 @@
 import { defineStore } from 'pinia';
 import { ref, computed } from 'vue';
-import type { ScriptCheckIssue } from '../types';
+import { useSystemSocket } from '../composables/useSystemSocket';
+import type { BackendLogMessage, BackendLogRecord, ScriptCheckIssue } from '../types';
 
 export interface LogEntry {
   id: string;
@@ -8,8 +9,19 @@ export interface LogEntry {
   type: 'info' | 'success' | 'warning' | 'error';
   message: string;
   source?: string;
+  runId?: string;
 }
 
+const LEVEL_TYPES: Record<BackendLogRecord['level'], LogEntry['type']> = {
+  debug: 'info',
+  info: 'info',
+  warning: 'warning',
+  error: 'error',
+  critical: 'error',
+};
+
+const MAX_LOGS = 1000;
+
 export const useConsoleStore = defineStore('console', () => {
   // 終端機日誌
   const logs = ref<LogEntry[]>([]);
@@ -36,7 +48,7 @@ export const useConsoleStore = defineStore('console', () => {
     });
 
     // 限制日誌數量，保留最近 1000 條
-    if (logs.value.length > 1000) {
+    if (logs.value.length > MAX_LOGS) {
       logs.value.shift();
     }
 
@@ -46,6 +58,34 @@ export const useConsoleStore = defineStore('console', () => {
     }
   }
 
+  // 加入後端推送的一批日誌 (一次更新, 避免逐筆觸發重新渲染)
+  function addBackendLogs({ records, dropped }: BackendLogMessage) {
+    const entries: LogEntry[] = records.map((record) => ({
+      id: Math.random().toString(36).substring(2, 9),
+      timestamp: new Date(record.time * 1000),
+      type: LEVEL_TYPES[record.level] ?? 'info',
+      message: record.message,
+      source: record.logger === 'script' ? 'Script' : 'Backend',
+      runId: record.run_id ?? undefined,
+    }));
+    if (dropped > 0) {
+      entries.unshift({
+        id: Math.random().toString(36).substring(2, 9),
+        timestamp: new Date(),
+        type: 'warning',
+        message: `輸出過多，已略過 ${dropped} 筆日誌`,
+        source: 'Backend',
+      });
+    }
+    logs.value = [...logs.value, ...entries].slice(-MAX_LOGS);
+  }
+
+  // 訂閱後端日誌, 回傳取消訂閱函數
+  function subscribeBackendLogs() {
+    const { subscribe } = useSystemSocket();
+    return subscribe<BackendLogMessage>('log', addBackendLogs);
+  }
+
   // 清除日誌
   function clearLogs() {
     logs.value = [];
@@ -70,6 +110,8 @@ export const useConsoleStore = defineStore('console', () => {
     errorCount,
     warningCount,
     addLog,
+    addBackendLogs,
+    subscribeBackendLogs,
     clearLogs,
     setProblems,
     clearProblems,
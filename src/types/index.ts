@@ -3,11 +3,27 @@
  * 統一管理所有前端類型
  */
 
+// 腳本排程 (時間皆為本地時間)
+export interface ScriptSchedule {
+  type: 'interval' | 'cron' | 'at';
+  every?: number | null; // 間隔秒數
+  cron?: string | null; // 分 時 日 月 星期
+  at?: string | null; // ISO 時間, 只執行一次
+  missed?: 'skip' | 'run_once';
+}
+
+export interface ScheduledRun {
+  script_id: string;
+  type: ScriptSchedule['type'];
+  next_run: string;
+}
+
 export interface Script {
   id: string;
   name: string;
   content: string;
   hotkey?: string;
+  schedule?: ScriptSchedule | null;
   enabled: boolean;
 }
 
@@ -15,6 +31,7 @@ export interface ScriptCreate {
   name: string;
   content: string;
   hotkey?: string;
+  schedule?: ScriptSchedule | null;
 }
 
 export interface ScriptUpdate {
@@ -22,6 +39,44 @@ export interface ScriptUpdate {
   content?: string;
   hotkey?: string;
   enabled?: boolean;
+  schedule?: ScriptSchedule | null; // null 表示清除排程
+}
+
+// 腳本搜尋
+export interface ScriptSearchHit {
+  id: string;
+  name: string;
+  score: number;
+  line: number | null; // 內容中第一個符合的行號
+}
+
+export interface ScriptSearchResult {
+  total: number;
+  hits: ScriptSearchHit[];
+}
+
+// 批次匯入結果
+export interface ImportResult {
+  created: number;
+  updated: number; // 名稱相同而被覆寫的腳本
+}
+
+// 腳本版本歷史
+export interface ScriptVersion {
+  version: number;
+  hash: string; // 內容的 SHA-256
+  timestamp: string;
+  size: number;
+}
+
+export interface ScriptVersionContent extends ScriptVersion {
+  content: string;
+}
+
+export interface ScriptVersionDiff {
+  from_version: number;
+  to_version: number;
+  diff: string; // unified diff
 }
 
 export interface RecorderStatus {
@@ -30,6 +85,39 @@ export interface RecorderStatus {
   duration: number;
 }
 
+export interface RecordedEvent {
+  type: 'mouse_move' | 'mouse_down' | 'mouse_release' | 'scroll' | 'key_down' | 'key_release';
+  t_ns: number;
+  x?: number;
+  y?: number;
+  button?: string;
+  dx?: number;
+  dy?: number;
+  key?: string;
+}
+
+export interface RecorderEventsMessage {
+  offset: number;
+  events: RecordedEvent[];
+  recording: boolean;
+  event_count: number;
+  duration: number;
+}
+
+// 後端日誌 (WebSocket 'log' 訊息, 同一間隔內的記錄合併為一批)
+export interface BackendLogRecord {
+  time: number; // Unix 時間 (秒)
+  level: 'debug' | 'info' | 'warning' | 'error' | 'critical';
+  logger: string;
+  run_id: string | null;
+  message: string;
+}
+
+export interface BackendLogMessage {
+  records: BackendLogRecord[];
+  dropped: number;
+}
+
 export interface MousePosition {
   x: number;
   y: number;
@@ -38,6 +126,7 @@ export interface MousePosition {
 export interface ExecutionResult {
   status: string;
   message: string;
+  run_id?: string;
 }
 
 export interface HistoryRecord {
@@ -46,6 +135,46 @@ export interface HistoryRecord {
   status: string;
   duration: number;
   error?: string;
+  run_id?: string;
+  has_profile?: boolean;
+}
+
+// 效能分析報告 (時間單位: 秒)
+export interface ProfileLine {
+  line: number;
+  source: string;
+  hits: number;
+  total_time: number;
+  self_time: number;
+  api_time: number;
+  user_time: number;
+  api_calls: Record<string, number>;
+}
+
+export interface ProfileReport {
+  total_time: number;
+  api_time: number;
+  user_time: number;
+  lines: ProfileLine[];
+  api: Record<string, { calls: number; time: number }>;
+}
+
+// 模擬執行 (時間皆為從腳本開始的虛擬毫秒數)
+export interface DryRunAction {
+  time_ms: number;
+  line: number;
+  action: string; // move, click, mouse_down, key_down, type_text, print...
+  [param: string]: unknown;
+}
+
+export interface DryRunResult {
+  status: 'success' | 'error' | 'truncated' | 'timeout';
+  error: string | null;
+  duration_ms: number;
+  action_count: number;
+  counts: Record<string, number>;
+  api_calls: Record<string, number>;
+  timeline: DryRunAction[];
 }
 
 export interface StatusResponse {